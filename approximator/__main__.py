@@ -0,0 +1,67 @@
+# Путь: approximator/__main__.py
+# =================================================================================
+# ТОЧКА ВХОДА python -m approximator
+#
+#   python -m approximator                 — приложение (окно)
+#   python -m approximator batch ...       — пакетная обработка без GUI
+#                                            (см. services/batch_pipeline.py)
+#
+# Пример:
+#   python -m approximator batch runs/плавка_* --template шаблон.json \
+#          --output results --format csv --jobs 8
+#
+# =================================================================================
+
+import argparse
+import os
+import sys
+import time
+
+
+def batch_main(argv) -> int:
+    from approximator.services.batch_pipeline import (
+        BatchOptions, BatchTemplate, collect_runs, print_summary, run_batch
+    )
+    from approximator.services.data_exporter import EXPORT_FORMATS
+
+    parser = argparse.ArgumentParser(
+        prog="python -m approximator batch",
+        description="Пакетная обработка: разбор -> объединение -> аппроксимация -> экспорт")
+    parser.add_argument('inputs', nargs='+', help="прогоны: папка (объединяются файлы поддерживаемых форматов) или файл")
+    parser.add_argument('-t', '--template', help="файл проекта (.json или .approx) с сегментами каналов")
+    parser.add_argument('-o', '--output', default='batch_output', help="папка результатов")
+    parser.add_argument('-f', '--format', default='xlsx', choices=EXPORT_FORMATS, help="формат экспорта")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="число процессов (по умолчанию — число ядер)")
+    parser.add_argument('--points', type=int, default=100, help="точек экспорта на сегмент")
+    parser.add_argument('--degree', type=int, default=3,
+                        help="степень для каналов без сегментов в шаблоне (один сегмент на весь диапазон)")
+    parser.add_argument('--project', action='store_true', help="сохранить также проект .approx с данными")
+    parser.add_argument('--no-source-data', action='store_true', help="не выгружать исходные данные")
+    parser.add_argument('--no-cache', action='store_true', help="не использовать кеш разобранных файлов")
+    parser.add_argument('-v', '--verbose', action='store_true', help="подробный вывод по каждому прогону")
+    args = parser.parse_args(argv)
+
+    runs = collect_runs(args.inputs, exclude=[args.template] if args.template else None)
+    template = BatchTemplate.load(args.template, default_degree=args.degree)
+    options = BatchOptions(output_dir=args.output, export_format=args.format, points=args.points,
+                           export_source_data=not args.no_source_data, save_project=args.project,
+                           use_cache=not args.no_cache, verbose=args.verbose)
+    print(f"Прогонов: {len(runs)}, шаблон: {args.template or '—'}, результаты: {args.output}")
+    started = time.perf_counter()
+    reports = run_batch(runs, template, options, max_workers=args.jobs)
+    print_summary(reports, time.perf_counter() - started)
+    return 1 if any(r.error for r in reports) else 0
+
+
+def gui_main() -> int:
+    # main.py импортирует модули GUI относительно папки пакета
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from approximator.main import main
+    main()
+    return 0
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        sys.exit(batch_main(sys.argv[2:]))
+    sys.exit(gui_main())
@@ -2,7 +2,7 @@
 
 from approximator.utils.log import debug
 
-from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QTabWidget
+from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QTabWidget, QProgressBar
 
 # Модели и виджеты
 from approximator.data_models.app_state import AppState
@@ -13,8 +13,9 @@ from approximator.services.plot.plot_manager import PlotManager
 
 # Сервисы
 from approximator.services.data_loader import DataLoader
+from approximator.services.parse_cache import ParseCache
 from approximator.services.data_merger import DataMerger
-from approximator.services.approximation.polynomial_fitter import PolynomialFitter
+from approximator.services.approximation.moment_fitter import MomentFitter
 
 # Парсеры
 from approximator.file_parsers.excel_parser import ExcelParser
@@ -27,6 +28,8 @@ from approximator.ui.handlers.segment_mouse_handler import SegmentMouseHandler
 from approximator.ui.handlers.segment_table_handler import SegmentTableHandler
 
 from approximator.ui.setup.handler_initializer import create_handlers
+from approximator.ui.workers.fit_scheduler import LANE_ALL, FitScheduler
+from approximator.ui.workers.file_load_worker import FileLoadWorker
 
 class MainWindow(QMainWindow):
     """Главное окно приложения."""
@@ -55,9 +58,16 @@ class MainWindow(QMainWindow):
             AdcParser(),      # Парсер для файлов АЦП
             ExcelParser(),    # Парсер для Excel
             GenericCsvParser() # Общий парсер CSV (должен быть последним)
-        ])
+        ], cache=ParseCache())  # Разобранные файлы кешируются на диске
         self.data_merger = DataMerger()
-        self.fitter = PolynomialFitter()
+        self.fitter = MomentFitter()
+        # Фоновая аппроксимация (GUI-поток не блокируется)
+        self.fit_scheduler = FitScheduler(self, data_version_getter=lambda: self.state.data_version)
+        self._setup_fit_progress()
+        # Фоновая параллельная загрузка файлов
+        self.file_loader = FileLoadWorker(self.data_loader, self)
+        self.file_loader.progress.connect(
+            lambda done, total: self.statusBar().showMessage(f"Загружено файлов: {done} из {total}", 3000))
 
         # Создаем вкладки
         self.tabs = QTabWidget()
@@ -84,19 +94,65 @@ class MainWindow(QMainWindow):
         from  approximator.services.project_state_controller import ProjectStateController
         self.project_controller = ProjectStateController(self)
         try:
-            self.project_controller.load_project("state.json")
+            self.project_controller.load_project("state.json", lazy=True)
             debug("[MainWindow] ✅ Состояние проекта восстановлено")
         except Exception as e:
             debug(f"[MainWindow] ⚠️ Не удалось восстановить состояние: {e}")
 
+    def _setup_fit_progress(self):
+        """Индикатор фоновой аппроксимации в строке состояния."""
+        self.fit_progress = QProgressBar()
+        self.fit_progress.setMaximumWidth(200)
+        self.fit_progress.setTextVisible(True)
+        self.fit_progress.hide()
+        self.statusBar().addPermanentWidget(self.fit_progress)
+
+        # Идущие запросы: поколение -> (готово, всего); показывается последний
+        running = {}
+
+        def show_progress():
+            if not running:
+                self.fit_progress.hide()
+                return
+            done, total = running[max(running)]
+            self.fit_progress.setRange(0, max(total, 1))
+            self.fit_progress.setValue(done)
+            self.fit_progress.setVisible(total > 0)
+
+        def on_started(generation, total):
+            running[generation] = (0, total)
+            show_progress()
+
+        def on_progress(generation, done, total):
+            if generation in running:
+                running[generation] = (done, total)
+                show_progress()
+
+        def on_stopped(generation, *_):
+            running.pop(generation, None)
+            show_progress()
+
+        def on_cancelled(generation, lane):
+            on_stopped(generation)
+            # Замена запроса канала новым — обычный ход правки, о ней не сообщается
+            if lane == LANE_ALL:
+                self.statusBar().showMessage("Расчет всех каналов отменен — результаты не применены", 5000)
+
+        self.fit_scheduler.started.connect(on_started)
+        self.fit_scheduler.progress.connect(on_progress)
+        self.fit_scheduler.finished.connect(on_stopped)
+        self.fit_scheduler.cancelled.connect(on_cancelled)
+
     def request_recalculation(self):
         """Запускает пересчет аппроксимаций."""
         print("[request_recalculation] Requesting recalculation")
         if hasattr(self, 'segment_table_handler'):
-            self.segment_table_handler._fit_segments()  # Только пересчет, без обновления UI
+            self.segment_table_handler._fit_segments()  # Пересчет в фоне, перерисовка по готовности
 
     def closeEvent(self, event):
         """Автосохранение состояния при закрытии приложения."""
+        self.fit_scheduler.shutdown()
+        self.file_loader.shutdown()
         try:
             self.project_controller.save_project("state.json")
             print("[MainWindow] 💾 Состояние проекта сохранено")
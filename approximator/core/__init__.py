@@ -0,0 +1,84 @@
+# Путь: approximator/core/__init__.py
+# =================================================================================
+# ЯДРО ПРИЛОЖЕНИЯ (БЕЗ GUI)
+#
+# НАЗНАЧЕНИЕ:
+#   Единая точка импорта моделей данных, парсеров, объединения,
+#   аппроксимации, экспорта и файлов проекта — для скриптов, пакетной
+#   обработки и тестов. Ядро не импортирует Qt и matplotlib.
+#
+# ЛОГИКА РАБОТЫ:
+#   1.  Имена загружаются лениво (__getattr__ модуля): `import
+#       approximator.core` почти ничего не стоит, а
+#       `from approximator.core import DataMerger` загружает только модуль
+#       объединения и его зависимости.
+#   2.  Тяжелые библиотеки загружаются при первом использовании:
+#       scipy.signal / scipy.linalg — в сглаживании и сшивке
+#       (services/math), openpyxl / xlrd — в чтении Excel (через pandas) и
+#       экспорте .xlsx.
+#   3.  Время импорта ядра проверяет benchmarks/bench_import.py.
+#
+# =================================================================================
+
+import importlib
+
+# Имя -> модуль, в котором оно определено
+_EXPORTS = {
+    # Модели данных
+    'AppState': 'approximator.data_models.app_state',
+    'ChannelState': 'approximator.data_models.channel_state',
+    'ChannelSeries': 'approximator.data_models.channel_store',
+    'ChannelStore': 'approximator.data_models.channel_store',
+    'FitResult': 'approximator.data_models.fit_result',
+    'Segment': 'approximator.data_models.segment',
+    # Парсеры
+    'AdcParser': 'approximator.file_parsers.adc_parser',
+    'BaseParser': 'approximator.file_parsers.base_parser',
+    'ExcelParser': 'approximator.file_parsers.excel_parser',
+    'GenericCsvParser': 'approximator.file_parsers.generic_csv_parser',
+    'PyrometerParser': 'approximator.file_parsers.pyrometer_parser',
+    'sniff_file': 'approximator.file_parsers.sniffer',
+    # Загрузка и объединение
+    'DataLoader': 'approximator.services.data_loader',
+    'ParseCache': 'approximator.services.parse_cache',
+    'DataMerger': 'approximator.services.data_merger',
+    'compact_dataframe': 'approximator.services.compact_storage',
+    'TimeIndex': 'approximator.services.time_index',
+    'get_time_index': 'approximator.services.time_index',
+    # Аппроксимация
+    'PolynomialFitter': 'approximator.services.approximation.polynomial_fitter',
+    'MomentFitter': 'approximator.services.approximation.moment_fitter',
+    'StandardFitter': 'approximator.services.math.standard_fitter',
+    'SplineFitter': 'approximator.services.math.smooth_fitter',
+    'collect_jobs': 'approximator.services.approximation.channel_fitter',
+    'run_jobs': 'approximator.services.approximation.channel_fitter',
+    'apply_results': 'approximator.services.approximation.channel_fitter',
+    'fit_channels_parallel': 'approximator.services.approximation.parallel_fitter',
+    'SegmentEditor': 'approximator.services.segments.segment_editor',
+    # Экспорт и файлы проекта
+    'ExportOptions': 'approximator.services.data_exporter',
+    'export_approximations': 'approximator.services.data_exporter',
+    'ProjectDataStore': 'approximator.services.project_data_store',
+    'read_project_container': 'approximator.services.project_container',
+    'write_project_container': 'approximator.services.project_container',
+    # Пакетная обработка
+    'BatchOptions': 'approximator.services.batch_pipeline',
+    'BatchTemplate': 'approximator.services.batch_pipeline',
+    'collect_runs': 'approximator.services.batch_pipeline',
+    'run_batch': 'approximator.services.batch_pipeline',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
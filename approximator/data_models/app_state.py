@@ -1,10 +1,13 @@
 # Путь: app/app_state.py
 
 import pandas as pd
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 
 from approximator.data_models.channel_state import ChannelState
+from approximator.data_models.channel_store import ChannelStore
 from approximator.data_models.segment import Segment  # Импортируем тип Segment
+from approximator.services.compact_storage import compact_sources
+from approximator.services.time_index import get_time_index
 
 class AppState:
     """
@@ -14,8 +17,16 @@ class AppState:
         # Состояние вкладки "Импорт"
         self.loaded_dataframes: Dict[str, pd.DataFrame] = {}
         self.time_column: Optional[str] = None
+        # Параметры объединения файлов (см. DataMerger.merge_dataframes)
+        self.merge_options: Dict[str, Any] = {}
+        # Проект открыт без исходных данных (ленивое открытие): функция,
+        # которая их догружает (см. ensure_data)
+        self.pending_data_loader: Optional[Callable[[], None]] = None
         
         # Состояние вкладки "Анализ"
+        # Версия данных увеличивается при каждой замене merged_dataframe
+        # и входит в ключ кеша аппроксимаций сегментов.
+        self.data_version: int = 0
         self.merged_dataframe: pd.DataFrame = pd.DataFrame()
         self.channel_states: Dict[str, ChannelState] = {}
         self.channel_list: List[str] = []
@@ -30,4 +41,46 @@ class AppState:
 
         # Состояние для перетаскивания границ
         self.dragged_boundary_index: Optional[int] = None
-        self.dragged_line: Optional[Any] = None
\ No newline at end of file
+        self.dragged_line: Optional[Any] = None
+
+    @property
+    def merged_dataframe(self) -> pd.DataFrame:
+        return self._merged_dataframe
+
+    @merged_dataframe.setter
+    def merged_dataframe(self, df: pd.DataFrame):
+        self._merged_dataframe = df
+        self.data_version += 1
+
+    def compact_loaded_dataframes(self, time_column: str):
+        """
+        Компактный режим объединения: исходные таблицы файлов после
+        объединения тоже хранятся в float32 (см. compact_storage, п. 4).
+        """
+        if self.merge_options.get('compact') and self.loaded_dataframes:
+            self.loaded_dataframes = compact_sources(self.loaded_dataframes, time_column)
+
+    def ensure_data(self) -> bool:
+        """
+        Догружает исходные данные, если проект открыт без них.
+        Возвращает True, если объединенная таблица есть.
+        """
+        if self.pending_data_loader is not None:
+            loader, self.pending_data_loader = self.pending_data_loader, None
+            loader()
+        return self.merged_dataframe is not None and not self.merged_dataframe.empty
+
+    def time_index(self, time_column: Optional[str] = None):
+        """
+        Возвращает общий индекс по времени для merged_dataframe.
+        Используется всеми путями аппроксимации вместо булевых масок.
+        """
+        return get_time_index(self.merged_dataframe, time_column or self.time_column or 'Time')
+
+    def channel_store(self, time_column: Optional[str] = None) -> ChannelStore:
+        """
+        Каналы merged_dataframe в исходной дискретизации (компактные массивы
+        время/значения). Пустое хранилище, если данных нет.
+        """
+        time_index = self.time_index(time_column)
+        return time_index.store if time_index is not None else ChannelStore()
\ No newline at end of file
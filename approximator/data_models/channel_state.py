@@ -1,7 +1,7 @@
 # Путь: approximator/data_models/channel_state.py
 
 from dataclasses import dataclass, field
-from typing import List, Optional, Set
+from typing import Iterable, List, Optional, Set
 from .segment import Segment
 
 
@@ -74,6 +74,45 @@ class ChannelState:
         if self.segments is None:
             self.segments = []
 
+    # --- Отслеживание "грязных" сегментов для инкрементального пересчета ---
+
+    def fit_key(self, segment: Segment, data_version: int, time_column: Optional[str] = None) -> tuple:
+        """
+        Ключ кеша аппроксимации сегмента. Если ключ совпадает с segment.fit_key,
+        то fit_result актуален и пересчет не нужен. time_column — колонка
+        времени, по которой взяты x: другая колонка — другие данные.
+        """
+        return (self.name, segment.x_start, segment.x_end, segment.poly_degree,
+                segment.segment_type, self.time_offset, data_version, time_column)
+
+    def dirty_segment_indices(self, data_version: int, time_column: Optional[str] = None) -> List[int]:
+        """Индексы сегментов, у которых изменились границы, степень или данные."""
+        return [i for i, seg in enumerate(self.segments)
+                if seg.fit_key != self.fit_key(seg, data_version, time_column)]
+
+    def mark_clean(self, index: int, data_version: int, time_column: Optional[str] = None):
+        """Помечает сегмент как пересчитанный для текущей версии данных."""
+        segment = self.segments[index]
+        segment.fit_key = self.fit_key(segment, data_version, time_column)
+
+    def mark_dirty(self, indices: Iterable[int]):
+        """Принудительно помечает сегменты для пересчета."""
+        for i in indices:
+            if 0 <= i < len(self.segments):
+                self.segments[i].fit_key = None
+
+    def mark_all_dirty(self):
+        """Помечает для пересчета все сегменты канала."""
+        for seg in self.segments:
+            seg.fit_key = None
+
+    def mark_boundary_dirty(self, x: float, tolerance: float = 1e-6) -> List[int]:
+        """Помечает сегменты, которые касаются границы x (обычно их один-два)."""
+        touched = [i for i, seg in enumerate(self.segments)
+                   if abs(seg.x_start - x) < tolerance or abs(seg.x_end - x) < tolerance]
+        self.mark_dirty(touched)
+        return touched
+
     def regenerate_segments(self, boundaries: List[float]):
         if len(boundaries) < 2:
             self.segments.clear()
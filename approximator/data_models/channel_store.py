@@ -0,0 +1,196 @@
+# Путь: approximator/data_models/channel_store.py
+# =================================================================================
+# МОДУЛЬ ХРАНИЛИЩА КАНАЛОВ
+#
+# НАЗНАЧЕНИЕ:
+#   Данные каждого канала хранятся отдельно, как компактная пара массивов
+#   (время, значения) float64 в исходной дискретизации канала, вместо
+#   выборки из широкой таблицы, где редкие каналы дополнены NaN.
+#
+# ЛОГИКА РАБОТЫ:
+#   1.  `ChannelSeries` — один канал: время отсортировано, NaN нет.
+#       Значения float32 (компактный режим, см. compact_storage) так и
+#       хранятся — в float64 их переводит аппроксимация по участкам.
+#       Диапазон [x_start, x_end] находится через searchsorted, а срез
+#       (`slice`) — это представления (views) массивов без копирования.
+#   2.  Смещение по времени (ChannelState.time_offset) в массивах не
+#       хранится: оно прибавляется только там, где нужно (`shifted`,
+#       границы в `slice(..., offset)`), поэтому смена смещения ничего
+#       не пересчитывает.
+#   3.  `ChannelStore` — словарь каналов. Из широкой таблицы каналы
+#       извлекаются лениво, при первом обращении (`from_dataframe`);
+#       исходные отсчеты (например, после пересчета на сетку) добавляются
+#       сразу (`add`). Каналы без пропусков разделяют один массив
+#       времени — общую ось таблицы.
+#
+# =================================================================================
+
+import weakref
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class ChannelSeries:
+    """
+    Один канал: отсортированное время (float64) и значения без NaN
+    (float64, в компактном режиме — float32).
+    """
+
+    __slots__ = ('name', 'time', 'values')
+
+    def __init__(self, name: str, time: np.ndarray, values: np.ndarray):
+        self.name = name
+        self.time = np.ascontiguousarray(time, dtype=np.float64)
+        values = np.asarray(values)
+        self.values = np.ascontiguousarray(values, dtype=values.dtype if values.dtype == np.float32 else np.float64)
+
+    def __len__(self):
+        return self.time.size
+
+    @property
+    def nbytes(self) -> int:
+        return self.time.nbytes + self.values.nbytes
+
+    def time_range(self, offset: float = 0.0) -> Optional[Tuple[float, float]]:
+        """(первая, последняя) метка времени со смещением; None для пустого канала."""
+        if not self.time.size:
+            return None
+        return float(self.time[0]) + offset, float(self.time[-1]) + offset
+
+    def row_range(self, x_start: float, x_end: float, offset: float = 0.0) -> Tuple[int, int]:
+        """Диапазон отсчетов [i0, i1) для x_start <= t + offset <= x_end."""
+        i0 = int(np.searchsorted(self.time, x_start - offset, side='left'))
+        i1 = int(np.searchsorted(self.time, x_end - offset, side='right'))
+        return i0, max(i0, i1)
+
+    def slice(self, x_start: float, x_end: float, offset: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+        """Отсчеты в интервале — срезы без копирования (время без смещения)."""
+        i0, i1 = self.row_range(x_start, x_end, offset)
+        return self.time[i0:i1], self.values[i0:i1]
+
+    def shifted(self, offset: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+        """(время + смещение, значения); при нулевом смещении — без копирования."""
+        return (self.time + offset if offset else self.time), self.values
+
+
+class ChannelStore:
+    """Каналы проекта в исходной дискретизации."""
+
+    def __init__(self, time_column: str = 'Time'):
+        self.time_column = time_column
+        # Источники: имя -> функция, извлекающая канал при первом обращении
+        self._sources: Dict[str, Callable[[], ChannelSeries]] = {}
+        # Уже извлеченные каналы
+        self._channels: Dict[str, ChannelSeries] = {}
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, time_column: str,
+                       native: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None,
+                       sorted_axis: Optional[Tuple[np.ndarray, Optional[np.ndarray]]] = None) -> 'ChannelStore':
+        """
+        Хранилище каналов широкой таблицы. Колонки извлекаются лениво;
+        для каналов из native берутся готовые исходные отсчеты.
+        sorted_axis — уже построенная ось (отсортированное время, перестановка строк или None).
+        """
+        store = cls(time_column)
+        if df is None or time_column not in df.columns:
+            return store
+        df_ref = weakref.ref(df)
+        axis = {}
+        if sorted_axis is not None:
+            axis['time'], axis['order'] = sorted_axis
+
+        def sorted_time():
+            # Ось времени таблицы: отсортированное время и перестановка строк
+            if not axis:
+                frame = df_ref()
+                time = frame[time_column].to_numpy(dtype=np.float64, na_value=np.nan)
+                order = None
+                if time.size > 1 and np.any(time[1:] < time[:-1]):
+                    order = np.argsort(time, kind='stable')
+                    time = time[order]
+                axis['time'], axis['order'] = np.ascontiguousarray(time), order
+            return axis['time'], axis['order']
+
+        def extract(name):
+            frame = df_ref()
+            if frame is None:
+                raise KeyError(name)
+            time, order = sorted_time()
+            dtype = np.float32 if frame[name].dtype == np.float32 else np.float64
+            values = frame[name].to_numpy(dtype=dtype, na_value=np.nan)
+            if order is not None:
+                values = values[order]
+            valid = ~(np.isnan(values) | np.isnan(time))
+            if not valid.all():
+                time, values = time[valid], values[valid]
+            return ChannelSeries(name, time, values)
+
+        for name in df.columns:
+            if name != time_column:
+                store._sources[name] = lambda name=name: extract(name)
+        for name, (time, values) in (native or {}).items():
+            store.add(name, time, values)
+        return store
+
+    # --- Доступ ---
+
+    def add(self, name: str, time: np.ndarray, values: np.ndarray) -> ChannelSeries:
+        """Добавляет (заменяет) канал; время должно быть отсортировано, без NaN."""
+        series = ChannelSeries(name, time, values)
+        self._sources[name] = lambda: series
+        self._channels[name] = series
+        return series
+
+    def get(self, name: str) -> Optional[ChannelSeries]:
+        if name not in self._channels and name in self._sources:
+            self._channels[name] = self._sources[name]()
+        return self._channels.get(name)
+
+    def __getitem__(self, name: str) -> ChannelSeries:
+        series = self.get(name)
+        if series is None:
+            raise KeyError(name)
+        return series
+
+    def __contains__(self, name) -> bool:
+        return name in self._sources
+
+    def __len__(self):
+        return len(self._sources)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._sources)
+
+    def names(self) -> List[str]:
+        return list(self._sources)
+
+    def discard(self, name: str):
+        """Сбрасывает извлеченный канал — при следующем обращении он извлечется заново."""
+        self._channels.pop(name, None)
+
+    def slice(self, name: str, x_start: float, x_end: float, offset: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+        return self[name].slice(x_start, x_end, offset)
+
+    def time_range(self, names: Optional[List[str]] = None,
+                   offsets: Optional[Dict[str, float]] = None) -> Optional[Tuple[float, float]]:
+        """Общий диапазон времени каналов (со смещениями); None, если данных нет."""
+        offsets = offsets or {}
+        ranges = [self[n].time_range(offsets.get(n, 0.0)) for n in (names or self.names()) if n in self]
+        ranges = [r for r in ranges if r is not None]
+        if not ranges:
+            return None
+        return min(r[0] for r in ranges), max(r[1] for r in ranges)
+
+    @property
+    def nbytes(self) -> int:
+        """Объем уже извлеченных каналов (общая ось времени учитывается один раз)."""
+        seen, total = set(), 0
+        for series in self._channels.values():
+            for array in (series.time, series.values):
+                if id(array) not in seen:
+                    seen.add(id(array))
+                    total += array.nbytes
+        return total
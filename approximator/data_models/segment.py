@@ -1,7 +1,7 @@
 # Путь: approximator/data_models/segment.py
 
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
 from approximator.data_models.fit_result import FitResult
@@ -19,6 +19,9 @@ class Segment:
     thickness: float = 1.5
     line_style: str = "-"
     fit_result: Optional[FitResult] = None
+    # Ключ кеша, при котором был получен fit_result (см. ChannelState.fit_key).
+    # Не сохраняется в проект: после загрузки сегмент считается "грязным".
+    fit_key: Optional[tuple] = field(default=None, compare=False, repr=False)
 
     def to_dict(self):
         return {
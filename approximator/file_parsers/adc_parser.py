@@ -8,90 +8,134 @@
 #   созданных программой TermoSoft.
 #
 # ЛОГИКА РАБОТЫ:
-#   1.  Метод `can_parse` ищет ключевое слово "TermoSoft" в первой строке.
-#       Файл должен быть в кодировке cp1251 (ANSI).
+#   1.  Метод `can_parse` проверяет результат анализа начала файла
+#       (sniffer): ключевое слово "TermoSoft" в первой строке. Файл обычно
+#       в кодировке cp1251 (ANSI); кодировка и десятичный знак берутся
+#       из того же анализа.
 #   2.  Метод `parse` выполняет следующие шаги:
 #       - Находит строку-маркер "#Tаблица:", чтобы определить начало данных.
 #       - Извлекает имена каналов из строки после маркера, очищая их от
 #         единиц измерения (", C").
-#       - Читает табличные данные, используя в качестве разделителя табуляцию.
+#       - Читает табличные данные порциями (BaseParser._read_csv_chunked)
+#         прямо из открытого файла, используя в качестве разделителя табуляцию.
+#         Файл целиком в память в виде строки не загружается.
 #       - Преобразует относительное время из формата "ЧЧ:ММ:СС:мс"
-#         в общее количество секунд от начала записи.
+#         в общее количество секунд от начала записи (векторно, см.
+#         `decode_rel_time`; строки с некорректным временем отбрасываются).
 #       - Возвращает DataFrame, где первая колонка - 'Time' (в секундах),
 #         а остальные - данные из каждого канала.
 #
 # =================================================================================
 
+import numpy as np
 import pandas as pd
 import re
+from typing import Optional
 from .base_parser import BaseParser
-from io import StringIO
+from .sniffer import FORMAT_ADC, SniffResult
 
 class AdcParser(BaseParser):
     """Парсер для файлов формата 'АЦП (Терекс/TermoSoft)'."""
 
-    def can_parse(self, file_path: str) -> bool:
-        try:
-            # Эти файлы часто используют старую кириллическую кодировку
-            with open(file_path, 'r', encoding='cp1251') as f:
-                return "TermoSoft" in f.readline()
-        except Exception:
-            return False
+    def can_parse(self, file_path: str, sniff: Optional[SniffResult] = None) -> bool:
+        # Эти файлы часто используют старую кириллическую кодировку (cp1251, ANSI);
+        # кодировка и сигнатура "TermoSoft" определяются при анализе начала файла
+        return self._sniff(file_path, sniff).format == FORMAT_ADC
 
-    def parse(self, file_path: str) -> pd.DataFrame:
+    def parse(self, file_path: str, sniff: Optional[SniffResult] = None) -> pd.DataFrame:
         try:
-            with open(file_path, 'r', encoding='cp1251') as f:
-                lines = f.readlines()
-            
-            data_start_idx = -1
-            for i, line in enumerate(lines):
-                if "#Tаблица:" in line:
-                    data_start_idx = i
-                    break
-            
-            if data_start_idx == -1:
-                return pd.DataFrame()
+            sniff = self._sniff(file_path, sniff)
+            with open(file_path, 'r', encoding=sniff.encoding or 'cp1251', errors='replace') as f:
+                # Пропускаем шапку построчно до маркера таблицы — файл целиком не читается
+                if self._seek_to_line(f, lambda line: "#Tаблица:" in line) is None:
+                    return pd.DataFrame()
+
+                header_line = f.readline().strip()
+
+                # --- [ИСПРАВЛЕНИЕ ЗДЕСЬ] ---
+                # 1. Разделяем строку по табуляции.
+                split_headers = header_line.split('\t')
+                # 2. Фильтруем список, чтобы удалить пустые строки, которые
+                #    могут возникнуть из-за двойных или конечных табуляций.
+                # 3. Затем очищаем каждое имя от единиц измерения и нормализуем.
+                column_names = [
+                    str(re.sub(r',.*', '', col).strip())
+                    for col in split_headers if col.strip()
+                ]
+                time_col_name = column_names[0]
+
+                def convert_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+                    chunk[time_col_name] = decode_rel_time(chunk[time_col_name])
+                    chunk.dropna(subset=[time_col_name], inplace=True)
+                    return chunk
 
-            header_line = lines[data_start_idx + 1].strip()
-            
-            # --- [ИСПРАВЛЕНИЕ ЗДЕСЬ] ---
-            # 1. Разделяем строку по табуляции.
-            split_headers = header_line.split('\t')
-            # 2. Фильтруем список, чтобы удалить пустые строки, которые
-            #    могут возникнуть из-за двойных или конечных табуляций.
-            # 3. Затем очищаем каждое имя от единиц измерения и нормализуем.
-            column_names = [
-                str(re.sub(r',.*', '', col).strip()) 
-                for col in split_headers if col.strip()
-            ]
-            
-            data_string = ''.join(lines[data_start_idx + 2:])
-            df = pd.read_csv(
-                StringIO(data_string), 
-                sep='\t', 
-                header=None,
-                # Используем только то количество колонок, сколько у нас валидных имен
-                names=column_names,
-                usecols=range(len(column_names)),
-                on_bad_lines='skip'
-            )
-
-            time_col_name = column_names[0]
-
-            def parse_rel_time(time_str):
-                if not isinstance(time_str, str): return None
-                try:
-                    h, m, s, ms = map(int, time_str.split(':'))
-                    return h * 3600 + m * 60 + s + ms / 1000.0
-                except (ValueError, TypeError):
-                    return None
-
-            df[time_col_name] = df[time_col_name].apply(parse_rel_time)
-            df.dropna(subset=[time_col_name], inplace=True)
+                # Данные читаются порциями прямо из открытого файла (с позиции после заголовка)
+                df = self._read_csv_chunked(
+                    f,
+                    convert_chunk,
+                    sep='\t',
+                    header=None,
+                    # Используем только то количество колонок, сколько у нас валидных имен
+                    names=column_names,
+                    usecols=range(len(column_names)),
+                    decimal=sniff.decimal,
+                    on_bad_lines='skip'
+                )
+
+            if df.empty:
+                return pd.DataFrame()
             df.rename(columns={time_col_name: 'Time'}, inplace=True)
-            
             return df
-        
+
         except Exception as e:
             print(f"Ошибка при парсинге файла АЦП {file_path}: {e}")
-            return pd.DataFrame()
\ No newline at end of file
+            return pd.DataFrame()
+
+
+# Наибольшая длина полей "ЧЧ:ММ:СС:мс" и всей строки (с тремя двоеточиями)
+REL_TIME_WIDTHS = (2, 2, 2, 3)
+REL_TIME_MAX_LENGTH = sum(REL_TIME_WIDTHS) + 3
+
+
+def decode_rel_time(values) -> np.ndarray:
+    """
+    Векторное преобразование относительного времени "ЧЧ:ММ:СС:мс" в секунды.
+
+    Пробелы по краям убирает Series.str.strip, поля отделяются по
+    двоеточиям функциями numpy.strings, число из цифр поля собирается
+    одним матричным умножением (см. `_digits_to_number`) — без вызова
+    Python-функции на каждую строку. Некорректные значения (не строка,
+    не 4 поля, пустое или слишком длинное поле, посторонние символы) дают NaN.
+    Слишком длинные строки отбрасываются до разбора: ширина массивов не
+    зависит от одной испорченной строки порции.
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    if series.empty or not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+        return np.full(len(series), np.nan)
+    text = series.str.strip()
+    text = text.where(text.str.len() <= REL_TIME_MAX_LENGTH, '').to_numpy(dtype=np.str_)
+
+    # "ЧЧ:ММ:СС:мс" -> четыре поля; лишнее двоеточие останется в последнем
+    fields = []
+    for _ in range(3):
+        head, _sep, text = np.strings.partition(text, ':')
+        fields.append(head)
+    fields.append(text)
+
+    h, m, sec, ms = (_digits_to_number(field, width) for field, width in zip(fields, REL_TIME_WIDTHS))
+    return h * 3600 + m * 60 + sec + ms / 1000.0
+
+
+def _digits_to_number(field: np.ndarray, width: int) -> np.ndarray:
+    """
+    Строки из цифр ASCII (не длиннее width) -> числа: коды символов
+    (строка × разряд) умножаются на веса разрядов. Пустая или более длинная
+    строка, не цифра -> NaN.
+    """
+    lengths = np.strings.str_len(field)
+    invalid = (lengths == 0) | (lengths > width)
+    field = np.where(invalid, '', field).astype(f'U{width}')
+    digits = np.strings.zfill(field, width).view(np.uint32).reshape(-1, width) - ord('0')
+    number = digits @ (10.0 ** np.arange(width - 1, -1, -1))
+    number[invalid | np.any(digits > 9, axis=1)] = np.nan
+    return number
@@ -1,6 +1,8 @@
 # Путь: interactive_approximator/file_parsers/base_parser.py
 from abc import ABC, abstractmethod
+from typing import Callable, Optional
 import pandas as pd
+from .sniffer import SniffResult, sniff_file
 
 class BaseParser(ABC):
     """
@@ -8,23 +10,78 @@ class BaseParser(ABC):
     Определяет общий интерфейс, которому должны следовать все парсеры.
     """
 
+    # Версия формата результата парсера. Входит в ключ дискового кеша
+    # (services/parse_cache.py): увеличьте ее, если меняется результат parse()
+    VERSION = 1
+
+    # Размер порции (в строках) при потоковом чтении больших файлов
+    CHUNK_ROWS = 200_000
+
     @abstractmethod
-    def can_parse(self, file_path: str) -> bool:
+    def can_parse(self, file_path: str, sniff: Optional[SniffResult] = None) -> bool:
         """
         Проверяет, может ли этот парсер обработать данный файл.
         Обычно это проверка по заголовку или ключевому слову в файле.
 
         :param file_path: Путь к файлу.
+        :param sniff: Результат анализа начала файла (см. sniffer.sniff_file).
+                      Если не передан, парсер получает его сам.
         :return: True, если парсер подходит, иначе False.
         """
         pass
 
     @abstractmethod
-    def parse(self, file_path: str) -> pd.DataFrame:
+    def parse(self, file_path: str, sniff: Optional[SniffResult] = None) -> pd.DataFrame:
         """
         Загружает данные из файла в DataFrame.
 
         :param file_path: Путь к файлу.
+        :param sniff: Результат анализа начала файла (кодировка, разделитель,
+                      десятичный знак). Если не передан, парсер получает его сам.
         :return: DataFrame с данными или пустой DataFrame в случае ошибки.
         """
-        pass
\ No newline at end of file
+        pass
+
+    @staticmethod
+    def _sniff(file_path: str, sniff: Optional[SniffResult]) -> SniffResult:
+        """Возвращает переданный результат анализа или анализирует файл."""
+        if sniff is not None and sniff.path == file_path:
+            return sniff
+        return sniff_file(file_path)
+
+    @classmethod
+    def _read_csv_chunked(cls, handle, transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+                          **read_csv_kwargs) -> pd.DataFrame:
+        """
+        Читает таблицу из открытого файла (с текущей позиции) порциями по
+        CHUNK_ROWS строк. Каждая порция сразу приводится к итоговому виду
+        через transform, поэтому в памяти одновременно находятся только
+        готовые колонки и одна сырая порция, а не весь текст файла.
+        """
+        parts = []
+        for chunk in pd.read_csv(handle, chunksize=cls.CHUNK_ROWS, **read_csv_kwargs):
+            if transform is not None:
+                chunk = transform(chunk)
+            if chunk is not None and not chunk.empty:
+                parts.append(chunk)
+        if not parts:
+            return pd.DataFrame()
+        if len(parts) == 1:
+            return parts[0].reset_index(drop=True)
+        return pd.concat(parts, ignore_index=True)
+
+    @staticmethod
+    def _seek_to_line(handle, predicate: Callable[[str], bool], max_lines: Optional[int] = None) -> Optional[str]:
+        """
+        Читает файл построчно до первой строки, для которой predicate истинен.
+        Возвращает эту строку (позиция файла — сразу после нее) или None.
+        """
+        count = 0
+        while max_lines is None or count < max_lines:
+            line = handle.readline()
+            if not line:
+                return None
+            if predicate(line):
+                return line
+            count += 1
+        return None
@@ -8,7 +8,8 @@
 #   файлов Excel, созданных пирометрическим ПО.
 #
 # ЛОГИКА РАБОТЫ:
-#   1.  Метод `can_parse` проверяет расширение файла (.xls или .xlsx).
+#   1.  Метод `can_parse` проверяет расширение файла (.xls или .xlsx)
+#       или сигнатуру, найденную при анализе начала файла (sniffer).
 #   2.  Метод `parse` использует библиотеку pandas, которая "под капотом"
 #       использует `xlrd` или `openpyxl` для чтения файла.
 #   3.  Он ищет в прочитанных данных строку "INDEX", чтобы найти начало
@@ -19,15 +20,19 @@
 # =================================================================================
 
 import pandas as pd
+from typing import Optional
 from .base_parser import BaseParser
+from .sniffer import FORMAT_EXCEL, SniffResult
 
 class ExcelParser(BaseParser):
     """Парсер для бинарных файлов Excel (.xls, .xlsx)."""
 
-    def can_parse(self, file_path: str) -> bool:
+    def can_parse(self, file_path: str, sniff: Optional[SniffResult] = None) -> bool:
+        if sniff is not None and sniff.path == file_path:
+            return sniff.format == FORMAT_EXCEL
         return file_path.lower().endswith(('.xls', '.xlsx'))
 
-    def parse(self, file_path: str) -> pd.DataFrame:
+    def parse(self, file_path: str, sniff: Optional[SniffResult] = None) -> pd.DataFrame:
         try:
             # Pandas автоматически выберет нужный "движок" (xlrd или openpyxl)
             # header=None говорит pandas не искать заголовки самостоятельно
@@ -55,14 +60,13 @@ class ExcelParser(BaseParser):
                 return pd.DataFrame()
             
             # Преобразуем в datetime и нормализуем время
-            df['datetime'] = pd.to_datetime(df['DATE'].astype(str) + ' ' + df['TIME'].astype(str))
-            t_start = df['datetime'].iloc[0]
-            df['Time'] = (df['datetime'] - t_start).dt.total_seconds()
-            
-            df.rename(columns={'VALUE': 'Temperature'}, inplace=True)
+            # (промежуточная колонка datetime в таблицу не добавляется)
+            stamps = pd.to_datetime(df['DATE'].astype(str) + ' ' + df['TIME'].astype(str))
+            time_axis = (stamps - stamps.iloc[0]).dt.total_seconds()
+            del stamps
             
             print(f"  -> Обнаружен и обработан Excel файл: {file_path}")
-            return df[['Time', 'Temperature']]
+            return pd.DataFrame({'Time': time_axis, 'Temperature': df['VALUE']})
 
         except Exception as e:
             print(f"Ошибка при парсинге Excel файла {file_path}: {e}")
@@ -2,24 +2,37 @@
 
 import pandas as pd
 from pathlib import Path
+from typing import Optional
 from .base_parser import BaseParser
+from .sniffer import SniffResult
 
 class GenericCsvParser(BaseParser):
     """
     Универсальный парсер для CSV и текстовых файлов.
-    Пытается определить разделитель автоматически.
+    Разделитель, десятичный знак и кодировка берутся из анализа начала
+    файла (sniffer); если он не помог — перебираются разделители.
     """
     
-    def can_parse(self, file_path: str) -> bool:
+    def can_parse(self, file_path: str, sniff: Optional[SniffResult] = None) -> bool:
         ext = Path(file_path).suffix.lower()
         return ext in ['.csv', '.txt', '.dat']
-        
-    def parse(self, file_path: str) -> pd.DataFrame:
+
+    def parse(self, file_path: str, sniff: Optional[SniffResult] = None) -> pd.DataFrame:
         try:
-            # Пробуем разные разделители
+            sniff = self._sniff(file_path, sniff)
+            if sniff.separator is not None:
+                # Разделитель, десятичный знак и кодировка известны — один проход по файлу
+                df = pd.read_csv(file_path, sep=sniff.separator, decimal=sniff.decimal,
+                                 encoding=sniff.encoding or 'utf-8')
+                if len(df.columns) > 1:
+                    print(f"[GenericCsvParser] Successfully parsed with separator '{sniff.separator}', "
+                          f"decimal '{sniff.decimal}'")
+                    return df
+
+            # Разделитель не определился по началу файла — пробуем разные
             for sep in [',', ';', '\t', ' ']:
                 try:
-                    df = pd.read_csv(file_path, sep=sep)
+                    df = pd.read_csv(file_path, sep=sep, encoding=sniff.encoding or 'utf-8')
                     if len(df.columns) > 1:  # Если получилось разделить на колонки
                         print(f"[GenericCsvParser] Successfully parsed with separator '{sep}'")
                         return df
@@ -6,12 +6,12 @@ class GenericCsvParser(BaseParser):
     """
     Парсер для стандартных CSV файлов. Является "запасным вариантом".
     """
-    def can_parse(self, file_path: str) -> bool:
+    def can_parse(self, file_path: str, sniff=None) -> bool:
         # Этот парсер может попытаться обработать любой файл, поэтому он всегда
         # возвращает True и должен быть последним в списке проверки.
         return True
 
-    def parse(self, file_path: str) -> pd.DataFrame:
+    def parse(self, file_path: str, sniff=None) -> pd.DataFrame:
         try:
             return pd.read_csv(file_path, sep=';', decimal=',', encoding='utf-8')
         except Exception:
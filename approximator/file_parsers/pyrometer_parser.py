@@ -3,87 +3,83 @@
 # =================================================================================
 # МОДУЛЬ ПАРСЕРА ДЛЯ ФАЙЛОВ ПИРОМЕТРА
 # ... (описание остается тем же) ...
+#   Формат ("IRTTSD" или "Start time") и кодировка берутся из анализа
+#   начала файла (sniffer), файл для проверок повторно не открывается.
+#   Таблица читается порциями прямо из открытого файла
+#   (BaseParser._read_csv_chunked), без загрузки всего файла в строку.
 # =================================================================================
 
 import pandas as pd
+from typing import Optional
 from .base_parser import BaseParser
-from io import StringIO
+from .sniffer import FORMAT_IRTTSD, FORMAT_PYROMETER_EXCEL, SniffResult
 
 class PyrometerParser(BaseParser):
     """Парсер для обработки двух форматов файлов от пирометра."""
 
-    def _get_file_content_and_type(self, file_path: str):
-        encodings_to_try = ['utf-8', 'cp1251']
-        for encoding in encodings_to_try:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    # Читаем несколько первых строк для надежности
-                    header_content = "".join(f.readlines(500)) # Читаем ~500 байт
-                
-                # Ищем ключевые слова без учета регистра
-                if "irttsd" in header_content.lower():
-                    # Если нашли, перечитываем весь файл целиком
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        return f.read(), "irttsd", encoding
-                if "start time" in header_content.lower():
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        return f.read(), "excel", encoding
-            except (UnicodeDecodeError, IndexError):
-                continue
-        return None, None, None
-
-    def can_parse(self, file_path: str) -> bool:
-        _, file_type, _ = self._get_file_content_and_type(file_path)
-        return file_type is not None
-
-    def parse(self, file_path: str) -> pd.DataFrame:
-        content, file_type, encoding = self._get_file_content_and_type(file_path)
-        
-        if not content:
+    # Формат пирометра по результату анализа начала файла -> внутренний тип
+    _FORMATS = {FORMAT_IRTTSD: "irttsd", FORMAT_PYROMETER_EXCEL: "excel"}
+
+    def can_parse(self, file_path: str, sniff: Optional[SniffResult] = None) -> bool:
+        return self._sniff(file_path, sniff).format in self._FORMATS
+
+    def parse(self, file_path: str, sniff: Optional[SniffResult] = None) -> pd.DataFrame:
+        sniff = self._sniff(file_path, sniff)
+        file_type, encoding = self._FORMATS.get(sniff.format), sniff.encoding
+
+        if not file_type:
             return pd.DataFrame()
-            
+
         try:
-            if file_type == "irttsd":
-                print(f"  -> Обнаружен формат пирометра: IRTTSD (кодировка: {encoding})")
-                return self._parse_irttsd(content)
-            elif file_type == "excel":
-                print(f"  -> Обнаружен формат пирометра: Excel-копия (кодировка: {encoding})")
-                return self._parse_excel_copy(content)
+            # Файл не читается целиком: таблица разбирается порциями из открытого файла
+            with open(file_path, 'r', encoding=encoding, errors='replace') as f:
+                if file_type == "irttsd":
+                    print(f"  -> Обнаружен формат пирометра: IRTTSD (кодировка: {encoding})")
+                    return self._parse_irttsd(f)
+                elif file_type == "excel":
+                    print(f"  -> Обнаружен формат пирометра: Excel-копия (кодировка: {encoding})")
+                    return self._parse_excel_copy(f)
             return pd.DataFrame()
         except Exception as e:
             print(f"Ошибка при парсинге файла пирометра {file_path}: {e}")
             return pd.DataFrame()
 
-    def _parse_irttsd(self, content: str) -> pd.DataFrame:
-        data = StringIO(content)
-        df = pd.read_csv(data, skiprows=4, header=None, usecols=[1, 2], sep=',')
-        df.columns = ['Timestamp_ms', 'Temperature']
-        df['Timestamp_ms'] = pd.to_numeric(df['Timestamp_ms'], errors='coerce')
-        df.dropna(inplace=True)
+    def _parse_irttsd(self, handle) -> pd.DataFrame:
+        def convert_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+            chunk.columns = ['Timestamp_ms', 'Temperature']
+            chunk['Timestamp_ms'] = pd.to_numeric(chunk['Timestamp_ms'], errors='coerce')
+            return chunk.dropna()
+
+        df = self._read_csv_chunked(handle, convert_chunk, skiprows=4, header=None, usecols=[1, 2], sep=',')
         if df.empty: return pd.DataFrame()
-        
-        t_start = df['Timestamp_ms'].iloc[0]
-        df['Time'] = (df['Timestamp_ms'] - t_start) / 1000.0
-        return df[['Time', 'Temperature']]
-
-    def _parse_excel_copy(self, content: str) -> pd.DataFrame:
-        lines = content.splitlines()
-        header_row_index = -1
-        for i, line in enumerate(lines):
-            if line.strip().upper().startswith("INDEX"):
-                header_row_index = i
-                break
-        if header_row_index == -1: return pd.DataFrame()
-
-        data_string = '\n'.join(lines[header_row_index:])
-        df = pd.read_csv(StringIO(data_string), sep='\t', decimal=',')
+
+        # Исходная колонка меток извлекается из таблицы и освобождается сразу после пересчета
+        timestamps = df.pop('Timestamp_ms')
+        time_axis = (timestamps - timestamps.iloc[0]) / 1000.0
+        del timestamps
+        return pd.DataFrame({'Time': time_axis, 'Temperature': df.pop('Temperature')})
+
+    def _parse_excel_copy(self, handle) -> pd.DataFrame:
+        header_line = self._seek_to_line(handle, lambda line: line.strip().upper().startswith("INDEX"))
+        if header_line is None: return pd.DataFrame()
+
+        column_names = header_line.rstrip('\r\n').split('\t')
         required_cols = {'DATE', 'TIME', 'VALUE'}
-        if not required_cols.issubset(df.columns): return pd.DataFrame()
+        if not required_cols.issubset(column_names): return pd.DataFrame()
+
+        def convert_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+            # Из порции сразу остаются только время и значение
+            return pd.DataFrame({
+                'datetime': pd.to_datetime(chunk['DATE'] + ' ' + chunk['TIME']),
+                'Temperature': chunk['VALUE'],
+            })
 
-        df['datetime'] = pd.to_datetime(df['DATE'] + ' ' + df['TIME'])
+        df = self._read_csv_chunked(handle, convert_chunk, sep='\t', decimal=',',
+                                    header=None, names=column_names)
         if df.empty: return pd.DataFrame()
 
-        t_start = df['datetime'].iloc[0]
-        df['Time'] = (df['datetime'] - t_start).dt.total_seconds()
-        df.rename(columns={'VALUE': 'Temperature'}, inplace=True)
-        return df[['Time', 'Temperature']]
\ No newline at end of file
+        # datetime (8 байт на отсчет) не живет дольше, чем нужно для пересчета в секунды
+        stamps = df.pop('datetime')
+        time_axis = (stamps - stamps.iloc[0]).dt.total_seconds()
+        del stamps
+        return pd.DataFrame({'Time': time_axis, 'Temperature': df.pop('Temperature')})
@@ -0,0 +1,153 @@
+# Путь: approximator/file_parsers/sniffer.py
+
+# =================================================================================
+# МОДУЛЬ ПРЕДВАРИТЕЛЬНОГО АНАЛИЗА (SNIFFING) ФАЙЛА
+#
+# НАЗНАЧЕНИЕ:
+#   Один раз прочитать начало файла и определить все, что нужно для выбора
+#   парсера и чтения данных: кодировку, формат (сигнатуру), разделитель и
+#   десятичный знак. Результат (`SniffResult`) передается в can_parse/parse,
+#   поэтому парсеры больше не открывают файл для проверок и не перебирают
+#   разделители повторными вызовами pd.read_csv.
+#
+# ЛОГИКА РАБОТЫ:
+#   1.  Читаются первые SAMPLE_BYTES байт файла (одно открытие).
+#   2.  Бинарные форматы (xls/xlsx) узнаются по сигнатуре и расширению.
+#   3.  Кодировка: BOM -> utf-8-sig, иначе строгий utf-8, иначе cp1251.
+#   4.  Формат текстового файла — по ключевым словам в начале:
+#       "TermoSoft" (АЦП), "IRTTSD" и "Start time" (пирометр).
+#   5.  Разделитель известных форматов фиксирован, для прочих — тот из [',', ';', '\t', ' '], количество которого
+#       одинаково и ненулевое во всех полных строках образца (или хотя бы
+#       во второй его половине, если у файла есть шапка); десятичная
+#       запятая — если разделитель не запятая и в числах встречается "цифра,цифра".
+#
+# =================================================================================
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+# Объем начала файла, по которому определяется формат
+SAMPLE_BYTES = 64 * 1024
+
+# Форматы
+FORMAT_ADC = "adc"
+FORMAT_IRTTSD = "irttsd"
+FORMAT_PYROMETER_EXCEL = "pyrometer_excel"
+FORMAT_EXCEL = "excel"
+FORMAT_TEXT = "text"
+
+_EXCEL_SIGNATURES = (b"PK\x03\x04", b"\xd0\xcf\x11\xe0")
+_SEPARATORS = [',', ';', '\t', ' ']
+# Разделители известных форматов
+_FORMAT_SEPARATORS = {FORMAT_ADC: '\t', FORMAT_IRTTSD: ',', FORMAT_PYROMETER_EXCEL: '\t'}
+_DECIMAL_COMMA = re.compile(r"\d,\d")
+
+
+@dataclass
+class SniffResult:
+    """Результат анализа начала файла."""
+    path: str
+    format: Optional[str] = None
+    encoding: Optional[str] = None
+    separator: Optional[str] = None
+    decimal: str = '.'
+    # Полные строки из начала файла (уже декодированные)
+    head_lines: List[str] = field(default_factory=list)
+
+    @property
+    def extension(self) -> str:
+        return Path(self.path).suffix.lower()
+
+    @property
+    def first_line(self) -> str:
+        return self.head_lines[0] if self.head_lines else ""
+
+
+def sniff_file(file_path: str, sample_bytes: int = SAMPLE_BYTES) -> SniffResult:
+    """Определяет формат, кодировку, разделитель и десятичный знак файла."""
+    result = SniffResult(path=file_path)
+    try:
+        with open(file_path, 'rb') as f:
+            sample = f.read(sample_bytes)
+            truncated = bool(f.read(1))
+    except OSError as e:
+        print(f"[sniff_file] Не удалось прочитать {file_path}: {e}")
+        return result
+
+    if sample.startswith(_EXCEL_SIGNATURES) or result.extension in ('.xls', '.xlsx'):
+        result.format = FORMAT_EXCEL
+        return result
+
+    text, result.encoding = _decode(sample, truncated)
+    if text is None:
+        return result
+    lines = text.splitlines()
+    if truncated and lines:
+        lines = lines[:-1]  # последняя строка образца может быть обрезана
+    result.head_lines = lines
+
+    head_lower = text.lower()
+    if "TermoSoft" in result.first_line:
+        result.format = FORMAT_ADC
+    elif "irttsd" in head_lower[:500]:
+        result.format = FORMAT_IRTTSD
+    elif "start time" in head_lower[:500]:
+        result.format = FORMAT_PYROMETER_EXCEL
+    else:
+        result.format = FORMAT_TEXT
+
+    data_lines = [line for line in lines if line.strip()]
+    if result.format == FORMAT_ADC:
+        # Таблица АЦП идет после маркера и строки с именами каналов
+        marker = next((i for i, line in enumerate(data_lines) if "#Tаблица:" in line), None)
+        if marker is not None:
+            data_lines = data_lines[marker + 2:]
+    if result.format in _FORMAT_SEPARATORS:
+        result.separator = _FORMAT_SEPARATORS[result.format]
+    else:
+        result.separator = _detect_separator(data_lines[:50])
+    result.decimal = _detect_decimal(data_lines[:50], result.separator)
+    return result
+
+
+def _decode(sample: bytes, truncated: bool):
+    """Декодирует образец: BOM -> utf-8-sig, затем строгий utf-8, затем cp1251."""
+    if sample.startswith(b"\xef\xbb\xbf"):
+        return sample.decode('utf-8-sig', errors='replace'), 'utf-8-sig'
+    # Обрезанный в середине многобайтный символ в конце образца — не ошибка
+    for cut in range(0, 4 if truncated else 1):
+        try:
+            return sample[:len(sample) - cut].decode('utf-8'), 'utf-8'
+        except UnicodeDecodeError:
+            continue
+    try:
+        return sample.decode('cp1251'), 'cp1251'
+    except UnicodeDecodeError:
+        return None, None
+
+
+def _detect_separator(lines: List[str]) -> Optional[str]:
+    """Разделитель с одинаковым ненулевым числом вхождений во всех строках."""
+    if not lines:
+        return None
+    for sep in _SEPARATORS:
+        counts = {line.count(sep) for line in lines}
+        if len(counts) == 1 and counts.pop() > 0:
+            return sep
+    # Шапка может отличаться от таблицы — проверяем вторую половину образца
+    body = lines[len(lines) // 2:]
+    for sep in _SEPARATORS:
+        counts = {line.count(sep) for line in body}
+        if len(counts) == 1 and counts.pop() > 0:
+            return sep
+    return None
+
+
+def _detect_decimal(lines: List[str], separator: Optional[str]) -> str:
+    if separator is None or separator == ',':
+        return '.'
+    if any(_DECIMAL_COMMA.search(line) for line in lines):
+        return ','
+    return '.'
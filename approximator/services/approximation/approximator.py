@@ -1,5 +1,6 @@
 import numpy as np
 from approximator.data_models.fit_result import FitResult
+from approximator.services.time_index import SortedTimeAxis
 
 
 class Approximator:
@@ -15,25 +16,40 @@ class Approximator:
         masks = [seg for seg in segments if seg.segment_type == "Маска"]
         
         # Создаем маску для исключения данных
+        data, time_axis = self._sort_by_time(data)
         mask = np.ones(len(data), dtype=bool)
         for mask_segment in masks:
             # Исключаем данные в диапазоне маски
-            mask_range = (data[:, 0] >= mask_segment.x_start) & (data[:, 0] <= mask_segment.x_end)
-            mask[mask_range] = False
+            i0, i1 = time_axis.row_range(mask_segment.x_start, mask_segment.x_end)
+            mask[i0:i1] = False
         
         # Применяем маску к данным
         return data[mask]
 
-    def fit_segment(self, segment, data):
+    @staticmethod
+    def _sort_by_time(data):
+        """Возвращает данные, отсортированные по времени, и ось для поиска диапазонов."""
+        axis = SortedTimeAxis(data[:, 0])
+        if axis.order is not None:
+            data = data[axis.order]
+        return data, axis
+
+    def fit_segment(self, segment, data, time_axis=None):
         """
         Аппроксимирует данные для одного сегмента с учетом масок.
+        time_axis — ось времени, построенная для data (если данные уже отсортированы).
         """
         if segment.segment_type == "Маска":
             return None  # Маски не аппроксимируются
-            
-        # Получаем данные в диапазоне сегмента
-        mask = (data[:, 0] >= segment.x_start) & (data[:, 0] <= segment.x_end)
-        segment_data = data[mask]
+
+        if not isinstance(data, np.ndarray):
+            data = np.array(data)
+        if time_axis is None:
+            data, time_axis = self._sort_by_time(data)
+
+        # Получаем данные в диапазоне сегмента (срез без копирования)
+        i0, i1 = time_axis.row_range(segment.x_start, segment.x_end)
+        segment_data = data[i0:i1]
         
         if len(segment_data) < segment.poly_degree + 1:
             return None
@@ -68,15 +84,17 @@ class Approximator:
         Аппроксимирует данные для всех сегментов с учетом масок.
         """
         # Подготавливаем данные, исключая области масок
+        # (результат уже отсортирован по времени)
         filtered_data = self.prepare_data_for_fitting(data, segments)
-        
+        time_axis = SortedTimeAxis.from_sorted(filtered_data[:, 0])
+
         results = []
         for segment in segments:
             if segment.segment_type == "Маска":
                 results.append(None)
                 continue
                 
-            result = self.fit_segment(segment, filtered_data)
+            result = self.fit_segment(segment, filtered_data, time_axis)
             results.append(result)
             
         return results
\ No newline at end of file
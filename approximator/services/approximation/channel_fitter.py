@@ -0,0 +1,138 @@
+# Путь: services/approximation/channel_fitter.py
+# =================================================================================
+# МОДУЛЬ АППРОКСИМАЦИИ СЕГМЕНТОВ КАНАЛА
+#
+# НАЗНАЧЕНИЕ:
+#   Общий (не зависящий от Qt) конвейер "снимок сегментов -> расчет ->
+#   применение результатов". Используется и синхронно (живое перетаскивание
+#   границ), и из фонового планировщика.
+#
+# ЛОГИКА РАБОТЫ:
+#   1.  `collect_jobs` делает неизменяемый снимок сегментов (границы, степень,
+#       тип и ключ кеша) — его можно безопасно отдать в другой поток.
+#   2.  `run_jobs` считает FitResult для каждого задания по компактным
+#       массивам канала (время, значение); между сегментами проверяет отмену.
+#   3.  `apply_results` записывает результаты в сегменты, только если сегмент
+#       не изменился с момента снимка (ключ совпадает). Устаревшие результаты
+#       отбрасываются.
+#
+# =================================================================================
+
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from approximator.data_models.channel_state import ChannelState
+from approximator.data_models.fit_result import FitResult
+from approximator.services.time_index import SortedTimeAxis
+
+
+@dataclass(frozen=True)
+class SegmentFitJob:
+    """Снимок сегмента для расчета."""
+    index: int
+    label: str
+    x_start: float
+    x_end: float
+    poly_degree: int
+    is_mask: bool
+    key: tuple
+
+
+# (индекс сегмента, ключ кеша, результат или None)
+SegmentFitOutcome = Tuple[int, tuple, Optional[FitResult]]
+
+
+def collect_jobs(channel_state: ChannelState, data_version: int,
+                 indices: Optional[Iterable[int]] = None,
+                 time_column: Optional[str] = None) -> List[SegmentFitJob]:
+    """
+    Снимок указанных (по умолчанию — всех) сегментов канала.
+    time_column — колонка времени данных расчета (входит в ключ кеша).
+    """
+    segments = channel_state.segments
+    if indices is None:
+        indices = range(len(segments))
+    jobs = []
+    for i in indices:
+        if not 0 <= i < len(segments):
+            continue
+        seg = segments[i]
+        jobs.append(SegmentFitJob(
+            index=i,
+            label=seg.label,
+            x_start=seg.x_start,
+            x_end=seg.x_end,
+            poly_degree=seg.poly_degree,
+            is_mask=seg.segment_type == "Маска",
+            key=channel_state.fit_key(seg, data_version, time_column)
+        ))
+    return jobs
+
+
+def run_jobs(jobs: List[SegmentFitJob], x_data, y_data, fitter,
+             should_cancel: Optional[Callable[[], bool]] = None,
+             progress: Optional[Callable[[int, int], None]] = None) -> Optional[List[SegmentFitOutcome]]:
+    """
+    Аппроксимирует сегменты по отсортированным массивам канала без NaN.
+    Возвращает None, если расчет был отменен.
+    """
+    axis = SortedTimeAxis.from_sorted(x_data)
+    x_data = axis.time
+
+    # Фиттер по моментам (MomentFitter) готовит итоги блоков канала один раз
+    prepare = getattr(fitter, 'prepare', None)
+    if prepare is not None and jobs:
+        prepare(x_data, y_data)
+
+    results = []
+    total = len(jobs)
+    for done, job in enumerate(jobs, start=1):
+        if should_cancel is not None and should_cancel():
+            return None
+        results.append((job.index, job.key, fit_job(job, axis, x_data, y_data, fitter)))
+        if progress is not None:
+            progress(done, total)
+    return results
+
+
+def fit_job(job: SegmentFitJob, axis: SortedTimeAxis, x_data, y_data, fitter) -> Optional[FitResult]:
+    """Аппроксимирует один сегмент (срезы массивов канала без копирования)."""
+    if job.is_mask:
+        print(f"  - Segment {job.label} is masked, skipping")
+        return None
+
+    i0, i1 = axis.row_range(job.x_start, job.x_end)
+    if i1 - i0 < job.poly_degree + 1:
+        print(f"  - Segment {job.label} has too few points ({i1 - i0}) for degree {job.poly_degree}, skipping")
+        return None
+
+    print(f"  - Fitting segment {job.label} with {i1 - i0} points, degree {job.poly_degree}")
+    try:
+        fit_result = fitter.fit(x_data[i0:i1], y_data[i0:i1], job.poly_degree)
+        if fit_result:
+            print(f"    R² = {fit_result.r_squared:.4f}, RMSE = {fit_result.rmse:.4f}")
+        return fit_result
+    except Exception as e:
+        print(f"    Error fitting segment: {e}")
+        return None
+
+
+def apply_results(channel_state: ChannelState, data_version: int,
+                  results: List[SegmentFitOutcome], time_column: Optional[str] = None) -> List[int]:
+    """
+    Записывает результаты в сегменты, которые не менялись с момента снимка
+    (и данные которых не заменялись). Возвращает индексы обновленных сегментов.
+    """
+    applied = []
+    segments = channel_state.segments
+    for index, key, fit_result in results:
+        if index >= len(segments):
+            continue
+        seg = segments[index]
+        # Ключ пересчитывается по текущему состоянию сегмента
+        if channel_state.fit_key(seg, data_version, time_column) != key:
+            continue
+        seg.fit_result = fit_result
+        seg.fit_key = key
+        applied.append(index)
+    return applied
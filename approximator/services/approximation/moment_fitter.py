@@ -0,0 +1,301 @@
+# Путь: services/approximation/moment_fitter.py
+# =================================================================================
+# МОДУЛЬ АППРОКСИМАЦИИ ПО ДОСТАТОЧНЫМ СТАТИСТИКАМ (БЛОЧНЫЕ МОМЕНТЫ)
+#
+# НАЗНАЧЕНИЕ:
+#   Пересчет полинома для любого сегмента канала без прохода по всем его
+#   точкам. Нужен при перетаскивании границ, когда один и тот же канал
+#   аппроксимируется десятки раз в секунду.
+#
+# ЛОГИКА РАБОТЫ:
+#   1.  `prepare(x, y)` один раз на канал делит строки на блоки по
+#       BLOCK_ROWS точек. У каждого блока свой центр и масштаб:
+#       v = (x - c_b) / s_b, v ∈ [-1, 1]; значения центрируются: y' = y - ȳ.
+#   2.  Для каждого блока лениво (до нужной степени) хранятся только итоги
+#       Σv^k (k ≤ 2d), Σv^k·y' (k ≤ d) и Σy'² — (3d+3) чисел на блок
+#       вместо (3d+2)·N префиксных сумм по всем точкам.
+#   3.  `fit_range(i0, i1, degree)` работает в локальном базисе сегмента
+#       w = (x - m) / h, w ∈ [-1, 1]. Итоги полных блоков переводятся в этот
+#       базис биномиальным преобразованием w = α + β·v; так как блок лежит
+#       внутри сегмента, |α| ≤ 1 и |β| ≤ 1, и ошибка округления не
+#       усиливается. Неполные крайние блоки (не больше 2·BLOCK_ROWS точек)
+#       суммируются по точкам. Затем решаются нормальные уравнения, RMSE и
+#       R² считаются из тех же моментов.
+#   4.  Если оценка погрешности слишком велика (высокая степень), выполняется
+#       обычный np.polyfit по точкам сегмента. Счетчики moment_fits и
+#       fallback_fits показывают, какой путь был выбран
+#       (benchmarks/bench_moment_fitter.py).
+#
+# =================================================================================
+
+from functools import lru_cache
+from math import comb
+from typing import Optional
+
+import numpy as np
+
+from approximator.data_models.fit_result import FitResult
+from approximator.services.approximation.polynomial_fitter import PolynomialFitter
+
+
+@lru_cache(maxsize=None)
+def _binomial(size: int) -> np.ndarray:
+    """Нижнетреугольная матрица C(k, j), k, j < size (только для чтения)."""
+    table = np.array([[comb(k, j) for j in range(size)] for k in range(size)], dtype=np.float64)
+    table.flags.writeable = False
+    return table
+
+
+def _powers(value: float, size: int) -> np.ndarray:
+    """Матрица value^(k-j) для k ≥ j (нули выше диагонали)."""
+    k = np.arange(size)
+    exponent = k[:, None] - k[None, :]
+    return np.where(exponent >= 0, float(value) ** np.maximum(exponent, 0), 0.0)
+
+
+class MomentFitter(PolynomialFitter):
+    """
+    Полиномиальная аппроксимация через блочные моменты.
+    Совместима с PolynomialFitter: fit(x, y, degree) -> FitResult.
+    """
+
+    # Точек в блоке: сегмент стоит O((N/BLOCK_ROWS)·d² + BLOCK_ROWS·d)
+    BLOCK_ROWS = 1024
+    # Блоков в одной группе при подготовке (временная память ~3·256K float64)
+    CHUNK_BLOCKS = 256
+    # Допустимая оценка относительной погрешности решения; выше — np.polyfit.
+    MAX_RELATIVE_ERROR = 1e-7
+    # Если остаток на столько порядков меньше Σy'², разность моментов теряет
+    # точность — остатки считаются по точкам.
+    MIN_RESIDUAL_RATIO = 1e-8
+
+    def __init__(self):
+        self._source = None
+        self._x: Optional[np.ndarray] = None
+        self._y: Optional[np.ndarray] = None
+        self._y_mean = 0.0
+        self._block_center: Optional[np.ndarray] = None  # (блоков,)
+        self._block_scale: Optional[np.ndarray] = None   # (блоков,)
+        self._v_sums: Optional[np.ndarray] = None        # (блоков, k): Σv^k по блоку
+        self._vy_sums: Optional[np.ndarray] = None       # (блоков, k): Σv^k·y' по блоку
+        self._yy_sums: Optional[np.ndarray] = None       # (блоков,): Σy'² по блоку
+        self.moment_fits = 0
+        self.fallback_fits = 0
+
+    # --- Подготовка канала ---
+
+    def release(self):
+        """
+        Отпускает массивы канала (например, отображенные из файла, который
+        сейчас будет перезаписан). Следующая аппроксимация снова вызовет prepare.
+        """
+        self._source = None
+        self._x = self._y = None
+
+    def prepare(self, x_data, y_data):
+        """
+        Запоминает данные канала (отсортированные по времени, без NaN).
+        Повторный вызов с теми же массивами ничего не пересчитывает.
+        """
+        if self._source is not None and x_data is self._source[0] and y_data is self._source[1]:
+            return
+        x = np.ascontiguousarray(x_data, dtype=np.float64)
+        # Значения float32 (компактный режим) не копируются целиком в float64:
+        # в float64 переводятся только отдельные блоки при суммировании
+        y = np.ascontiguousarray(y_data) if np.asarray(y_data).dtype == np.float32 \
+            else np.ascontiguousarray(y_data, dtype=np.float64)
+        if x.ndim != 1 or x.shape != y.shape:
+            raise ValueError("x и y должны быть одномерными массивами одинаковой длины")
+
+        self._source = (x_data, y_data)
+        self._x, self._y = x, y
+        self._y_mean = float(np.mean(y, dtype=np.float64)) if x.size else 0.0
+
+        starts = np.arange(0, x.size, self.BLOCK_ROWS)
+        ends = np.minimum(starts + self.BLOCK_ROWS, x.size) - 1
+        lo, hi = x[starts], x[ends]
+        self._block_center = (lo + hi) / 2
+        self._block_scale = (hi - lo) / 2
+        self._block_scale[self._block_scale <= 0] = 1.0
+        self._v_sums = np.zeros((starts.size, 0))
+        self._vy_sums = np.zeros((starts.size, 0))
+        self._yy_sums = np.zeros(starts.size)
+        for blocks, _, yc, _ in self._blocks():
+            self._yy_sums[blocks] = np.einsum('ij,ij->i', yc, yc)
+
+    def _blocks(self):
+        """
+        Группы блоков в собственном базисе: (срез блоков, v, y', маска),
+        массивы формы (блоков, BLOCK_ROWS). Хвост последнего блока дополнен
+        нулями (маска 0), временная память ограничена CHUNK_BLOCKS блоками.
+        """
+        step, total = self.BLOCK_ROWS, self._x.size
+        for b0 in range(0, self._block_center.size, self.CHUNK_BLOCKS):
+            b1 = min(b0 + self.CHUNK_BLOCKS, self._block_center.size)
+            r0, r1 = b0 * step, min(b1 * step, total)
+            shape = (b1 - b0, step)
+            v, yc, mask = np.zeros(shape), np.zeros(shape), np.zeros(shape)
+            v.ravel()[:r1 - r0] = self._x[r0:r1]
+            v -= self._block_center[b0:b1, None]
+            v /= self._block_scale[b0:b1, None]
+            np.subtract(self._y[r0:r1], self._y_mean, out=yc.ravel()[:r1 - r0], dtype=np.float64)
+            mask.ravel()[:r1 - r0] = 1.0
+            v *= mask
+            yield slice(b0, b1), v, yc, mask
+
+    def _ensure_degree(self, degree: int):
+        """Достраивает итоги блоков до нужной степени."""
+        need_v, need_vy = 2 * degree + 1, degree + 1
+        have_v, have_vy = self._v_sums.shape[1], self._vy_sums.shape[1]
+        if have_v >= need_v and have_vy >= need_vy:
+            return
+        v_sums = np.zeros((self._block_center.size, need_v))
+        vy_sums = np.zeros((self._block_center.size, need_vy))
+        v_sums[:, :have_v] = self._v_sums
+        vy_sums[:, :have_vy] = self._vy_sums
+        for blocks, v, yc, power in self._blocks():
+            for k in range(need_v):
+                if k >= have_v:
+                    v_sums[blocks, k] = power.sum(axis=1)
+                if have_vy <= k < need_vy:
+                    vy_sums[blocks, k] = np.einsum('ij,ij->i', power, yc)
+                power *= v
+        self._v_sums, self._vy_sums = v_sums, vy_sums
+
+    # --- Аппроксимация ---
+
+    def fit(self, x_data, y_data, degree: int) -> Optional[FitResult]:
+        """
+        Аппроксимирует данные полиномом заданной степени.
+        Если x/y — срезы подготовленного канала, используются моменты блоков.
+        """
+        rows = self._row_range_of(x_data, y_data)
+        if rows is not None:
+            return self.fit_range(rows[0], rows[1], degree)
+        return super().fit(x_data, y_data, degree)
+
+    def fit_range(self, i0: int, i1: int, degree: int) -> Optional[FitResult]:
+        """Аппроксимирует строки [i0, i1) подготовленного канала."""
+        if self._x is None:
+            raise RuntimeError("MomentFitter.prepare() не был вызван")
+        n = i1 - i0
+        if n < degree + 1:
+            return None
+        try:
+            result = self._fit_from_moments(i0, i1, degree)
+        except np.linalg.LinAlgError:
+            result = None
+        if result is None:
+            self.fallback_fits += 1
+            return super().fit(self._x[i0:i1], self._y[i0:i1], degree)
+        self.moment_fits += 1
+        return result
+
+    def _fit_from_moments(self, i0: int, i1: int, degree: int) -> Optional[FitResult]:
+        n = i1 - i0
+        # Локальный базис сегмента: x = mid + half·w, w ∈ [-1, 1]
+        x_lo, x_hi = self._x[i0], self._x[i1 - 1]
+        mid, half = (x_lo + x_hi) / 2, (x_hi - x_lo) / 2
+        if half <= 0:
+            return None
+
+        s_w, t_w, syy = self._segment_moments(i0, i1, degree, mid, half)
+
+        gram = s_w[np.add.outer(np.arange(degree + 1), np.arange(degree + 1))]
+        # Оценка погрешности: в базисе [-1, 1] биномиальные коэффициенты
+        # дают не больше 4^d, остальное — обусловленность матрицы.
+        eps = np.finfo(np.float64).eps
+        error = eps * 4.0 ** degree * np.linalg.cond(gram)
+        if not np.isfinite(error) or error > self.MAX_RELATIVE_ERROR:
+            return None
+
+        beta = np.linalg.solve(gram, t_w)
+
+        # Остатки и метрики из моментов
+        ss_res = syy - float(beta @ t_w)
+        if ss_res < self.MIN_RESIDUAL_RATIO * syy:
+            w = (self._x[i0:i1] - mid) / half
+            residual = np.subtract(self._y[i0:i1], self._y_mean, dtype=np.float64)
+            residual -= np.polynomial.polynomial.polyval(w, beta)
+            ss_res = float(residual @ residual)
+        sy = t_w[0]
+        ss_tot = max(syy - sy * sy / n, 0.0)
+        rmse = np.sqrt(max(ss_res, 0.0) / n)
+        r_squared = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
+
+        # Переход к коэффициентам по x (как у np.polyfit: от старшей степени)
+        # p(x) = Σ β_k·((x - m) / h)^k = Σ_j x^j · Σ_k β_k·C(k, j)·(-m)^(k-j) / h^k
+        beta = beta / half ** np.arange(degree + 1)
+        beta[0] += self._y_mean
+        coeffs = (_binomial(degree + 1) * _powers(-mid, degree + 1)).T @ beta
+        coeffs = coeffs[::-1]
+
+        return FitResult(
+            coefficients=tuple(coeffs),
+            rmse=rmse,
+            r_squared=r_squared,
+            points_count=n
+        )
+
+    def _segment_moments(self, i0: int, i1: int, degree: int, mid: float, half: float):
+        """Σw^k (k ≤ 2d), Σw^k·y' (k ≤ d) и Σy'² строк [i0, i1) в базисе w."""
+        k_v, k_vy = 2 * degree + 1, degree + 1
+        step = self.BLOCK_ROWS
+        b0 = -(-i0 // step)          # первый полный блок
+        b1 = max(i1 // step, b0)     # за последним полным блоком
+        s_w, t_w = np.zeros(k_v), np.zeros(k_vy)
+        syy = 0.0
+
+        # Полные блоки: w = α + β·v, Σw^k = Σ_j C(k, j)·α^(k-j)·β^j·Σv^j
+        if b1 > b0:
+            self._ensure_degree(degree)
+            alpha = (self._block_center[b0:b1] - mid) / half
+            beta = self._block_scale[b0:b1] / half
+            powers = np.arange(k_v)
+            alpha_pow = alpha[:, None] ** powers
+            beta_pow = beta[:, None] ** powers
+            k_idx, j_idx = np.tril_indices(k_v)
+            shift = np.zeros((b1 - b0, k_v, k_v))
+            shift[:, k_idx, j_idx] = (_binomial(k_v)[k_idx, j_idx]
+                                      * alpha_pow[:, k_idx - j_idx] * beta_pow[:, j_idx])
+            s_w += np.einsum('bkj,bj->k', shift, self._v_sums[b0:b1, :k_v])
+            t_w += np.einsum('bkj,bj->k', shift[:, :k_vy, :k_vy], self._vy_sums[b0:b1, :k_vy])
+            syy += float(self._yy_sums[b0:b1].sum())
+
+        # Неполные крайние блоки — по точкам
+        edges = ((i0, min(b0 * step, i1)), (max(b1 * step, i0), i1)) if b1 > b0 else ((i0, i1),)
+        for r0, r1 in edges:
+            if r1 <= r0:
+                continue
+            w = (self._x[r0:r1] - mid) / half
+            yc = np.subtract(self._y[r0:r1], self._y_mean, dtype=np.float64)
+            power = np.ones_like(w)
+            for k in range(k_v):
+                s_w[k] += power.sum()
+                if k < k_vy:
+                    t_w[k] += power @ yc
+                power *= w
+            syy += float(yc @ yc)
+        return s_w, t_w, syy
+
+    def _row_range_of(self, x_data, y_data):
+        """Если x/y — непрерывные срезы подготовленных массивов, возвращает (i0, i1)."""
+        if self._x is None or not isinstance(x_data, np.ndarray) or not isinstance(y_data, np.ndarray):
+            return None
+        base_x, base_y = self._x, self._y
+        if x_data.dtype != base_x.dtype or y_data.dtype != base_y.dtype or x_data.size != y_data.size:
+            return None
+        x_item, y_item = base_x.itemsize, base_y.itemsize
+        if x_data.size == 0 or x_data.strides != (x_item,) or y_data.strides != (y_item,):
+            return None
+        if base_x.strides != (x_item,) or base_y.strides != (y_item,):
+            return None
+        offset_x = x_data.ctypes.data - base_x.ctypes.data
+        offset_y = y_data.ctypes.data - base_y.ctypes.data
+        if offset_x % x_item or offset_y % y_item or offset_x // x_item != offset_y // y_item:
+            return None
+        i0 = offset_x // x_item
+        i1 = i0 + x_data.size
+        if i0 < 0 or i1 > base_x.size:
+            return None
+        return i0, i1
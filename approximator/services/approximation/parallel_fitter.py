@@ -0,0 +1,171 @@
+# Путь: services/approximation/parallel_fitter.py
+# =================================================================================
+# МОДУЛЬ ПАРАЛЛЕЛЬНОЙ АППРОКСИМАЦИИ ВСЕХ КАНАЛОВ
+#
+# НАЗНАЧЕНИЕ:
+#   Режим "рассчитать все каналы": каналы раздаются по процессам, чтобы
+#   расчет масштабировался по числу ядер.
+#
+# ЛОГИКА РАБОТЫ:
+#   1.  Компактные массивы каналов (время, значения без NaN — см.
+#       TimeIndex.channel_arrays) копируются в разделяемую память
+#       (multiprocessing.shared_memory). Одинаковые массивы времени
+#       (общая ось таблицы) копируются один раз. Для таблиц, пересчитанных
+#       на сетку, это исходные отсчеты каналов.
+#   2.  Рабочему процессу передаются только имена буферов, их длина и
+#       снимок сегментов канала (SegmentFitJob). Данные он читает из
+#       разделяемой памяти без копирования через pickle.
+#   3.  Процесс возвращает результаты (индекс, ключ, FitResult) и время
+#       расчета. Запись в ChannelState.segments выполняет вызывающий
+#       (через apply_results), поэтому устаревшие результаты отбрасываются.
+#
+# =================================================================================
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from approximator.data_models.channel_state import ChannelState
+from approximator.services.approximation.channel_fitter import (
+    SegmentFitOutcome, apply_results, collect_jobs, run_jobs
+)
+
+
+@dataclass
+class ChannelFitReport:
+    """Отчет по одному каналу."""
+    channel: str
+    segments: int
+    points: int
+    seconds: float
+    applied: int = 0
+
+
+class _SharedArray:
+    """Массив float64/float32 в разделяемой памяти (создается в родительском процессе)."""
+
+    def __init__(self, values: np.ndarray):
+        self.size = values.size
+        self.dtype = values.dtype.str
+        self._shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=self._shm.buf)[:] = values
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def release(self):
+        self._shm.close()
+        self._shm.unlink()
+
+
+def _fit_channel_worker(channel_name: str, time_name: str, values_name: str, size: int, jobs,
+                        values_dtype: str = '<f8'):
+    """Выполняется в рабочем процессе."""
+    started = time.perf_counter()
+    time_shm = shared_memory.SharedMemory(name=time_name)
+    values_shm = shared_memory.SharedMemory(name=values_name)
+    try:
+        results, points = _fit_shared(time_shm, values_shm, size, jobs, values_dtype)
+    finally:
+        time_shm.close()
+        values_shm.close()
+    return channel_name, results, points, time.perf_counter() - started
+
+
+def _fit_shared(time_shm, values_shm, size, jobs, values_dtype):
+    # Все представления буферов живут только внутри этой функции,
+    # иначе close() разделяемой памяти завершится ошибкой
+    from approximator.services.approximation.moment_fitter import MomentFitter
+
+    # Массивы уже компактные (без NaN) — см. TimeIndex.channel_arrays
+    x_data = np.ndarray((size,), dtype=np.float64, buffer=time_shm.buf)
+    # Значения в компактном режиме — float32, аппроксимация сама переводит участки в float64
+    y_data = np.ndarray((size,), dtype=np.dtype(values_dtype), buffer=values_shm.buf)
+    results = run_jobs(jobs, x_data, y_data, MomentFitter())
+    return results, int(x_data.size)
+
+
+def fit_channels_parallel(time_index, channel_states: Dict[str, ChannelState], data_version: int,
+                          max_workers: Optional[int] = None,
+                          progress: Optional[Callable[[int, int], None]] = None,
+                          should_cancel: Optional[Callable[[], bool]] = None,
+                          force: bool = False
+                          ) -> Optional[Tuple[Dict[str, List[SegmentFitOutcome]], List[ChannelFitReport]]]:
+    """
+    Аппроксимирует сегменты всех каналов в пуле процессов.
+    По умолчанию пересчитываются только "грязные" сегменты (force — все).
+    Возвращает (результаты по каналам, отчеты) или None при отмене.
+    """
+    tasks = {}
+    for name, channel_state in channel_states.items():
+        indices = None if force else channel_state.dirty_segment_indices(data_version, time_index.time_column)
+        jobs = collect_jobs(channel_state, data_version, indices, time_index.time_column)
+        if jobs:
+            tasks[name] = jobs
+    if not tasks:
+        return {}, []
+
+    time_buffers: Dict[int, _SharedArray] = {}
+    value_buffers = {}
+    results: Dict[str, List[SegmentFitOutcome]] = {}
+    reports: List[ChannelFitReport] = []
+    workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+    # spawn: GUI-процесс многопоточный, fork в нем небезопасен
+    context = multiprocessing.get_context("spawn")
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    try:
+        futures = []
+        for name, jobs in tasks.items():
+            x_data, y_data = time_index.channel_arrays(name)
+            if id(x_data) not in time_buffers:
+                time_buffers[id(x_data)] = _SharedArray(x_data)
+            time_buffer = time_buffers[id(x_data)]
+            value_buffers[name] = _SharedArray(y_data)
+            futures.append(executor.submit(
+                _fit_channel_worker, name, time_buffer.name, value_buffers[name].name,
+                time_buffer.size, jobs, value_buffers[name].dtype
+            ))
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            if should_cancel is not None and should_cancel():
+                executor.shutdown(wait=False, cancel_futures=True)
+                return None
+            name, channel_results, points, seconds = future.result()
+            results[name] = channel_results
+            reports.append(ChannelFitReport(name, len(channel_results), points, seconds))
+            if progress is not None:
+                progress(done, len(futures))
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        for buffer in list(time_buffers.values()) + list(value_buffers.values()):
+            buffer.release()
+
+    reports.sort(key=lambda r: list(tasks).index(r.channel))
+    return results, reports
+
+
+def apply_channel_results(channel_states: Dict[str, ChannelState], data_version: int,
+                          results: Dict[str, List[SegmentFitOutcome]],
+                          reports: List[ChannelFitReport],
+                          time_column: Optional[str] = None) -> List[ChannelFitReport]:
+    """Записывает результаты в каналы; в отчетах отмечается число примененных сегментов."""
+    for report in reports:
+        channel_state = channel_states.get(report.channel)
+        if channel_state is not None:
+            report.applied = len(apply_results(channel_state, data_version, results.get(report.channel, []),
+                                               time_column))
+    return reports
+
+
+def print_report(reports: List[ChannelFitReport], wall_seconds: float):
+    """Печатает время расчета по каналам."""
+    print(f"[fit_all_channels] {len(reports)} каналов за {wall_seconds:.2f} с")
+    for r in reports:
+        print(f"  - {r.channel}: {r.segments} сегм., {r.points} точек, {r.seconds * 1000:.1f} мс")
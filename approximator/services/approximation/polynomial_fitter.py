@@ -12,6 +12,9 @@ class PolynomialFitter:
         """Аппроксимирует данные полиномом заданной степени."""
         if len(x_data) < degree + 1:
             return None
+        # Компактные (float32) данные переводятся в float64 только для этого участка
+        x_data = np.asarray(x_data, dtype=np.float64)
+        y_data = np.asarray(y_data, dtype=np.float64)
             
         try:
             coeffs = np.polyfit(x_data, y_data, degree)
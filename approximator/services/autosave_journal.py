@@ -0,0 +1,208 @@
+# Путь: approximator/services/autosave_journal.py
+# =================================================================================
+# МОДУЛЬ ЖУРНАЛА АВТОСОХРАНЕНИЯ
+#
+# НАЗНАЧЕНИЕ:
+#   Автосохранение без полной перезаписи проекта: в журнал дописываются
+#   только изменения (сегмент добавлен/сдвинут/пересчитан, изменена
+#   настройка канала или проекта). После сбоя состояние восстанавливается
+#   из последнего снимка и журнала изменений после него.
+#
+# ЛОГИКА РАБОТЫ:
+#   1.  Состояние — словарь в формате файла проекта
+#       (ProjectStateController._extract_state): imported_files, settings,
+#       channels.
+#   2.  `diff_states` сравнивает прежнее и текущее состояние и выдает
+#       компактные записи:
+#       - "files"            — список файлов;
+#       - "settings"         — измененные настройки проекта;
+#       - "channel"          — новый канал целиком;
+#       - "channel_removed"  — канал удален;
+#       - "channel_settings" — измененные поля канала (кроме сегментов);
+#       - "segment"          — один сегмент (по номеру) изменен или пересчитан;
+#       - "segments"         — число сегментов изменилось: список целиком.
+#       Каждая запись задает значение, а не приращение, поэтому повторное
+#       применение записи ничего не портит.
+#   3.  `append` дописывает записи в journal.jsonl (одна строка JSON на
+#       запись) и сбрасывает их на диск.
+#   4.  `write_snapshot` пишет snapshot.json через временный файл и
+#       os.replace, затем так же атомарно очищает журнал. Сбой между этими
+#       шагами безопасен: журнал просто применится к новому снимку еще раз.
+#   5.  `load` читает снимок и применяет журнал (`apply_record`);
+#       недописанная последняя строка (сбой во время записи) пропускается.
+#
+# =================================================================================
+
+import json
+import os
+import time
+import uuid
+from typing import List, Optional
+
+SNAPSHOT_FILE = "snapshot.json"
+JOURNAL_FILE = "journal.jsonl"
+
+# Сегменты канала сравниваются по одному, остальные поля — как настройки
+_SEGMENTS_KEY = 'segments'
+# Отличает отсутствующий ключ от ключа со значением None
+_MISSING = object()
+
+
+def diff_states(previous: Optional[dict], current: dict) -> List[dict]:
+    """Записи журнала, переводящие previous в current."""
+    previous = previous or {}
+    records = []
+    if previous.get('imported_files') != current.get('imported_files'):
+        records.append({'op': 'files', 'files': current.get('imported_files', [])})
+
+    old_settings, new_settings = previous.get('settings', {}), current.get('settings', {})
+    changed = {k: v for k, v in new_settings.items() if old_settings.get(k, _MISSING) != v}
+    if changed:
+        records.append({'op': 'settings', 'values': changed})
+
+    old_channels, new_channels = previous.get('channels', {}), current.get('channels', {})
+    for name in old_channels:
+        if name not in new_channels:
+            records.append({'op': 'channel_removed', 'channel': name})
+    for name, channel in new_channels.items():
+        old = old_channels.get(name)
+        if old is None:
+            records.append({'op': 'channel', 'channel': name, 'data': channel})
+            continue
+        fields = {k: v for k, v in channel.items() if k != _SEGMENTS_KEY and old.get(k, _MISSING) != v}
+        if fields:
+            records.append({'op': 'channel_settings', 'channel': name, 'values': fields})
+        old_segments, new_segments = old.get(_SEGMENTS_KEY, []), channel.get(_SEGMENTS_KEY, [])
+        if len(old_segments) != len(new_segments):
+            records.append({'op': 'segments', 'channel': name, 'segments': new_segments})
+            continue
+        for index, (old_segment, segment) in enumerate(zip(old_segments, new_segments)):
+            if old_segment != segment:
+                records.append({'op': 'segment', 'channel': name, 'index': index, 'data': segment})
+    return records
+
+
+def apply_record(state: dict, record: dict):
+    """Применяет одну запись журнала к состоянию (на месте)."""
+    op = record.get('op')
+    channels = state.setdefault('channels', {})
+    if op == 'files':
+        state['imported_files'] = list(record['files'])
+    elif op == 'settings':
+        state.setdefault('settings', {}).update(record['values'])
+    elif op == 'channel':
+        channels[record['channel']] = record['data']
+    elif op == 'channel_removed':
+        channels.pop(record['channel'], None)
+    elif op == 'channel_settings':
+        channels.setdefault(record['channel'], {}).update(record['values'])
+    elif op == 'segments':
+        channels.setdefault(record['channel'], {})[_SEGMENTS_KEY] = record['segments']
+    elif op == 'segment':
+        segments = channels.setdefault(record['channel'], {}).setdefault(_SEGMENTS_KEY, [])
+        if record['index'] < len(segments):
+            segments[record['index']] = record['data']
+    else:
+        print(f"[AutosaveJournal] ⚠️ Неизвестная запись журнала: {op}")
+
+
+class AutosaveJournal:
+    """Снимок состояния + журнал изменений после него в одной папке."""
+
+    # Журнал сворачивается в снимок после стольких записей
+    DEFAULT_COMPACT_RECORDS = 500
+
+    def __init__(self, directory: str, compact_records: int = DEFAULT_COMPACT_RECORDS):
+        self.directory = directory
+        self.compact_records = compact_records
+        self.records_since_snapshot = 0
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.directory, SNAPSHOT_FILE)
+
+    @property
+    def journal_path(self) -> str:
+        return os.path.join(self.directory, JOURNAL_FILE)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.snapshot_path) or os.path.exists(self.journal_path)
+
+    def needs_compaction(self) -> bool:
+        return self.records_since_snapshot >= self.compact_records
+
+    # --- Запись ---
+
+    def append(self, records: List[dict]):
+        """Дописывает записи в журнал и сбрасывает их на диск."""
+        if not records:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.time()
+        lines = ''.join(json.dumps({**record, 'ts': stamp}, ensure_ascii=False, separators=(',', ':')) + '\n'
+                        for record in records)
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self.records_since_snapshot += len(records)
+
+    def write_snapshot(self, state: dict):
+        """Атомарно записывает снимок и очищает журнал."""
+        os.makedirs(self.directory, exist_ok=True)
+        _write_atomic(self.snapshot_path, json.dumps(state, ensure_ascii=False, separators=(',', ':')))
+        _write_atomic(self.journal_path, '')
+        self.records_since_snapshot = 0
+
+    def clear(self):
+        for path in (self.snapshot_path, self.journal_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.records_since_snapshot = 0
+
+    # --- Чтение ---
+
+    def load(self) -> Optional[dict]:
+        """Состояние из снимка и журнала (None — автосохранения нет)."""
+        if not self.exists():
+            return None
+        state = {}
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            print(f"[AutosaveJournal] ⚠️ Поврежденный снимок {self.snapshot_path}: {e}")
+
+        applied = 0
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Недописанная строка (сбой во время записи) — дальше данных нет
+                        break
+                    apply_record(state, record)
+                    applied += 1
+        except FileNotFoundError:
+            pass
+        self.records_since_snapshot = applied
+        print(f"[AutosaveJournal] 🔁 Восстановлено: снимок + {applied} записей журнала")
+        return state or None
+
+
+def _write_atomic(path: str, text: str):
+    tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
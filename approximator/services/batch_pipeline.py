@@ -0,0 +1,318 @@
+# Путь: approximator/services/batch_pipeline.py
+# =================================================================================
+# МОДУЛЬ ПАКЕТНОЙ ОБРАБОТКИ (БЕЗ GUI)
+#
+# НАЗНАЧЕНИЕ:
+#   Обработка множества прогонов (плавок) без окна приложения:
+#   разбор файлов -> объединение -> аппроксимация по шаблону сегментов ->
+#   экспорт. Запуск: python -m approximator batch (см. approximator/__main__.py).
+#   Модуль не импортирует Qt.
+#
+# ЛОГИКА РАБОТЫ:
+#   1.  Прогон (`BatchRun`) — папка (объединяются файлы в ней, которые
+#       принимает один из парсеров; файл шаблона исключается) или отдельный
+#       файл.
+#   2.  Шаблон (`BatchTemplate`) — файл проекта (.json или .approx): из него
+#       берутся колонка времени, параметры объединения и сегменты каналов.
+#       Каналы, которых нет в шаблоне (или если в шаблоне каналов нет
+#       совсем), получают один сегмент на весь диапазон степени default_degree.
+#   3.  `process_run` выполняет прогон теми же сервисами, что и GUI:
+#       DataLoader, DataMerger, MomentFitter (channel_fitter), экспорт
+#       data_exporter и, по желанию, проект .approx с данными.
+#   4.  `run_batch` раздает прогоны по процессам (по одному прогону на
+#       процесс); ошибка одного прогона не останавливает остальные.
+#       `print_summary` — итог: число прогонов, объем, время, пропускная
+#       способность.
+#
+# =================================================================================
+
+import contextlib
+import copy
+import io
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from approximator.data_models.channel_state import ChannelState
+from approximator.data_models.segment import Segment
+from approximator.file_parsers.adc_parser import AdcParser
+from approximator.file_parsers.excel_parser import ExcelParser
+from approximator.file_parsers.generic_csv_parser import GenericCsvParser
+from approximator.file_parsers.pyrometer_parser import PyrometerParser
+from approximator.services.approximation.channel_fitter import apply_results, collect_jobs, run_jobs
+from approximator.services.approximation.moment_fitter import MomentFitter
+from approximator.services.data_exporter import ExportOptions, export_approximations
+from approximator.services.data_loader import DataLoader
+from approximator.services.data_merger import DataMerger
+from approximator.services.parse_cache import ParseCache
+from approximator.services.project_container import (
+    PROJECT_EXTENSION, is_project_container, read_project_state, write_project_container
+)
+from approximator.services.time_index import get_time_index, native_channels
+
+
+@dataclass
+class BatchTemplate:
+    """Шаблон обработки: колонка времени, параметры объединения и сегменты каналов."""
+    time_column: Optional[str] = None
+    merge_options: dict = field(default_factory=dict)
+    # Состояния каналов в формате проекта (ChannelState.to_dict)
+    channels: Dict[str, dict] = field(default_factory=dict)
+    default_degree: int = 3
+
+    @classmethod
+    def load(cls, path: Optional[str], default_degree: int = 3) -> 'BatchTemplate':
+        """Шаблон из файла проекта (.json или .approx); без файла — пустой."""
+        if not path:
+            return cls(default_degree=default_degree)
+        if is_project_container(path):
+            data = read_project_state(path)
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        settings = data.get('settings', {})
+        return cls(time_column=settings.get('time_column'),
+                   merge_options=dict(settings.get('merge_options') or {}),
+                   channels=data.get('channels', {}),
+                   default_degree=default_degree)
+
+    def channel_state(self, name: str, time_range) -> Optional[ChannelState]:
+        """Состояние канала для прогона: из шаблона или один сегмент на весь диапазон."""
+        if name in self.channels:
+            channel_state = ChannelState.from_dict(copy.deepcopy(self.channels[name]))
+            channel_state.name = name
+            return channel_state
+        if self.channels or time_range is None:
+            # Шаблон задает набор каналов — остальные не обрабатываются
+            return None
+        return ChannelState(name=name, segments=[
+            Segment(x_start=time_range[0], x_end=time_range[1], label="1", poly_degree=self.default_degree)
+        ])
+
+
+@dataclass
+class BatchRun:
+    """Один прогон: имя (для выходных файлов) и его исходные файлы."""
+    name: str
+    files: List[str]
+
+
+@dataclass
+class BatchOptions:
+    """Параметры пакетной обработки."""
+    output_dir: str
+    export_format: str = 'xlsx'
+    # Точек экспорта на сегмент
+    points: int = 100
+    # Исходные данные в экспорте (лист/файл "Исходные данные")
+    export_source_data: bool = True
+    # Сохранять проект .approx с данными рядом с экспортом
+    save_project: bool = False
+    use_cache: bool = True
+    # Подробный вывод сервисов (иначе — одна строка на прогон)
+    verbose: bool = False
+
+
+@dataclass
+class RunReport:
+    """Итог одного прогона."""
+    name: str
+    files: int
+    input_bytes: int
+    rows: int = 0
+    channels: int = 0
+    segments: int = 0
+    fitted: int = 0
+    seconds: float = 0.0
+    outputs: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def collect_runs(inputs: List[str], exclude: Optional[List[str]] = None) -> List[BatchRun]:
+    """
+    Прогоны из аргументов: папка — файлы в ней, которые принимает один из
+    парсеров, файл — отдельный прогон. Пути из exclude (файл шаблона) в
+    прогоны папок не попадают.
+    """
+    excluded = {os.path.abspath(p) for p in exclude or []}
+    loader = _make_loader(use_cache=False)
+    runs, names = [], set()
+    for path in inputs:
+        if os.path.isdir(path):
+            candidates = (os.path.join(path, f) for f in sorted(os.listdir(path)) if not f.startswith('.'))
+            files = [p for p in candidates
+                     if os.path.isfile(p) and os.path.abspath(p) not in excluded and loader.can_load(p)]
+            if not files:
+                print(f"[batch] В папке {path} нет файлов поддерживаемых форматов")
+            name = os.path.basename(os.path.normpath(path))
+        else:
+            files = [path]
+            name = os.path.splitext(os.path.basename(path))[0]
+        # Одинаковые имена прогонов не должны перезаписывать выходные файлы друг друга
+        unique, n = name, 2
+        while unique in names:
+            unique, n = f"{name}_{n}", n + 1
+        names.add(unique)
+        runs.append(BatchRun(unique, files))
+    return runs
+
+
+def process_run(run: BatchRun, template: BatchTemplate, options: BatchOptions) -> RunReport:
+    """Обрабатывает один прогон; ошибки записываются в отчет."""
+    report = RunReport(run.name, len(run.files), sum(_file_size(p) for p in run.files))
+    started = time.perf_counter()
+    try:
+        with contextlib.ExitStack() as stack:
+            if not options.verbose:
+                stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+            _process(run, template, options, report)
+    except Exception as e:
+        report.error = f"{type(e).__name__}: {e}"
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def _make_loader(use_cache: bool) -> DataLoader:
+    return DataLoader([
+        AdcParser(),
+        PyrometerParser(),
+        ExcelParser(),
+        GenericCsvParser()
+    ], cache=ParseCache() if use_cache else None)
+
+
+def _process(run: BatchRun, template: BatchTemplate, options: BatchOptions, report: RunReport):
+    merge_options = dict(template.merge_options)
+    loader = _make_loader(options.use_cache)
+    dataframes = [df for df in (loader.load_file(path) for path in run.files) if not df.empty]
+    if not dataframes:
+        raise ValueError("нет данных в файлах прогона")
+
+    time_column = _time_column(dataframes, template.time_column)
+    merged = DataMerger().merge_dataframes(dataframes, on_column=time_column, **merge_options)
+    if merged.empty:
+        raise ValueError("объединенная таблица пуста")
+    report.rows = int(merged.shape[0])
+
+    time_index = get_time_index(merged, time_column)
+    fitter = MomentFitter()
+    channel_states = {}
+    for name in merged.columns:
+        if name == time_column or not time_index.has_channel(name):
+            continue
+        # Текстовые колонки (единицы измерения и т.п.) не аппроксимируются
+        if not pd.api.types.is_numeric_dtype(merged[name]):
+            continue
+        x_data, y_data = time_index.channel_arrays(name)
+        channel_state = template.channel_state(
+            name, (float(x_data[0]), float(x_data[-1])) if x_data.size else None)
+        if channel_state is None:
+            continue
+        jobs = collect_jobs(channel_state, 0, time_column=time_column)
+        apply_results(channel_state, 0, run_jobs(jobs, x_data, y_data, fitter), time_column)
+        channel_states[name] = channel_state
+    report.channels = len(channel_states)
+    if not channel_states:
+        raise ValueError("нет каналов для аппроксимации")
+    report.segments = sum(len(cs.segments) for cs in channel_states.values())
+    report.fitted = sum(1 for cs in channel_states.values() for seg in cs.segments if seg.fit_result)
+
+    os.makedirs(options.output_dir, exist_ok=True)
+    export_path = os.path.join(options.output_dir, f"{run.name}.{options.export_format}")
+    export_options = ExportOptions(whole_range=False, default_points=options.points,
+                                   mode_label='Пакетная обработка: точки на каждом сегменте')
+    if not export_approximations(export_path, channel_states, list(channel_states), export_options,
+                                 merged if options.export_source_data else None, time_column):
+        raise RuntimeError(f"не удалось экспортировать {export_path}")
+    report.outputs.append(export_path)
+
+    if options.save_project:
+        project_path = os.path.join(options.output_dir, run.name + PROJECT_EXTENSION)
+        state = {
+            'imported_files': [os.path.abspath(p) for p in run.files],
+            'settings': {'time_column': time_column, 'merge_options': merge_options,
+                         'active_channel': next(iter(channel_states))},
+            'channels': {name: cs.to_dict() for name, cs in channel_states.items()},
+        }
+        write_project_container(project_path, state, merged, time_column, native_channels(merged))
+        report.outputs.append(project_path)
+
+
+def _time_column(dataframes: List[pd.DataFrame], preferred: Optional[str]) -> str:
+    """Колонка времени: из шаблона, иначе первая общая колонка с "time" в имени, иначе первая."""
+    common = [c for c in dataframes[0].columns if all(c in df.columns for df in dataframes[1:])]
+    if preferred and preferred in common:
+        return preferred
+    for column in common:
+        if 'time' in str(column).lower() or str(column).lower() == 't':
+            return column
+    if not common:
+        raise ValueError("у файлов прогона нет общей колонки времени")
+    return common[0]
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def run_batch(runs: List[BatchRun], template: BatchTemplate, options: BatchOptions,
+              max_workers: Optional[int] = None) -> List[RunReport]:
+    """Обрабатывает прогоны в пуле процессов (max_workers=1 — в текущем процессе)."""
+    workers = max(1, min(len(runs), max_workers or os.cpu_count() or 1))
+    reports = []
+    if workers == 1:
+        for done, run in enumerate(runs, start=1):
+            reports.append(process_run(run, template, options))
+            _print_progress(done, len(runs), reports[-1])
+        return reports
+
+    # spawn — как и в остальных пулах приложения (parallel_fitter, DataLoader.load_many)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = {executor.submit(process_run, run, template, options): run for run in runs}
+        for done, future in enumerate(as_completed(futures), start=1):
+            run = futures[future]
+            try:
+                report = future.result()
+            except Exception as e:
+                # Процесс упал целиком (например, нехватка памяти)
+                report = RunReport(run.name, len(run.files), 0, error=f"{type(e).__name__}: {e}")
+            reports.append(report)
+            _print_progress(done, len(runs), report)
+    order = {run.name: i for i, run in enumerate(runs)}
+    reports.sort(key=lambda r: order[r.name])
+    return reports
+
+
+def _print_progress(done: int, total: int, report: RunReport):
+    if report.error:
+        print(f"[{done}/{total}] ❌ {report.name}: {report.error}")
+    else:
+        print(f"[{done}/{total}] ✅ {report.name}: {report.rows} строк, {report.channels} кан., "
+              f"{report.fitted}/{report.segments} сегм., {report.seconds:.2f} с")
+
+
+def print_summary(reports: List[RunReport], wall_seconds: float):
+    """Итог пакетной обработки: объем, время и пропускная способность."""
+    ok = [r for r in reports if not r.error]
+    failed = [r for r in reports if r.error]
+    megabytes = sum(r.input_bytes for r in ok) / 1024 ** 2
+    wall = max(wall_seconds, 1e-9)
+    print("=" * 60)
+    print(f"Прогонов: {len(reports)} (успешно {len(ok)}, с ошибкой {len(failed)})")
+    print(f"Файлов: {sum(r.files for r in ok)}, {megabytes:.1f} МБ, строк: {sum(r.rows for r in ok)}")
+    print(f"Каналов: {sum(r.channels for r in ok)}, сегментов рассчитано: "
+          f"{sum(r.fitted for r in ok)} из {sum(r.segments for r in ok)}")
+    print(f"Время: {wall_seconds:.2f} с (сумма по прогонам {sum(r.seconds for r in reports):.2f} с)")
+    print(f"Пропускная способность: {len(ok) / wall * 60:.1f} прогонов/мин, {megabytes / wall:.2f} МБ/с")
+    for report in failed:
+        print(f"  ❌ {report.name}: {report.error}")
@@ -0,0 +1,147 @@
+# Путь: approximator/services/compact_storage.py
+# =================================================================================
+# МОДУЛЬ КОМПАКТНОГО ХРАНЕНИЯ ДАННЫХ
+#
+# НАЗНАЧЕНИЕ:
+#   Режим экономии памяти для больших записей (десятки каналов по
+#   десяткам миллионов отсчетов): значения каналов хранятся в float32
+#   вместо float64, текстовые колонки — как категории или не хранятся.
+#
+# ЛОГИКА РАБОТЫ:
+#   1.  Колонки времени не трогаются — время остается float64, иначе на
+#       длинной записи теряется разрешение по времени. Выбранную колонку
+#       времени передает вызывающий код: таблицы сжимаются при объединении
+#       (DataMerger, on_column), а не при чтении отдельных файлов, где
+#       колонка времени еще не выбрана. Колонки с "временными" именами
+#       ('Time', 'время', 'timestamp' ...) дополнительно не сжимаются.
+#   2.  Числовые колонки каналов -> float32. Целые — только если все
+#       значения точно представимы в float32 (|x| < 2^24).
+#   3.  Текст: мало различных значений -> category, иначе колонка
+#       удаляется (аппроксимировать текст все равно нельзя).
+#   4.  Исходные таблицы файлов, которые хранятся после объединения
+#       (AppState.loaded_dataframes), сжимаются так же (compact_sources):
+#       иначе режим экономит только память объединенной таблицы.
+#       Повторное объединение без компактного режима идет уже по float32.
+#   5.  По каждой колонке формируется строка отчета о памяти (до/после).
+#       Аппроксимация сама переводит в float64 только тот участок, с
+#       которым работает.
+#
+# =================================================================================
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+COMPACT_DTYPE = np.float32
+# Целые, которые float32 хранит без потерь
+_FLOAT32_EXACT_INT = 2 ** 24
+# Доля различных значений, до которой текст хранится как category
+_CATEGORY_MAX_RATIO = 0.5
+_TIME_NAME_HINTS = ('time', 'время', 'timestamp')
+
+
+@dataclass
+class ColumnMemory:
+    """Строка отчета о памяти одной колонки."""
+    name: str
+    dtype_before: str
+    dtype_after: str
+    bytes_before: int
+    bytes_after: int
+
+    @property
+    def dropped(self) -> bool:
+        return self.dtype_after == ""
+
+
+def is_time_column(name, time_columns: Iterable = ()) -> bool:
+    """Колонка времени: явно указана или узнается по имени."""
+    if name in set(time_columns):
+        return True
+    lowered = str(name).strip().lower()
+    return lowered == 't' or any(hint in lowered for hint in _TIME_NAME_HINTS)
+
+
+def compact_dataframe(df: pd.DataFrame, time_columns: Iterable = ()) -> Tuple[pd.DataFrame, List[ColumnMemory]]:
+    """Возвращает компактную копию таблицы и отчет по колонкам."""
+    if df is None or df.empty:
+        return df, []
+    time_columns = list(time_columns)
+    arrays, columns, report = {}, [], []
+    for i, name in enumerate(df.columns):
+        series = df.iloc[:, i]
+        before = int(series.memory_usage(index=False, deep=True))
+        compacted = _compact_column(series, is_time_column(name, time_columns))
+        if compacted is None:
+            report.append(ColumnMemory(str(name), str(series.dtype), "", before, 0))
+            continue
+        arrays[len(columns)] = compacted
+        columns.append(name)
+        report.append(ColumnMemory(str(name), str(series.dtype), str(compacted.dtype), before,
+                                   int(compacted.memory_usage(index=False, deep=True))))
+    # Целочисленные ключи: одинаковые имена колонок не схлопываются
+    result = pd.DataFrame(arrays, index=df.index, copy=False)
+    result.columns = columns
+    return result, report
+
+
+def compact_sources(frames: Dict[str, pd.DataFrame], time_column: str) -> Dict[str, pd.DataFrame]:
+    """Компактные копии исходных таблиц файлов {путь: таблица} (после объединения)."""
+    compacted, report = {}, []
+    for path, df in frames.items():
+        compacted[path], memory = compact_dataframe(df, [time_column])
+        report.extend(memory)
+    if report:
+        print_memory_report(report, "исходные таблицы")
+    return compacted
+
+
+def _compact_column(series: pd.Series, is_time: bool):
+    """Компактная версия колонки; None — колонку не хранить."""
+    dtype = series.dtype
+    if is_time:
+        return series
+    if isinstance(dtype, np.dtype):
+        if dtype.kind == 'f':
+            return series.astype(COMPACT_DTYPE) if dtype.itemsize > 4 else series
+        if dtype.kind in 'iu':
+            values = series.to_numpy()
+            if not values.size or np.abs(values).max() < _FLOAT32_EXACT_INT:
+                return series.astype(COMPACT_DTYPE)
+            return series
+        if dtype.kind in 'bmM':
+            return series
+    if isinstance(dtype, pd.CategoricalDtype):
+        return series
+    if pd.api.types.is_string_dtype(dtype) or dtype == object:
+        if len(series) and series.nunique(dropna=True) <= _CATEGORY_MAX_RATIO * len(series):
+            return series.astype('category')
+        return None
+    return series
+
+
+def memory_report(df: pd.DataFrame) -> List[ColumnMemory]:
+    """Отчет о памяти колонок таблицы (без изменений)."""
+    report = []
+    for i, name in enumerate(df.columns):
+        series = df.iloc[:, i]
+        size = int(series.memory_usage(index=False, deep=True))
+        report.append(ColumnMemory(str(name), str(series.dtype), str(series.dtype), size, size))
+    return report
+
+
+def print_memory_report(report: List[ColumnMemory], title: str = ""):
+    """Печатает память по колонкам и итог."""
+    before = sum(r.bytes_before for r in report)
+    after = sum(r.bytes_after for r in report)
+    print(f"[compact] {title}: {before / 1024 ** 2:.1f} МБ -> {after / 1024 ** 2:.1f} МБ")
+    for r in report:
+        if r.dropped:
+            change = "удалена"
+        elif r.dtype_before == r.dtype_after:
+            change = r.dtype_after
+        else:
+            change = f"{r.dtype_before} -> {r.dtype_after}"
+        print(f"  - {r.name}: {change}, {r.bytes_before / 1024 ** 2:.2f} -> {r.bytes_after / 1024 ** 2:.2f} МБ")
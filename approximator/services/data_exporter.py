@@ -1 +1,362 @@
 # Путь: approximator/services/data_exporter.py
+# =================================================================================
+# МОДУЛЬ ЭКСПОРТА АППРОКСИМАЦИЙ
+#
+# НАЗНАЧЕНИЕ:
+#   Экспорт исходных данных и аппроксимаций каналов в Excel, CSV или
+#   Parquet без построения таблицы "строка = словарь" в памяти: десятки
+#   каналов по 10 тыс. точек выгружаются за секунды, а память не растет
+#   с числом каналов.
+#
+# ЛОГИКА РАБОТЫ:
+#   1.  `evaluate_channel` — точки экспорта канала: число точек всех
+#       сегментов известно заранее, поэтому массивы t и значений
+#       выделяются один раз, а полиномы сегментов вычисляются схемой
+#       Горнера прямо в срезы этих массивов (без промежуточных копий).
+#   2.  Метаданные (степень, RMSE, R², коэффициенты, число точек) пишутся
+#       один раз на сегмент в отдельную таблицу "Сегменты", а не
+#       повторяются в каждой строке точек.
+#   3.  Таблицы выдаются по частям (канал или CHUNK_ROWS строк) и сразу
+#       пишутся в файл:
+#       - .xlsx — openpyxl в режиме write_only (строки не хранятся в
+#         памяти); лист длиннее предела Excel продолжается на следующем;
+#       - .csv — по файлу на таблицу: <имя>.csv (точки аппроксимации),
+#         <имя>_data.csv, <имя>_segments.csv, <имя>_masks.csv,
+#         <имя>_settings.csv;
+#       - .parquet — те же файлы в Parquet (нужен pyarrow).
+#   4.  Исходные данные берутся по каналам из ChannelStore (пара время/
+#       значения без NaN, в режиме "resample" — исходные отсчеты), а не из
+#       широкой таблицы: таблица "Исходные данные" — строки (канал, время,
+#       значение) без NaN-дополнения редких каналов.
+#   5.  Ошибки выводятся через print, функция экспорта возвращает False.
+#
+# =================================================================================
+
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from approximator.data_models.channel_state import ChannelState
+from approximator.data_models.channel_store import ChannelStore
+from approximator.services.time_index import get_time_index
+
+SHEET_DATA = 'Исходные данные'
+SHEET_APPROX = 'Аппроксимация'
+SHEET_SEGMENTS = 'Сегменты'
+SHEET_MASKS = 'Маски'
+SHEET_SETTINGS = 'Настройки'
+
+# Суффиксы файлов таблиц для CSV/Parquet: <имя><суффикс>.<расширение>
+TABLE_SUFFIXES = {
+    SHEET_APPROX: '',
+    SHEET_DATA: '_data',
+    SHEET_SEGMENTS: '_segments',
+    SHEET_MASKS: '_masks',
+    SHEET_SETTINGS: '_settings',
+}
+
+EXPORT_FORMATS = ('xlsx', 'csv', 'parquet')
+
+# Предел строк листа Excel (включая заголовок)
+EXCEL_MAX_ROWS = 1048576
+# Строк исходных данных в одной части
+CHUNK_ROWS = 65536
+
+MASK_SEGMENT_TYPE = "Маска"
+
+
+@dataclass
+class ExportOptions:
+    """Параметры экспорта аппроксимаций."""
+    # Начало отсчета относительного времени t_rel
+    start_point: float = 0.0
+    # True — каждый сегмент на всем диапазоне канала (total_points точек),
+    # False — на своем интервале (points_per_channel / default_points точек)
+    whole_range: bool = True
+    # Конец диапазона (whole_range); None — конец последнего сегмента канала
+    end_point: Optional[float] = None
+    total_points: int = 500
+    points_per_channel: Dict[str, int] = field(default_factory=dict)
+    default_points: int = 100
+    # Только для листа настроек
+    time_step: float = 1.0
+    mode_label: str = ''
+
+
+@dataclass
+class ChannelApproximation:
+    """Точки экспорта одного канала и метаданные его сегментов."""
+    channel: str
+    x: np.ndarray
+    y: np.ndarray
+    # Номер сегмента (в segments) для каждой точки
+    segment_index: np.ndarray
+    segments: List[dict]
+
+
+def _polyval_into(coefficients, x: np.ndarray, out: np.ndarray):
+    """np.polyval(coefficients, x) схемой Горнера прямо в out."""
+    out.fill(coefficients[0])
+    for c in coefficients[1:]:
+        out *= x
+        out += c
+
+
+def evaluate_channel(name: str, channel_state: ChannelState, options: ExportOptions) -> Optional[ChannelApproximation]:
+    """Точки аппроксимации канала для экспорта; None, если рассчитанных сегментов нет."""
+    # is_excluded задают обработчики сегментов (исключенный из расчета сегмент)
+    fitted = [seg for seg in channel_state.segments
+              if seg.segment_type != MASK_SEGMENT_TYPE and not getattr(seg, 'is_excluded', False)
+              and seg.fit_result and seg.fit_result.coefficients]
+    if not fitted:
+        return None
+
+    if options.whole_range:
+        x_min = min(seg.x_start for seg in fitted)
+        x_max = options.end_point if options.end_point is not None else max(seg.x_end for seg in fitted)
+        grid = np.linspace(x_min, x_max, max(2, options.total_points))
+        counts = [grid.size] * len(fitted)
+    else:
+        n_points = max(2, int(options.points_per_channel.get(name, options.default_points)))
+        grid = None
+        counts = [n_points] * len(fitted)
+
+    bounds = np.concatenate(([0], np.cumsum(counts)))
+    x = np.empty(bounds[-1], dtype=np.float64)
+    y = np.empty_like(x)
+    segment_index = np.repeat(np.arange(len(fitted), dtype=np.int32), counts)
+    # Метка связывает точки с таблицей сегментов, поэтому она непустая и уникальная
+    labels = _unique_labels([seg.label or f"Сегмент {i + 1}" for i, seg in enumerate(fitted)])
+    segments = []
+    for i, seg in enumerate(fitted):
+        a, b = bounds[i], bounds[i + 1]
+        x[a:b] = grid if grid is not None else np.linspace(seg.x_start, seg.x_end, b - a)
+        _polyval_into(seg.fit_result.coefficients, x[a:b], y[a:b])
+        fit = seg.fit_result
+        segments.append({
+            'Канал': name,
+            'Сегмент': labels[i],
+            'Степень': seg.poly_degree,
+            'RMSE': fit.rmse,
+            'R2': fit.r_squared,
+            'Коэффициенты': ', '.join(repr(float(c)) for c in fit.coefficients),
+            'Число точек': fit.points_count,
+            'Начало': seg.x_start,
+            'Конец': seg.x_end,
+            'Точек экспорта': int(b - a),
+        })
+    return ChannelApproximation(name, x, y, segment_index, segments)
+
+
+def export_approximations(path: str, channel_states: Dict[str, ChannelState], channels: List[str],
+                          options: ExportOptions, df: Optional[pd.DataFrame] = None,
+                          time_column: Optional[str] = None, fmt: Optional[str] = None,
+                          store: Optional[ChannelStore] = None) -> bool:
+    """
+    Экспортирует исходные данные каналов, аппроксимации, сегменты, маски и
+    настройки. Формат — fmt или расширение path (xlsx / csv / parquet).
+    Исходные данные — из store (AppState.channel_store), а если он не
+    передан — из хранилища каналов таблицы df по колонке time_column.
+    """
+    fmt = (fmt or os.path.splitext(path)[1].lstrip('.') or 'xlsx').lower()
+    if fmt not in EXPORT_FORMATS:
+        print(f"[DataExporter] ❌ Неизвестный формат экспорта: {fmt}")
+        return False
+    channels = [ch for ch in channels if ch in channel_states]
+    if store is None and df is not None and time_column:
+        time_index = get_time_index(df, time_column)
+        store = time_index.store if time_index is not None else None
+    tables = _tables(store, channel_states, channels, options)
+    try:
+        if fmt == 'xlsx':
+            _write_xlsx(path, tables)
+        elif fmt == 'csv':
+            _write_csv(path, tables)
+        else:
+            _write_parquet(path, tables)
+    except ImportError as e:
+        print(f"[DataExporter] ❌ Для экспорта в {fmt} не хватает пакета: {e}")
+        return False
+    except OSError as e:
+        print(f"[DataExporter] ❌ Ошибка записи {path}: {e}")
+        return False
+    except Exception as e:
+        print(f"[DataExporter] ❌ Ошибка экспорта {path}: {e}")
+        return False
+    print(f"[DataExporter] ✅ Экспорт завершен: {path}")
+    return True
+
+
+# --- Таблицы по частям ---
+
+def _data_chunks(store: Optional[ChannelStore], channels: List[str], start_point: float) -> Iterator[pd.DataFrame]:
+    """Исходные отсчеты каналов по CHUNK_ROWS строк: (канал, t_abs, t_rel, значение)."""
+    if store is None:
+        return
+    for ch in channels:
+        series = store.get(ch) if ch in store else None
+        if series is None:
+            continue
+        for a in range(0, len(series), CHUNK_ROWS):
+            t = series.time[a:a + CHUNK_ROWS]
+            yield pd.DataFrame({
+                'Канал': pd.Categorical.from_codes(np.zeros(t.size, dtype=np.int8), [ch]),
+                't_abs': t,
+                't_rel': t - start_point,
+                # float32 (компактный режим) -> float64: одна схема для всех каналов
+                'Значение': series.values[a:a + CHUNK_ROWS].astype(np.float64, copy=False),
+            }, copy=False)
+
+
+class _ApproximationChunks:
+    """Точки аппроксимации по каналам; метаданные сегментов собираются по ходу."""
+
+    def __init__(self, channel_states: Dict[str, ChannelState], channels: List[str], options: ExportOptions):
+        self._channel_states = channel_states
+        self._channels = channels
+        self._options = options
+        self.segments: List[dict] = []
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        for ch in self._channels:
+            approximation = evaluate_channel(ch, self._channel_states[ch], self._options)
+            if approximation is None:
+                continue
+            self.segments.extend(approximation.segments)
+            yield pd.DataFrame({
+                'Канал': pd.Categorical.from_codes(np.zeros(approximation.x.size, dtype=np.int8), [ch]),
+                'Сегмент': pd.Categorical.from_codes(approximation.segment_index,
+                                                     [segment['Сегмент'] for segment in approximation.segments]),
+                't_abs': approximation.x,
+                't_rel': approximation.x - self._options.start_point,
+                'Значение': approximation.y,
+            }, copy=False)
+
+    def segments_table(self) -> pd.DataFrame:
+        return pd.DataFrame(self.segments, columns=['Канал', 'Сегмент', 'Степень', 'RMSE', 'R2', 'Коэффициенты',
+                                                    'Число точек', 'Начало', 'Конец', 'Точек экспорта'])
+
+
+def _unique_labels(labels: List[str]) -> List[str]:
+    """Повторяющиеся метки сегментов нумеруются."""
+    seen, result = {}, []
+    for label in labels:
+        count = seen.get(label, 0)
+        seen[label] = count + 1
+        result.append(label if not count else f"{label} ({count + 1})")
+    return result
+
+
+def _masks_table(channel_states: Dict[str, ChannelState], channels: List[str]) -> pd.DataFrame:
+    rows = [{'Канал': ch, 'Исключённые индексы': ', '.join(map(str, sorted(channel_states[ch].excluded_indices)))}
+            for ch in channels]
+    return pd.DataFrame(rows, columns=['Канал', 'Исключённые индексы'])
+
+
+def _settings_table(options: ExportOptions, channels: List[str]) -> pd.DataFrame:
+    settings = {
+        'Шаг по времени': options.time_step,
+        'Начальная точка': options.start_point,
+        'Режим': options.mode_label,
+        'Каналы': ', '.join(channels),
+    }
+    return pd.DataFrame(list(settings.items()), columns=['Параметр', 'Значение'])
+
+
+def _tables(store, channel_states, channels, options) -> Iterator[tuple]:
+    """
+    (имя таблицы, части) по порядку. Писатель дописывает таблицу до
+    запроса следующей, поэтому сегменты берутся уже после вычисления
+    аппроксимаций.
+    """
+    approximation = _ApproximationChunks(channel_states, channels, options)
+    yield SHEET_DATA, _data_chunks(store, channels, options.start_point)
+    yield SHEET_APPROX, iter(approximation)
+    yield SHEET_SEGMENTS, iter([approximation.segments_table()])
+    yield SHEET_MASKS, iter([_masks_table(channel_states, channels)])
+    yield SHEET_SETTINGS, iter([_settings_table(options, channels)])
+
+
+# --- Запись ---
+
+def _write_xlsx(path: str, tables):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    for name, chunks in tables:
+        sheet, rows, part = None, 0, 1
+        for chunk in chunks:
+            header = [str(c) for c in chunk.columns]
+            columns = [_cells(chunk[c]) for c in chunk.columns]
+            for row in zip(*columns):
+                if sheet is None or rows >= EXCEL_MAX_ROWS:
+                    sheet = wb.create_sheet(name if part == 1 else f"{name} ({part})")
+                    sheet.append(header)
+                    rows, part = 1, part + 1
+                sheet.append(row)
+                rows += 1
+        if sheet is None:
+            wb.create_sheet(name)
+    _save_atomic(path, wb.save)
+
+
+def _cells(series: pd.Series) -> list:
+    """Значения колонки для openpyxl: NaN -> пустая ячейка."""
+    values = series.to_numpy()
+    if values.dtype.kind == 'f':
+        cells = values.astype(object)
+        cells[np.isnan(values)] = None
+        return cells.tolist()
+    return np.asarray(values, dtype=object).tolist()
+
+
+def _write_csv(path: str, tables):
+    stem = os.path.splitext(path)[0]
+    for name, chunks in tables:
+        table_path = f"{stem}{TABLE_SUFFIXES[name]}.csv"
+
+        def write(tmp_path, chunks=chunks):
+            with open(tmp_path, 'w', encoding='utf-8-sig', newline='') as f:
+                for i, chunk in enumerate(chunks):
+                    chunk.to_csv(f, header=not i, index=False)
+        _save_atomic(table_path, write)
+
+
+def _write_parquet(path: str, tables):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    stem = os.path.splitext(path)[0]
+    for name, chunks in tables:
+        table_path = f"{stem}{TABLE_SUFFIXES[name]}.parquet"
+
+        def write(tmp_path, chunks=chunks):
+            writer = None
+            try:
+                for chunk in chunks:
+                    # Категории каналов различаются — в Parquet пишутся строками
+                    chunk = chunk.astype({c: str for c in chunk.columns if isinstance(chunk[c].dtype, pd.CategoricalDtype)})
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(tmp_path, table.schema)
+                    writer.write_table(table)
+            finally:
+                if writer is not None:
+                    writer.close()
+            if writer is None:
+                pd.DataFrame().to_parquet(tmp_path)
+        _save_atomic(table_path, write)
+
+
+def _save_atomic(path: str, write):
+    """write(tmp_path) пишет файл; затем он заменяет path (недописанный файл не остается)."""
+    tmp_path = f"{path}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
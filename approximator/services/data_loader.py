@@ -1,27 +1,166 @@
 # Путь: approximator/services/data_loader.py
 
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional
+
 import pandas as pd
-from typing import List
-from file_parsers.base_parser import BaseParser
+from approximator.file_parsers.base_parser import BaseParser
+from approximator.file_parsers.sniffer import sniff_file
+from approximator.services.parse_cache import ParseCache
+
+
+@dataclass
+class LoadOutcome:
+    """Результат загрузки одного файла из пакета."""
+    path: str
+    dataframe: Optional[pd.DataFrame] = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.dataframe is not None and not self.dataframe.empty
+
 
 class DataLoader:
     """
     Сервис для загрузки данных, который автоматически определяет
     нужный парсер для каждого файла.
     """
-    def __init__(self, parsers: List[BaseParser]):
+    def __init__(self, parsers: List[BaseParser], cache: Optional[ParseCache] = None):
         """
         :param parsers: Список экземпляров всех доступных парсеров.
                         Порядок важен: GenericCsvParser должен быть последним.
+        :param cache: Дисковый кеш разобранных файлов (None — без кеша).
+
+        Файлы загружаются в исходной точности. Компактное хранение (float32)
+        выполняет объединение (DataMerger, compact=True): только там известна
+        выбранная колонка времени, которую нельзя переводить в float32.
         """
         self.parsers = parsers
+        self.cache = cache
 
     def load_file(self, file_path: str) -> pd.DataFrame:
         print(f"Загрузка файла: {file_path}")
+        # Начало файла читается один раз: формат, кодировка, разделитель и
+        # десятичный знак передаются парсеру, он сам файл не перепроверяет
+        sniff = sniff_file(file_path)
+        print(f"  -> Формат: {sniff.format}, кодировка: {sniff.encoding}, "
+              f"разделитель: {sniff.separator!r}, десятичный знак: '{sniff.decimal}'")
+        parser = self._select_parser(file_path, sniff)
+        if parser is None:
+            print(f"  -> Ошибка: Не найден подходящий парсер для файла {file_path}")
+            return pd.DataFrame()
+
+        # Ключ считается до разбора: если файл изменится во время чтения,
+        # результат попадет под старый ключ и больше не будет использован
+        key = self.cache.key_for(file_path, parser) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                print(f"  -> Загружено из кеша ({parser.__class__.__name__}), shape={cached.shape}")
+                return cached
+
+        print(f"  -> Используется парсер: {parser.__class__.__name__}")
+        df = parser.parse(file_path, sniff)
+        if key is not None:
+            self.cache.put(key, file_path, parser, df)
+        return df
+
+    def load_cached(self, file_path: str) -> Optional[pd.DataFrame]:
+        """DataFrame файла из кеша без разбора (None — записи нет)."""
+        if self.cache is None:
+            return None
+        parser = self._select_parser(file_path, sniff_file(file_path))
+        if parser is None:
+            return None
+        return self.cache.get(self.cache.key_for(file_path, parser))
+
+    def can_load(self, file_path: str) -> bool:
+        """Есть ли парсер для файла (по расширению и началу файла, без разбора)."""
+        return self._select_parser(file_path, sniff_file(file_path)) is not None
+
+    def _select_parser(self, file_path: str, sniff) -> Optional[BaseParser]:
         for parser in self.parsers:
-            if parser.can_parse(file_path):
-                print(f"  -> Используется парсер: {parser.__class__.__name__}")
-                return parser.parse(file_path)
-        
-        print(f"  -> Ошибка: Не найден подходящий парсер для файла {file_path}")
-        return pd.DataFrame()
\ No newline at end of file
+            if parser.can_parse(file_path, sniff):
+                return parser
+        return None
+
+    def load_many(self, paths: List[str], max_workers: Optional[int] = None,
+                  progress: Optional[Callable[[int, int, str], None]] = None,
+                  should_cancel: Optional[Callable[[], bool]] = None) -> Iterator[LoadOutcome]:
+        """
+        Загружает файлы параллельно в пуле процессов и отдает результаты по
+        мере готовности (порядок — по завершению, не по списку).
+        Ошибка в одном файле не прерывает пакет: она возвращается в LoadOutcome.error.
+        progress(done, total, path) вызывается после каждого файла.
+        """
+        paths = list(paths)
+        total = len(paths)
+        done = 0
+
+        # Файлы из кеша отображаются в память здесь же — их не нужно
+        # ни разбирать, ни передавать из рабочего процесса
+        pending = []
+        for path in paths:
+            started = time.perf_counter()
+            cached = self.load_cached(path)
+            if cached is None:
+                pending.append(path)
+                continue
+            done += 1
+            if progress is not None:
+                progress(done, total, path)
+            yield LoadOutcome(path=path, dataframe=cached, seconds=time.perf_counter() - started)
+        if not pending:
+            return
+
+        workers = min(max_workers or os.cpu_count() or 1, len(pending))
+        if workers <= 1:
+            # Один файл — пул процессов не окупается
+            for path in pending:
+                if should_cancel is not None and should_cancel():
+                    return
+                outcome = _load_file_worker(self.parsers, self.cache, path)
+                done += 1
+                if progress is not None:
+                    progress(done, total, path)
+                yield outcome
+            return
+
+        # spawn: загрузчик вызывается из многопоточного GUI-процесса
+        context = multiprocessing.get_context("spawn")
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        try:
+            futures = {executor.submit(_load_file_worker, self.parsers, self.cache, path): path
+                       for path in pending}
+            for future in as_completed(futures):
+                if should_cancel is not None and should_cancel():
+                    return
+                path = futures[future]
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    # Например, рабочий процесс аварийно завершился
+                    outcome = LoadOutcome(path=path, error=str(e) or e.__class__.__name__)
+                done += 1
+                if progress is not None:
+                    progress(done, total, path)
+                yield outcome
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _load_file_worker(parsers: List[BaseParser], cache: Optional[ParseCache], path: str) -> LoadOutcome:
+    """Загружает один файл (выполняется в рабочем процессе)."""
+    started = time.perf_counter()
+    try:
+        df = DataLoader(parsers, cache).load_file(path)
+        return LoadOutcome(path=path, dataframe=df, seconds=time.perf_counter() - started)
+    except Exception as e:
+        return LoadOutcome(path=path, error=f"{e.__class__.__name__}: {e}",
+                           seconds=time.perf_counter() - started)
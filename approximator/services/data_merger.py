@@ -13,26 +13,117 @@
 #   'Time' с относительным временем в секундах.
 #
 #   1.  Фильтрует список, оставляя только те DataFrame'ы, где есть 'Time'.
-#   2.  Выполняет внешнее объединение (outer merge) по колонке 'Time'.
-#       Это сохраняет все временные метки из всех файлов.
-#   3.  Сортирует итоговую таблицу по времени.
+#   2.  Колонки времени всех файлов объединяются и сортируются один раз —
+#       получается общая ось времени (как у внешнего объединения: все
+#       метки из всех файлов). Повторяющиеся метки внутри файла не
+#       схлопываются: j-е повторение метки в каждом файле попадает в
+#       j-ю строку с этой меткой.
+#   3.  Для каждого файла вычисляются позиции его строк на общей оси, и
+#       колонки раскладываются (scatter) в заранее выделенные массивы;
+#       строки, где у файла нет данных, остаются NaN. Таблица не
+#       копируется K раз, как при цепочке попарных pd.merge.
+#   4.  Выравнивание с допуском (method):
+#       - "exact"       — только точное совпадение меток (по умолчанию);
+#       - "nearest"     — в духе merge_asof: метка файла притягивается к
+#                         ближайшей уже существующей метке оси, если она
+#                         ближе tolerance (к каждой метке оси — не более
+#                         одной, самой близкой); остальные дают свои строки;
+#       - "interpolate" — числовые колонки файла дополнительно линейно
+#                         интерполируются на чужие метки внутри своего
+#                         диапазона (не дальше tolerance от своего отсчета).
+#       - "resample"    — все файлы пересчитываются на общую равномерную
+#                         сетку (шаг grid_step или, если он не задан, —
+#                         типичный шаг самого частого файла) линейной или
+#                         ближайшей интерполяцией. Таблица остается
+#                         плотной (без NaN-"хвостов" редких файлов), а
+#                         исходные отсчеты каналов регистрируются в
+#                         индексе времени (register_native_channels):
+#                         аппроксимация идет по ним, а график — по сетке.
+#   5.  Одинаковые имена колонок из разных файлов получают суффиксы _x/_y
+#       так же, как при попарном pd.merge.
+#   6.  Время и память объединения пишутся в отчет (`last_report`).
+#   7.  compact=True — каналы раскладываются сразу в float32 (время
+#       остается float64), текст хранится как category или не хранится
+#       (см. compact_storage); по колонкам печатается отчет о памяти.
+#       Каналы, уже загруженные в float32, остаются float32 и без флага.
 #
 # =================================================================================
 
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
 import pandas as pd
-from typing import List
+from pandas.api.extensions import take
+
+from approximator.services.compact_storage import COMPACT_DTYPE, compact_dataframe, print_memory_report
+from approximator.services.time_index import register_native_channels
+
+MERGE_EXACT = "exact"
+MERGE_NEAREST = "nearest"
+MERGE_INTERPOLATE = "interpolate"
+MERGE_RESAMPLE = "resample"
+MERGE_METHODS = (MERGE_EXACT, MERGE_NEAREST, MERGE_INTERPOLATE, MERGE_RESAMPLE)
+
+INTERPOLATION_LINEAR = "linear"
+INTERPOLATION_NEAREST = "nearest"
+
+# Защита от опечатки в шаге сетки (0.00001 с на часовой записи и т.п.)
+MAX_GRID_ROWS = 50_000_000
+
+
+@dataclass
+class MergeReport:
+    """Сводка последнего объединения."""
+    sources: int = 0
+    rows: int = 0
+    columns: int = 0
+    method: str = MERGE_EXACT
+    tolerance: Optional[float] = None
+    seconds: float = 0.0
+    input_bytes: int = 0
+    output_bytes: int = 0
+    grid_step: Optional[float] = None
+    native_bytes: int = 0
+    compact: bool = False
+
+    def summary(self) -> str:
+        tolerance = f", допуск {self.tolerance:g}" if self.tolerance else ""
+        step = f", шаг {self.grid_step:g}" if self.grid_step else ""
+        native = f", исходные отсчеты {self.native_bytes / 1024 ** 2:.1f} МБ" if self.native_bytes else ""
+        compact = ", float32" if self.compact else ""
+        return (f"{self.sources} файл(ов) -> {self.rows} строк, {self.columns} колонок "
+                f"[{self.method}{tolerance}{step}{compact}] за {self.seconds:.3f} с; "
+                f"память: вход {self.input_bytes / 1024 ** 2:.1f} МБ, "
+                f"результат {self.output_bytes / 1024 ** 2:.1f} МБ{native}")
+
 
 class DataMerger:
     """
     Сервис для объединения нескольких DataFrame'ов в один
     на основе общей колонки времени 'Time'.
     """
-    def merge_dataframes(self, dataframes: List[pd.DataFrame], on_column: str = 'Time') -> pd.DataFrame:
+
+    def __init__(self):
+        self.last_report: Optional[MergeReport] = None
+
+    def merge_dataframes(self, dataframes: List[pd.DataFrame], on_column: str = 'Time',
+                         method: str = MERGE_EXACT, tolerance: Optional[float] = None,
+                         grid_step: Optional[float] = None,
+                         interpolation: str = INTERPOLATION_LINEAR,
+                         compact: bool = False) -> pd.DataFrame:
         """
         Объединяет список DataFrame'ов по общей колонке.
 
         :param dataframes: Список DataFrame'ов для объединения.
         :param on_column: Имя общей колонки (по умолчанию 'Time').
+        :param method: "exact", "nearest", "interpolate" или "resample" (см. описание модуля).
+        :param tolerance: Допуск выравнивания по времени; для "resample" — наибольшее
+                          расстояние до исходного отсчета (дальше — NaN, разрыв в данных).
+        :param grid_step: Шаг общей сетки для "resample" (None — по самому частому файлу).
+        :param interpolation: "linear" или "nearest" — интерполяция на сетку для "resample".
+        :param compact: Хранить каналы в float32 (см. compact_storage).
         :return: Один объединенный и отсортированный DataFrame.
         """
         if not dataframes:
@@ -45,15 +136,312 @@ class DataMerger:
             print(f"Ошибка: Ни в одном из файлов не найдена колонка '{on_column}' для объединения.")
             return pd.DataFrame()
 
-        # Начинаем с первой таблицы в списке
-        merged_df = valid_dfs[0]
+        if method not in MERGE_METHODS:
+            print(f"Предупреждение: неизвестный способ объединения '{method}', используется '{MERGE_EXACT}'.")
+            method = MERGE_EXACT
+        if method == MERGE_NEAREST and not tolerance:
+            method = MERGE_EXACT
 
-        # Последовательно присоединяем остальные
-        for i in range(1, len(valid_dfs)):
-            merged_df = pd.merge(merged_df, valid_dfs[i], on=on_column, how='outer')
+        started = time.perf_counter()
+        native = {}
+        if method == MERGE_RESAMPLE:
+            merged_df, native, grid_step = self._resample(valid_dfs, on_column, grid_step, interpolation,
+                                                          tolerance, compact)
+        else:
+            merged_df = self._merge(valid_dfs, on_column, method, tolerance, compact)
+            grid_step = None
+        if compact:
+            merged_df, memory = compact_dataframe(merged_df, [on_column])
+            print_memory_report(memory, "объединение")
+            native = {name: arrays for name, arrays in native.items() if name in merged_df.columns}
+        if native:
+            register_native_channels(merged_df, on_column, native)
 
-        # Сортируем данные по времени и сбрасываем индекс
-        merged_df = merged_df.sort_values(by=on_column).reset_index(drop=True)
-        
+        self.last_report = MergeReport(
+            sources=len(valid_dfs), rows=merged_df.shape[0], columns=merged_df.shape[1],
+            method=method, tolerance=tolerance, seconds=time.perf_counter() - started,
+            input_bytes=int(sum(df.memory_usage(index=True).sum() for df in valid_dfs)),
+            output_bytes=int(merged_df.memory_usage(index=True).sum()),
+            grid_step=grid_step,
+            native_bytes=int(sum(t.nbytes + v.nbytes for t, v in native.values())),
+            compact=compact,
+        )
         print(f"Объединение завершено. Итоговая таблица: {merged_df.shape[0]} строк, {merged_df.shape[1]} колонок.")
-        return merged_df
\ No newline at end of file
+        print(f"[DataMerger] {self.last_report.summary()}")
+        return merged_df
+
+    def _merge(self, dfs: List[pd.DataFrame], on_column: str, method: str,
+               tolerance: Optional[float], compact: bool = False) -> pd.DataFrame:
+        # 1. Время каждого файла: без пропусков, отсортированное (стабильно)
+        sources = []
+        for df in dfs:
+            times = _time_values(df[on_column])
+            rows = np.flatnonzero(~pd.isna(times))
+            if rows.size == times.size and not np.any(times[1:] < times[:-1]):
+                order = None  # уже отсортировано — колонки берутся без копирования
+                sources.append((df, order, times))
+            else:
+                order = rows[np.argsort(times[rows], kind='stable')]
+                sources.append((df, order, times[order]))
+
+        # 2. "nearest": метки притягиваются к уже собранной оси
+        keys = [src_times for _, _, src_times in sources]
+        if method == MERGE_NEAREST:
+            axis = np.unique(keys[0])
+            for k in range(1, len(keys)):
+                keys[k] = _snap_to_axis(keys[k], axis, tolerance)
+                if np.any(keys[k][1:] < keys[k][:-1]):
+                    df, order, src_times = sources[k]
+                    perm = np.argsort(keys[k], kind='stable')
+                    order = perm if order is None else order[perm]
+                    keys[k], sources[k] = keys[k][perm], (df, order, src_times[perm])
+                axis = np.union1d(axis, keys[k])
+
+        # 3. Общая ось: каждая метка повторяется столько раз, сколько
+        #    максимум раз она встречается в одном файле
+        ranks = [_occurrence_rank(k) for k in keys]
+        all_keys = np.concatenate(keys)
+        if not any(r.any() for r in ranks):
+            axis = np.unique(all_keys)  # повторов нет — достаточно одной сортировки
+        else:
+            all_ranks = np.concatenate(ranks)
+            lex = np.lexsort((all_ranks, all_keys))
+            sorted_keys = all_keys[lex]
+            starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+            multiplicity = np.maximum.reduceat(all_ranks[lex], starts) + 1
+            axis = np.repeat(sorted_keys[starts], multiplicity)
+        n_rows = axis.size
+
+        # 4. Раскладка колонок по позициям на оси
+        names = _merged_names([[c for c in df.columns if c != on_column] for df in dfs])
+        columns, arrays = [on_column], [axis]
+        for (df, order, src_times), key, rank, out_names in zip(sources, keys, ranks, names):
+            positions = np.searchsorted(axis, key, side='left') + rank
+            src_columns = [c for c in df.columns if c != on_column]
+            for column, out_name in zip(src_columns, out_names):
+                values = df[column].to_numpy() if isinstance(df[column].dtype, np.dtype) else df[column].array
+                if order is not None:
+                    values = values.take(order)
+                if isinstance(values, np.ndarray) and values.dtype.kind in 'iuf':
+                    merged = np.full(n_rows, np.nan, dtype=_channel_dtype(values, compact))
+                    merged[positions] = values
+                    if method == MERGE_INTERPOLATE:
+                        _fill_interpolated(merged, axis, src_times, values, tolerance)
+                else:
+                    indexer = np.full(n_rows, -1, dtype=np.intp)
+                    indexer[positions] = np.arange(len(positions))
+                    merged = take(values, indexer, allow_fill=True)
+                columns.append(out_name)
+                arrays.append(merged)
+
+        return _build_frame(columns, arrays)
+
+    def _resample(self, dfs: List[pd.DataFrame], on_column: str, grid_step: Optional[float],
+                  interpolation: str, tolerance: Optional[float], compact: bool = False):
+        """
+        Пересчет всех файлов на общую сетку.
+        Возвращает (таблица, {канал: (время, значения)} исходных отсчетов, шаг сетки).
+        """
+        sources = []
+        for df in dfs:
+            times = _time_values(df[on_column]).astype(float)
+            rows = np.flatnonzero(~np.isnan(times))
+            if rows.size == times.size and not np.any(times[1:] < times[:-1]):
+                order = None
+            else:
+                order = rows[np.argsort(times[rows], kind='stable')]
+                times = times[order]
+            sources.append((df, order, times))
+
+        grid, grid_step = _make_grid([t for _, _, t in sources], grid_step)
+        names = _merged_names([[c for c in df.columns if c != on_column] for df in dfs])
+        columns, arrays, native = [on_column], [grid], {}
+        for (df, order, times), out_names in zip(sources, names):
+            src_columns = [c for c in df.columns if c != on_column]
+            nearest = None
+            for column, out_name in zip(src_columns, out_names):
+                values = df[column].to_numpy() if isinstance(df[column].dtype, np.dtype) else df[column].array
+                if order is not None:
+                    values = values.take(order)
+                if isinstance(values, np.ndarray) and values.dtype.kind in 'iuf':
+                    dtype = _channel_dtype(values, compact)
+                    values = values.astype(dtype, copy=False)
+                    finite = np.isfinite(values)
+                    if finite.all():
+                        xs, ys = times, values
+                    else:
+                        xs, ys = times[finite], values[finite]
+                    native[out_name] = (np.ascontiguousarray(xs), np.ascontiguousarray(ys))
+                    # Интерполяция считается в float64, результат хранится в dtype канала
+                    resampled = _interpolate_on_grid(grid, xs, ys, interpolation, tolerance).astype(dtype, copy=False)
+                else:
+                    # Нечисловые колонки — значение ближайшего отсчета
+                    if nearest is None:
+                        nearest = _nearest_indexer(grid, times, tolerance)
+                    resampled = take(values, nearest, allow_fill=True)
+                columns.append(out_name)
+                arrays.append(resampled)
+        return _build_frame(columns, arrays), native, grid_step
+
+
+def _channel_dtype(values: np.ndarray, compact: bool):
+    """Тип хранения числового канала: float32 в компактном режиме или если он уже float32."""
+    return COMPACT_DTYPE if compact or values.dtype == COMPACT_DTYPE else np.float64
+
+
+def _build_frame(columns: List, arrays: List) -> pd.DataFrame:
+    # Целочисленные ключи: одинаковые имена внутри одного файла не схлопываются
+    merged_df = pd.DataFrame(dict(enumerate(arrays)), copy=False)
+    merged_df.columns = columns
+    return merged_df
+
+
+def _make_grid(source_times: List[np.ndarray], grid_step: Optional[float]):
+    """
+    Равномерная сетка на весь диапазон времени всех файлов.
+    Без заданного шага берется медианный шаг самого частого файла, а узлы
+    сдвигаются так, чтобы совпасть с его отсчетами.
+    """
+    present = [t for t in source_times if t.size]
+    if not present:
+        return np.zeros(0), grid_step
+    t_min = min(t[0] for t in present)
+    t_max = max(t[-1] for t in present)
+    anchor = t_min
+    if not grid_step or grid_step <= 0:
+        grid_step, anchor = None, t_min
+        best_rate = 0.0
+        for t in present:
+            steps = np.diff(t)
+            steps = steps[steps > 0]
+            if not steps.size:
+                continue
+            rate = t.size / max(t[-1] - t[0], np.finfo(float).tiny)
+            if rate > best_rate:
+                best_rate, grid_step, anchor = rate, float(np.median(steps)), t[0]
+        if grid_step is None:
+            return np.unique(np.concatenate(present)), None
+    first = anchor - np.floor((anchor - t_min) / grid_step + 1e-6) * grid_step
+    n_rows = int(np.floor((t_max - first) / grid_step + 1e-6)) + 1
+    if n_rows > MAX_GRID_ROWS:
+        print(f"Предупреждение: шаг сетки {grid_step:g} дает {n_rows} строк — шаг увеличен.")
+        grid_step = (t_max - first) / (MAX_GRID_ROWS - 1)
+        n_rows = MAX_GRID_ROWS
+    return first + grid_step * np.arange(n_rows), grid_step
+
+
+def _interpolate_on_grid(grid: np.ndarray, xs: np.ndarray, ys: np.ndarray,
+                         interpolation: str, tolerance: Optional[float]) -> np.ndarray:
+    """Значения на сетке; вне диапазона отсчетов (и дальше tolerance от них) — NaN."""
+    result = np.full(grid.size, np.nan)
+    if not xs.size:
+        return result
+    inside = np.flatnonzero((grid >= xs[0]) & (grid <= xs[-1]))
+    t = grid[inside]
+    if interpolation == INTERPOLATION_NEAREST or xs.size == 1:
+        result[inside] = ys[_nearest_positions(xs, t)]
+    else:
+        result[inside] = np.interp(t, xs, ys)
+    if tolerance and xs.size > 1:
+        distance = np.abs(xs[_nearest_positions(xs, t)] - t)
+        result[inside[distance > tolerance]] = np.nan
+    return result
+
+
+def _nearest_positions(xs: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Номер ближайшего к каждой точке t отсчета из отсортированного xs."""
+    if xs.size == 1:
+        return np.zeros(t.size, dtype=np.intp)
+    right = np.clip(np.searchsorted(xs, t), 1, xs.size - 1)
+    left = right - 1
+    return np.where(np.abs(xs[right] - t) < np.abs(t - xs[left]), right, left)
+
+
+def _nearest_indexer(grid: np.ndarray, times: np.ndarray, tolerance: Optional[float]) -> np.ndarray:
+    """Индексатор "узел сетки -> ближайшая строка файла" (-1 вне диапазона)."""
+    indexer = np.full(grid.size, -1, dtype=np.intp)
+    if not times.size:
+        return indexer
+    inside = np.flatnonzero((grid >= times[0]) & (grid <= times[-1]))
+    positions = _nearest_positions(times, grid[inside])
+    if tolerance:
+        keep = np.abs(times[positions] - grid[inside]) <= tolerance
+        inside, positions = inside[keep], positions[keep]
+    indexer[inside] = positions
+    return indexer
+
+
+def _time_values(column: pd.Series) -> np.ndarray:
+    if column.dtype.kind in 'iuf':
+        return column.to_numpy()
+    return pd.to_numeric(column, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+
+
+def _occurrence_rank(sorted_keys: np.ndarray) -> np.ndarray:
+    """Номер повторения каждой метки среди равных ей (0, 1, ...)."""
+    if not len(sorted_keys):
+        return np.zeros(0, dtype=np.intp)
+    idx = np.arange(len(sorted_keys))
+    starts = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+    return idx - np.maximum.accumulate(np.where(starts, idx, 0))
+
+
+def _snap_to_axis(keys: np.ndarray, axis: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Метки, лежащие ближе tolerance к метке оси, заменяются ею (к каждой
+    метке оси — только самая близкая).
+    """
+    if not len(keys) or not len(axis):
+        return keys
+    keys = keys.astype(float)
+    right = np.clip(np.searchsorted(axis, keys), 1, len(axis) - 1) if len(axis) > 1 else np.zeros(len(keys), int)
+    left = np.maximum(right - 1, 0)
+    d_left, d_right = np.abs(keys - axis[left]), np.abs(axis[right] - keys)
+    nearest = np.where(d_right < d_left, right, left)
+    distance = np.minimum(d_left, d_right)
+    candidates = np.flatnonzero(distance <= tolerance)
+    # Из нескольких кандидатов на одну метку оси — ближайший
+    if not len(candidates):
+        return keys
+    candidates = candidates[np.lexsort((distance[candidates], nearest[candidates]))]
+    targets = nearest[candidates]
+    chosen = candidates[np.r_[True, targets[1:] != targets[:-1]]]
+    keys[chosen] = axis[nearest[chosen]]
+    return keys
+
+
+def _fill_interpolated(merged: np.ndarray, axis: np.ndarray, src_times: np.ndarray,
+                       values: np.ndarray, tolerance: Optional[float]):
+    """Заполняет пропуски линейной интерполяцией по конечным отсчетам файла."""
+    finite = np.isfinite(values)
+    xs = src_times[finite].astype(float)
+    if xs.size < 2:
+        return
+    ys = values[finite].astype(float)
+    gaps = np.isnan(merged) & (axis >= xs[0]) & (axis <= xs[-1])
+    if tolerance:
+        t = axis.astype(float)
+        right = np.clip(np.searchsorted(xs, t), 1, xs.size - 1)
+        distance = np.minimum(np.abs(t - xs[right - 1]), np.abs(xs[right] - t))
+        gaps &= distance <= tolerance
+    merged[gaps] = np.interp(axis[gaps].astype(float), xs, ys)
+
+
+def _merged_names(name_lists: List[List]) -> List[List]:
+    """Имена колонок после цепочки попарных pd.merge (суффиксы _x/_y при совпадении)."""
+    names, owner = [], {}
+    for k, columns in enumerate(name_lists):
+        names.append(list(columns))
+        if k == 0:
+            owner = {c: (0, i) for i, c in enumerate(columns)}
+            continue
+        overlap = set(owner) & set(columns)
+        for c in overlap:
+            s, i = owner.pop(c)
+            names[s][i] = f"{c}_x"
+            owner[names[s][i]] = (s, i)
+        for i, c in enumerate(columns):
+            if c in overlap:
+                names[k][i] = f"{c}_y"
+            owner[names[k][i]] = (k, i)
+    return names
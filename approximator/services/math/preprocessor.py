@@ -4,7 +4,6 @@
 # =================================================================================
 
 import pandas as pd
-from scipy.signal import savgol_filter
 
 class Preprocessor:
     """
@@ -56,6 +55,8 @@ class Preprocessor:
             nan_mask = source_data.isna()
             interpolated_data = source_data.interpolate(method='linear', limit_direction='both')
             
+            # scipy.signal загружается только при сглаживании (тяжелый импорт)
+            from scipy.signal import savgol_filter
             smoothed_values = savgol_filter(interpolated_data, window_size, poly_degree)
             
             smoothed_series = pd.Series(smoothed_values, index=source_data.index)
@@ -1,5 +1,33 @@
+# Путь: services/math/smooth_fitter.py
+# =================================================================================
+# МОДУЛЬ СГЛАЖЕННОЙ АППРОКСИМАЦИИ СО СШИВКОЙ СЕГМЕНТОВ
+#
+# НАЗНАЧЕНИЕ:
+#   Совместная аппроксимация всех сегментов канала полиномами с точным
+#   выполнением условий гладкости C0/C1/C2 на общих границах.
+#
+# ЛОГИКА РАБОТЫ:
+#   1.  Для каждого сегмента в локальном базисе u = (x - c) / s, u ∈ [-1, 1],
+#       строятся нормальные уравнения G = XᵀX, h = Xᵀy. Матрица точек
+#       сегмента живет только во время этого шага; дальше хранятся лишь
+#       блоки (d+1)×(d+1).
+#   2.  Условия сшивки на границе i задаются строками C_i: значение и
+#       производные левого сегмента минус те же величины правого.
+#   3.  Решается KKT-система  [G  Cᵀ] [a] = [h]
+#                             [C  0 ] [λ]   [0]
+#       Неизвестные упорядочены как a_0, λ_0, a_1, λ_1, ..., поэтому
+#       матрица ленточная (ширина ленты ~ 2(d+1) + число условий) и
+#       решается scipy.linalg.solve_banded. Память — O(сегменты·d²)
+#       вместо O(точки·число коэффициентов) у плотного lstsq.
+#   4.  Коэффициенты из локальных базисов переводятся в np.poly1d по x.
+#
+# =================================================================================
+
 import numpy as np
 
+from approximator.services.time_index import SortedTimeAxis
+
+
 class SplineFitter:
     """
     Математическое ядро для сглаженной аппроксимации с возможностью сшивки сегментов.
@@ -19,72 +47,116 @@ class SplineFitter:
                 deriv_matrix = np.zeros_like(poly_matrix)
         return poly_matrix, deriv_matrix
 
+    @staticmethod
+    def _derivative_row(t, degree, center, scale, order):
+        """Строка k-й производной полинома в локальном базисе в точке t (по x)."""
+        powers = np.arange(degree, -1, -1)
+        row = np.zeros(degree + 1)
+        used = powers >= order
+        p = powers[used]
+        factor = np.ones(p.size)
+        for m in range(order):
+            factor *= p - m
+        u = (t - center) / scale
+        row[used] = factor * u ** (p - order) / scale ** order
+        return row
+
+    @staticmethod
+    def _to_global(local_coeffs, center, scale):
+        """Полином от u = (x - c) / s -> np.poly1d от x."""
+        return np.poly1d(local_coeffs)(np.poly1d([1.0 / scale, -center / scale]))
+
     def fit(self, segments, data, continuity=1):
         if not segments:
             return []
-        coeffs_per_segment = [seg.poly_degree + 1 for seg in segments]
-        total_coeffs = sum(coeffs_per_segment)
-        coeff_indices = np.cumsum([0] + coeffs_per_segment)
-        data_eqs, b_data = [], []
-        for i, seg in enumerate(segments):
-            mask = (data[:, 0] >= seg.x_start) & (data[:, 0] <= seg.x_end)
-            x_seg, y_seg = data[mask, 0], data[mask, 1]
-            if len(x_seg) > 0:
-                poly_matrix, _ = self.get_poly_and_deriv_matrix(x_seg, seg.poly_degree)
-                row = np.zeros((len(x_seg), total_coeffs))
-                start_col, end_col = coeff_indices[i], coeff_indices[i+1]
-                row[:, start_col:end_col] = poly_matrix
-                data_eqs.append(row)
-                b_data.append(y_seg)
-        if not data_eqs:
+        data = np.asarray(data, dtype=float)
+        time_axis = SortedTimeAxis(data[:, 0])
+        values = time_axis.take(data[:, 1])
+
+        # 1. Нормальные уравнения сегментов в локальных базисах
+        bases, normal_blocks, rhs_blocks = [], [], []
+        has_data = False
+        for seg in segments:
+            center = (seg.x_start + seg.x_end) / 2
+            scale = (seg.x_end - seg.x_start) / 2 or 1.0
+            i0, i1 = time_axis.row_range(seg.x_start, seg.x_end)
+            x_seg, y_seg = time_axis.time[i0:i1], values[i0:i1]
+            valid = ~np.isnan(y_seg)
+            if not valid.all():
+                x_seg, y_seg = x_seg[valid], y_seg[valid]
+            vander = np.vander((x_seg - center) / scale, seg.poly_degree + 1)
+            has_data = has_data or len(x_seg) > 0
+            bases.append((center, scale))
+            normal_blocks.append(vander.T @ vander)
+            rhs_blocks.append(vander.T @ y_seg)
+        if not has_data:
             return []
-        A_data, b_data = np.vstack(data_eqs), np.concatenate(b_data)
-        constraint_eqs = []
-        if len(segments) > 1:
-            for i in range(len(segments) - 1):
-                seg1, seg2 = segments[i], segments[i+1]
-                t = seg1.x_end
-                p1_matrix, d1_matrix = self.get_poly_and_deriv_matrix(np.array([t]), seg1.poly_degree)
-                p2_matrix, d2_matrix = self.get_poly_and_deriv_matrix(np.array([t]), seg2.poly_degree)
-                c0_row = np.zeros(total_coeffs)
-                c0_row[coeff_indices[i]:coeff_indices[i+1]] = p1_matrix
-                c0_row[coeff_indices[i+1]:coeff_indices[i+2]] = -p2_matrix
-                constraint_eqs.append(c0_row)
-                if continuity >= 1:
-                    c1_row = np.zeros(total_coeffs)
-                    c1_row[coeff_indices[i]:coeff_indices[i+1]] = d1_matrix
-                    c1_row[coeff_indices[i+1]:coeff_indices[i+2]] = -d2_matrix
-                    constraint_eqs.append(c1_row)
-                if continuity >= 2:
-                    def get_second_deriv_matrix(x, degree):
-                        x_col = x.reshape(-1, 1)
-                        if degree > 1:
-                            powers = np.arange(degree, -1, -1)
-                            second_deriv = powers * (powers - 1) * np.power(x_col, powers - 2)
-                            second_deriv[np.isnan(second_deriv)] = 0
-                            second_deriv[:, -1] = 0
-                            if degree > 0:
-                                second_deriv[:, -2] = 0
-                        else:
-                            second_deriv = np.zeros_like(x_col)
-                        return second_deriv
-                    d2_1 = get_second_deriv_matrix(np.array([t]), seg1.poly_degree)
-                    d2_2 = get_second_deriv_matrix(np.array([t]), seg2.poly_degree)
-                    c2_row = np.zeros(total_coeffs)
-                    c2_row[coeff_indices[i]:coeff_indices[i+1]] = d2_1
-                    c2_row[coeff_indices[i+1]:coeff_indices[i+2]] = -d2_2
-                    constraint_eqs.append(c2_row)
-        A_constraint = np.array(constraint_eqs)
-        W = 1000
-        if A_constraint.size > 0:
-            b_constraint = np.zeros(len(A_constraint))
-            A = np.vstack([A_data, A_constraint * W])
-            b = np.concatenate([b_data, b_constraint * W])
-        else:
-            A = A_data
-            b = b_data
+
+        # 2. Условия сшивки на общих границах (нулевые строки — например,
+        #    C2 между линейными сегментами — выполняются сами и отбрасываются)
+        constraints = []
+        for i in range(len(segments) - 1):
+            seg1, seg2 = segments[i], segments[i + 1]
+            t = seg1.x_end
+            # Масштаб строки не меняет решение, но выравнивает порядки величин
+            row_scale = min(bases[i][1], bases[i + 1][1])
+            left, right = [], []
+            for order in range(min(continuity, 2) + 1):
+                l_row = self._derivative_row(t, seg1.poly_degree, *bases[i], order) * row_scale ** order
+                r_row = self._derivative_row(t, seg2.poly_degree, *bases[i + 1], order) * row_scale ** order
+                if np.any(l_row) or np.any(r_row):
+                    left.append(l_row)
+                    right.append(-r_row)
+            constraints.append((np.array(left).reshape(len(left), seg1.poly_degree + 1),
+                                np.array(right).reshape(len(right), seg2.poly_degree + 1)))
+
+        # 3. Ленточная KKT-система: порядок неизвестных a_0, λ_0, a_1, λ_1, ...
+        coeff_offsets, lambda_offsets = [], []
+        size = 0
+        for i, seg in enumerate(segments):
+            coeff_offsets.append(size)
+            size += seg.poly_degree + 1
+            if i < len(constraints):
+                lambda_offsets.append(size)
+                size += len(constraints[i][0])
+
+        blocks = []
+        for i, block in enumerate(normal_blocks):
+            blocks.append((coeff_offsets[i], coeff_offsets[i], block))
+        for i, (left, right) in enumerate(constraints):
+            if not len(left):
+                continue
+            blocks.append((lambda_offsets[i], coeff_offsets[i], left))
+            blocks.append((coeff_offsets[i], lambda_offsets[i], left.T))
+            blocks.append((lambda_offsets[i], coeff_offsets[i + 1], right))
+            blocks.append((coeff_offsets[i + 1], lambda_offsets[i], right.T))
+
+        lower = max(r0 + m.shape[0] - 1 - c0 for r0, c0, m in blocks)
+        upper = max(c0 + m.shape[1] - 1 - r0 for r0, c0, m in blocks)
+        lower, upper = max(lower, 0), max(upper, 0)
+        banded = np.zeros((lower + upper + 1, size))
+        for r0, c0, m in blocks:
+            rows = np.arange(r0, r0 + m.shape[0])[:, None]
+            cols = np.arange(c0, c0 + m.shape[1])[None, :]
+            banded[upper + rows - cols, cols] = m
+
+        rhs = np.zeros(size)
+        for i, h in enumerate(rhs_blocks):
+            rhs[coeff_offsets[i]:coeff_offsets[i] + h.size] = h
+
+        # scipy.linalg загружается при первой сшивке (тяжелый импорт)
+        from scipy.linalg import solve_banded
         try:
-            coeffs_flat, _, _, _ = np.linalg.lstsq(A, b, rcond=None)
-            return [np.poly1d(coeffs_flat[coeff_indices[i]:coeff_indices[i+1]]) for i in range(len(segments))]
-        except np.linalg.LinAlgError:
+            solution = solve_banded((lower, upper), banded, rhs)
+        except (np.linalg.LinAlgError, ValueError) as e:
+            print(f"[SplineFitter] Система сшивки не решается: {e}")
             return []
+        if not np.all(np.isfinite(solution)):
+            print("[SplineFitter] Система сшивки вырождена")
+            return []
+
+        # 4. Перевод в полиномы по x
+        return [
+            self._to_global(solution[coeff_offsets[i]:coeff_offsets[i] + seg.poly_degree + 1], *bases[i])
+            for i, seg in enumerate(segments)
+        ]
@@ -6,6 +6,7 @@ import numpy as np
 import pandas as pd
 from typing import Optional
 from approximator.data_models.fit_result import FitResult
+from approximator.services.time_index import get_time_index
 
 class StandardFitter:
 
@@ -13,11 +14,13 @@ class StandardFitter:
         """
         Создаёт FitResult из np.poly1d для заданного сегмента и данных.
         """
-        mask = (df[time_column] >= x_start) & (df[time_column] <= x_end)
-        x_data = df.loc[mask, time_column]
-        y_data = df.loc[mask, channel_name]
+        time_index = get_time_index(df, time_column)
+        if time_index is None:
+            return None
+        x_data, y_data = time_index.segment_data(channel_name, x_start, x_end)
         if len(x_data) == 0 or len(y_data) == 0:
             return None
+        y_data = np.asarray(y_data, dtype=np.float64)
         y_predicted = poly(x_data)
         residuals = y_data - y_predicted
         ss_res = np.sum(residuals ** 2)
@@ -39,6 +42,9 @@ class StandardFitter:
         if len(x_data) <= degree:
             print(f"Предупреждение: недостаточно точек ({len(x_data)}) для аппроксимации полиномом {degree}-й степени.")
             return None
+        # Компактные (float32) данные переводятся в float64 только для этого участка
+        x_data = np.asarray(x_data, dtype=np.float64)
+        y_data = np.asarray(y_data, dtype=np.float64)
 
         try:
             coeffs = np.polyfit(x_data, y_data, degree)
@@ -0,0 +1,239 @@
+# Путь: approximator/services/parse_cache.py
+# =================================================================================
+# МОДУЛЬ ДИСКОВОГО КЕША РАЗОБРАННЫХ ФАЙЛОВ
+#
+# НАЗНАЧЕНИЕ:
+#   Не разбирать заново исходные CSV/XLS/TermoSoft файлы при каждом открытии
+#   проекта. После первого разбора DataFrame сохраняется по колонкам в .npy,
+#   а при следующих загрузках колонки отображаются в память (mmap).
+#
+# ЛОГИКА РАБОТЫ:
+#   1.  Ключ записи — хеш от (абсолютный путь, размер, mtime, имя парсера,
+#       версия парсера). Изменился файл или парсер — ключ другой, старая
+#       запись просто перестает использоваться и со временем вытесняется.
+#   2.  Запись — папка <кеш>/<ключ>/ с файлами колонок и манифестом
+#       meta.json (исходный файл, парсер, список колонок, размер). Папка
+#       сначала пишется во временную и затем атомарно переименовывается,
+#       поэтому параллельные загрузчики не видят недописанных записей.
+#   3.  Числовые колонки и даты читаются через np.load(mmap_mode='c'),
+#       строковые — целиком (массив строк + маска пропусков).
+#   4.  При каждом обращении обновляется время использования манифеста.
+#       После записи самые давно использованные записи удаляются, пока
+#       общий объем кеша больше бюджета (max_bytes).
+#   5.  Очистка кеша:  python -m approximator.services.parse_cache clear
+#       Сводка:        python -m approximator.services.parse_cache info
+#
+# =================================================================================
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Папка кеша по умолчанию (можно переопределить переменной окружения)
+DEFAULT_CACHE_DIR = os.environ.get(
+    "APPROXIMATOR_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".approximator", "parse_cache")
+)
+# Бюджет кеша по умолчанию — 2 ГБ
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+META_FILE = "meta.json"
+
+
+class ParseCache:
+    """Кеш разобранных файлов: одна папка с .npy-колонками на каждый файл."""
+
+    # Версия формата записей; при изменении старые записи не читаются
+    FORMAT_VERSION = 1
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    # --- Ключи ---
+
+    def key_for(self, file_path: str, parser) -> Optional[str]:
+        """Ключ записи для файла и парсера (None, если файл недоступен)."""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        parts = [os.path.abspath(file_path), st.st_size, st.st_mtime_ns,
+                 parser.__class__.__name__, getattr(parser, 'VERSION', 0), self.FORMAT_VERSION]
+        return hashlib.sha1(json.dumps(parts).encode('utf-8')).hexdigest()
+
+    # --- Чтение / запись ---
+
+    def get(self, key: Optional[str]) -> Optional[pd.DataFrame]:
+        """DataFrame из кеша (колонки отображены в память) или None."""
+        if key is None:
+            return None
+        entry_dir = os.path.join(self.cache_dir, key)
+        meta_path = os.path.join(entry_dir, META_FILE)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('format_version') != self.FORMAT_VERSION:
+                return None
+            arrays = {i: load_column(entry_dir, column) for i, column in enumerate(meta['columns'])}
+            index = None
+            if meta.get('index'):
+                index = np.load(os.path.join(entry_dir, meta['index']), mmap_mode='c')
+            # copy=False: каждая колонка остается отображением своего .npy
+            df = pd.DataFrame(arrays, index=index, copy=False)
+            df.columns = [column['name'] for column in meta['columns']]
+            os.utime(meta_path)  # время последнего использования (для вытеснения)
+            return df
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"[ParseCache] ⚠️ Поврежденная запись {key}: {e}")
+            return None
+
+    def put(self, key: Optional[str], file_path: str, parser, df: pd.DataFrame) -> bool:
+        """Сохраняет DataFrame в кеш. Возвращает True при успехе."""
+        if key is None or df is None or df.empty:
+            return False
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry_dir = os.path.join(self.cache_dir, key)
+        if os.path.exists(entry_dir):
+            return True
+        tmp_dir = os.path.join(self.cache_dir, f".tmp-{key}-{uuid.uuid4().hex}")
+        try:
+            os.makedirs(tmp_dir)
+            columns = []
+            for i, name in enumerate(df.columns):
+                columns.append(save_column(tmp_dir, f"col_{i:03d}", name, df.iloc[:, i]))
+            index_file = None
+            if not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 or df.index.step != 1:
+                index_file = "index.npy"
+                np.save(os.path.join(tmp_dir, index_file), np.asarray(df.index))
+            meta = {
+                'format_version': self.FORMAT_VERSION,
+                'path': os.path.abspath(file_path),
+                'parser': parser.__class__.__name__,
+                'parser_version': getattr(parser, 'VERSION', 0),
+                'columns': columns,
+                'index': index_file,
+                'created': time.time(),
+            }
+            meta['bytes'] = _dir_size(tmp_dir)
+            with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_dir, entry_dir)
+        except OSError as e:
+            # Например, запись уже создал параллельный загрузчик или нет места на диске
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not os.path.exists(entry_dir):
+                print(f"[ParseCache] ⚠️ Не удалось сохранить {file_path}: {e}")
+                return False
+        self.evict(keep=key)
+        return True
+
+    # --- Вытеснение и очистка ---
+
+    def entries(self) -> List[Tuple[str, float, int]]:
+        """Записи кеша: (ключ, время последнего использования, размер в байтах)."""
+        result = []
+        if not os.path.isdir(self.cache_dir):
+            return result
+        for name in os.listdir(self.cache_dir):
+            meta_path = os.path.join(self.cache_dir, name, META_FILE)
+            try:
+                used = os.stat(meta_path).st_mtime
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    size = int(json.load(f).get('bytes', 0))
+            except (OSError, ValueError):
+                continue
+            result.append((name, used, size))
+        return result
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Удаляет давно использованные записи сверх бюджета. Возвращает число удаленных."""
+        entries = sorted(self.entries(), key=lambda e: e[1])
+        total = sum(size for _, _, size in entries)
+        removed = 0
+        for key, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        """Удаляет весь кеш. Возвращает число удаленных записей."""
+        count = len(self.entries())
+        if os.path.isdir(self.cache_dir):
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+        return count
+
+
+# --- Колонки (общие для кеша и хранилища данных проекта) ---
+
+def save_column(entry_dir: str, stem: str, name, series: pd.Series) -> dict:
+    """Сохраняет колонку в <stem>.npy и возвращает ее описание для манифеста."""
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+        np.save(os.path.join(entry_dir, stem + ".npy"), series.to_numpy())
+        return {'name': name, 'file': stem + ".npy", 'kind': 'array'}
+    text, mask = encode_text(series)
+    np.save(os.path.join(entry_dir, stem + ".npy"), text)
+    np.save(os.path.join(entry_dir, stem + ".mask.npy"), mask)
+    return {'name': name, 'file': stem + ".npy", 'mask': stem + ".mask.npy", 'kind': 'text'}
+
+
+def load_column(entry_dir: str, column: dict):
+    """Колонка по описанию из манифеста; числовые — отображением в память."""
+    path = os.path.join(entry_dir, column['file'])
+    if column.get('kind') == 'text':
+        return decode_text(np.load(path), np.load(os.path.join(entry_dir, column['mask'])))
+    # 'c' — копирование при записи: правки DataFrame не попадают на диск
+    return np.load(path, mmap_mode='c')
+
+
+def encode_text(series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Строки и прочее: массив строк фиксированной ширины + маска пропусков."""
+    mask = series.isna().to_numpy()
+    text = np.array(['' if m else str(v) for v, m in zip(series.to_numpy(dtype=object), mask)], dtype=np.str_)
+    return text, mask
+
+
+def decode_text(text: np.ndarray, mask: np.ndarray):
+    values = np.asarray(text).astype(object)
+    values[np.asarray(mask)] = np.nan
+    return pd.array(values, dtype="str")
+
+
+def _dir_size(path: str) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else 'info'
+    cache = ParseCache()
+    if command == 'clear':
+        print(f"Кеш {cache.cache_dir}: удалено записей — {cache.clear()}")
+    elif command == 'info':
+        entries = cache.entries()
+        total = sum(size for _, _, size in entries)
+        print(f"Кеш {cache.cache_dir}: записей {len(entries)}, "
+              f"{total / 1024 ** 2:.1f} МБ из {cache.max_bytes / 1024 ** 2:.0f} МБ")
+    else:
+        print("Использование: python -m approximator.services.parse_cache [info|clear]")
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -41,6 +41,10 @@ class DraggableSegmentBoundary:
         # 🧹 Подключаем универсальный удалитель
         self._remover = RemovableArtist(self._line, ax)
 
+    @property
+    def line(self) -> Line2D:
+        return self._line
+
     def contains(self, event: MouseEvent) -> bool:
         if event.inaxes != self.ax or event.xdata is None:
             return False
@@ -66,16 +70,25 @@ class DraggableSegmentBoundary:
         if not (self.pressed and event.xdata):
             return
 
-        moved = self.editor.move_boundary(
+        # Двигаем границу вместе с совпадающей границей соседнего сегмента
+        touched = self.editor.move_shared_boundary(
             index=self.segment_index,
             side=self.side,
             new_x=event.xdata
         )
 
-        if moved:
+        if touched:
             self._line.set_xdata([event.xdata, event.xdata])
             if callable(self.on_move_callback):
-                self.on_move_callback()
+                self.on_move_callback(self, touched)
+
+    def sync(self):
+        """Подтягивает положение линии к текущей границе сегмента."""
+        if self.segment_index >= len(self.channel.segments):
+            return
+        segment = self.channel.segments[self.segment_index]
+        x = segment.x_start if self.side == 'start' else segment.x_end
+        self._line.set_xdata([x, x])
 
     def on_release(self, event: MouseEvent):
         if not self.pressed:
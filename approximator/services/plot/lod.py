@@ -0,0 +1,171 @@
+# Путь: services/plot/lod.py
+# =================================================================================
+# МОДУЛЬ УРОВНЕЙ ДЕТАЛИЗАЦИИ (LOD) ДЛЯ ИСХОДНЫХ ДАННЫХ
+#
+# НАЗНАЧЕНИЕ:
+#   Отрисовка каналов с миллионами точек без передачи в matplotlib всех
+#   отсчетов. На экран выводится порядка 2-8 точек на пиксель ширины осей.
+#
+# ЛОГИКА РАБОТЫ:
+#   1.  Для каждой серии один раз строится пирамида min/max: на уровне с
+#       блоком b для каждого блока хранится индекс минимума и максимума.
+#       Блоки растут в BLOCK_FACTOR раз от уровня к уровню.
+#   2.  Для текущих границ оси X выбирается самый грубый уровень, на котором
+#       блоков не меньше, чем пикселей, и из каждого блока берутся две
+#       реальные точки (min и max) в порядке следования. Пики сохраняются
+#       точно — это исходные отсчеты, а не усредненные значения.
+#   3.  `LodLayer` подписывается на `xlim_changed` осей и при зуме/панораме
+#       заново прореживает все привязанные линии.
+#
+# =================================================================================
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+from approximator.services.time_index import SortedTimeAxis
+
+
+class MinMaxPyramid:
+    """Пирамида min/max по оси времени для одной серии."""
+
+    BASE_BLOCK = 8
+    BLOCK_FACTOR = 4
+
+    def __init__(self, x, y):
+        axis = SortedTimeAxis(x)
+        y = axis.take(np.asarray(y, dtype=np.float64))
+        valid = ~(np.isnan(axis.time) | np.isnan(y))
+        if valid.all():
+            self.x, self.y = axis.time, y
+        else:
+            self.x, self.y = axis.time[valid], y[valid]
+        self._axis = SortedTimeAxis.from_sorted(self.x)
+        # Уровни: (размер блока, индексы минимумов, индексы максимумов)
+        self.levels = []
+        self._build()
+
+    def __len__(self):
+        return self.x.size
+
+    def _build(self):
+        n = self.y.size
+        if n <= self.BASE_BLOCK:
+            return
+        indices = np.arange(n)
+        min_idx = self._reduce(self.y, indices, self.BASE_BLOCK, np.argmin)
+        max_idx = self._reduce(self.y, indices, self.BASE_BLOCK, np.argmax)
+        block = self.BASE_BLOCK
+        self.levels.append((block, min_idx, max_idx))
+        while min_idx.size > 1:
+            min_idx = self._reduce(self.y[min_idx], min_idx, self.BLOCK_FACTOR, np.argmin)
+            max_idx = self._reduce(self.y[max_idx], max_idx, self.BLOCK_FACTOR, np.argmax)
+            block *= self.BLOCK_FACTOR
+            self.levels.append((block, min_idx, max_idx))
+
+    @staticmethod
+    def _reduce(values, indices, factor, arg_func):
+        """Для каждого блока из factor элементов — исходный индекс экстремума."""
+        n = values.size
+        blocks = -(-n // factor)
+        pad = blocks * factor - n
+        if pad:
+            # Хвост дополняется последним элементом: экстремум не меняется
+            values = np.concatenate([values, np.repeat(values[-1:], pad)])
+            indices = np.concatenate([indices, np.repeat(indices[-1:], pad)])
+        rows = np.arange(blocks)
+        picked = arg_func(values.reshape(blocks, factor), axis=1)
+        return indices.reshape(blocks, factor)[rows, picked]
+
+    def query(self, x_min: float, x_max: float, pixels: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Точки серии для интервала [x_min, x_max] при ширине осей pixels."""
+        i0, i1 = self._axis.row_range(x_min, x_max)
+        # Захватываем по соседней точке, чтобы линия доходила до краев
+        i0, i1 = max(i0 - 1, 0), min(i1 + 1, self.x.size)
+        count = i1 - i0
+        pixels = max(int(pixels), 1)
+        if count <= 2 * pixels or not self.levels:
+            return self.x[i0:i1], self.y[i0:i1]
+
+        # Самый грубый уровень, у которого блоков в интервале не меньше, чем пикселей
+        block, min_idx, max_idx = self.levels[0]
+        for level in self.levels:
+            if count / level[0] < pixels:
+                break
+            block, min_idx, max_idx = level
+
+        j0, j1 = i0 // block, -(-i1 // block)
+        lo, hi = min_idx[j0:j1], max_idx[j0:j1]
+        picked = np.empty(lo.size * 2, dtype=lo.dtype)
+        picked[0::2] = np.minimum(lo, hi)
+        picked[1::2] = np.maximum(lo, hi)
+        return self.x[picked], self.y[picked]
+
+    def overview(self, pixels: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Прореженная серия целиком (для автомасштаба)."""
+        if not self.x.size:
+            return self.x, self.y
+        return self.query(self.x[0], self.x[-1], pixels)
+
+
+class LodLayer:
+    """
+    Прореживание линий под текущий масштаб осей.
+    Линия регистрируется вместе с исходными данными; ее данные затем
+    подменяются при каждом изменении границ оси X.
+    """
+
+    def __init__(self, ax):
+        self.ax = ax
+        self._series: Dict[object, MinMaxPyramid] = {}
+        self._lines: Dict[object, object] = {}
+        self.cid = ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+
+    def pixels(self) -> int:
+        """Ширина осей в пикселях."""
+        try:
+            return max(int(self.ax.get_window_extent().width), 100)
+        except Exception:
+            return 1000
+
+    def set_source(self, key, x, y) -> Tuple[np.ndarray, np.ndarray]:
+        """Строит пирамиду серии и возвращает точки для текущих границ."""
+        self._series[key] = MinMaxPyramid(x, y)
+        return self.decimate(key)
+
+    def bind(self, key, line):
+        """Привязывает Line2D к серии: ее данные будут обновляться при зуме."""
+        self._lines[key] = line
+
+    def discard(self, key):
+        self._series.pop(key, None)
+        self._lines.pop(key, None)
+
+    def clear(self):
+        """Забывает все серии. Вызывается после ax.clear(), который сбрасывает callbacks осей."""
+        self._series.clear()
+        self._lines.clear()
+        self.cid = self.ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+
+    def decimate(self, key) -> Tuple[np.ndarray, np.ndarray]:
+        pyramid = self._series[key]
+        x_min, x_max = self.ax.get_xlim()
+        if x_min > x_max:
+            x_min, x_max = x_max, x_min
+        return pyramid.query(x_min, x_max, self.pixels())
+
+    def show_overview(self):
+        """Ставит во все линии прореженные серии целиком — перед relim/autoscale."""
+        pixels = self.pixels()
+        for key, line in self._lines.items():
+            if key in self._series:
+                line.set_data(*self._series[key].overview(pixels))
+
+    def update(self):
+        """Заново прореживает все видимые линии под текущие границы."""
+        for key, line in self._lines.items():
+            if key in self._series and line.axes is not None and line.get_visible():
+                line.set_data(*self.decimate(key))
+
+    def _on_xlim_changed(self, ax):
+        self.update()
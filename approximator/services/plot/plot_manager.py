@@ -1,21 +1,46 @@
 """
 PlotManager отвечает исключительно за визуализацию графика.
 Он не обрабатывает события, не управляет состоянием, не хранит интерактивные объекты.
+
+Отрисовка ведется в retained-режиме: artists создаются один раз и затем только
+обновляются (см. services/plot/retained.py). Границы и выделение — оверлеи,
+которые выводятся через blit поверх закешированного фона.
 """
 
+import weakref
+
+import numpy as np
+
 from .boundaries.draggable_segment_boundary import DraggableSegmentBoundary
+from .lod import LodLayer
+from .retained import ArtistCache, BlitManager
+
+# Количество точек на кривой аппроксимации одного сегмента
+FIT_CURVE_POINTS = 200
 
 
 class PlotManager:
     def __init__(self, plot_widget):
         """
         Инициализирует менеджер отрисовки.
-        
+
         Args:
             plot_widget: Виджет для отрисовки графиков (FigureCanvasQTAgg)
         """
         self.plot_widget = plot_widget
         self.ax = plot_widget.figure.gca()  # FigureCanvasQTAgg уже является canvas'ом
+        # Постоянные artists: серии каналов, кривые сегментов, границы
+        self._artists = ArtistCache(self.ax)
+        # Прореживание исходных серий под текущий масштаб (min/max пирамиды)
+        self._lod = LodLayer(self.ax)
+        # Внешние оверлеи (перетаскиваемые границы) и временные (на время drag)
+        self._external_overlays = []
+        self._interactive = []
+        self._blit = BlitManager(plot_widget)
+        self._blit.add_provider(self._artists.overlays)
+        self._blit.add_provider(self._live_external_overlays)
+        self._blit.add_provider(lambda: self._interactive)
+        self._df_ref = None
         self._clear_plot()
         self._current_ylim = None
         self._current_xlim = None
@@ -24,28 +49,32 @@ class PlotManager:
     def canvas(self):
         """Возвращает холст для отрисовки."""
         return self.plot_widget
-        
+
     def _clear_plot(self):
         """Очищает график."""
+        self._artists.clear()
         self.ax.clear()
-        self.plot_widget.draw()
-        
+        self._lod.clear()
+        self._df_ref = None
+        self._blit.draw()
+
     def _save_view_state(self):
         """Сохраняет текущие границы осей."""
         self._current_xlim = self.ax.get_xlim()
         self._current_ylim = self.ax.get_ylim()
-        
+
     def _restore_view_state(self):
         """Восстанавливает сохраненные границы осей."""
         if self._current_xlim is not None and self._current_ylim is not None:
             self.ax.set_xlim(self._current_xlim)
             self.ax.set_ylim(self._current_ylim)
 
-    def _draw_segment_boundaries(self, segment, is_selected=False):
+    def _draw_segment_boundaries(self, index, segment, is_selected=False):
         """
         Отрисовывает границы сегмента с использованием его параметров.
 
         Args:
+            index: индекс сегмента (ключ постоянных линий)
             segment: экземпляр Segment
             is_selected: выделен ли сегмент (например, выбран в интерфейсе)
         """
@@ -53,21 +82,78 @@ class PlotManager:
             return
 
         # Цвет и стиль линии — с учётом выделения
-        color = 'red' if is_selected else segment.color
-        linestyle = segment.line_style
-        linewidth = segment.thickness
+        style = dict(color='red' if is_selected else segment.color,
+                     linestyle=segment.line_style,
+                     linewidth=segment.thickness,
+                     alpha=0.5)
+        self._artists.vline(('boundary', index, 'start'), segment.x_start, **style)
+        self._artists.vline(('boundary', index, 'end'), segment.x_end, **style)
+
+    @staticmethod
+    def _segment_curve_data(segment):
+        """Точки кривой аппроксимации сегмента (None, если fit отсутствует)."""
+        fit = segment.fit_result
+        if fit is None or not fit.coefficients or segment.segment_type == "Маска":
+            return None
+        x_fit = np.linspace(segment.x_start, segment.x_end, FIT_CURVE_POINTS)
+        return x_fit, np.polyval(fit.coefficients, x_fit)
+
+    def _draw_segment_curve(self, channel_name, index, segment):
+        """Рисует (или обновляет) кривую сегмента; без fit — скрывает ее."""
+        key = ('curve', channel_name, index)
+        data = self._segment_curve_data(segment)
+        if data is None:
+            self._artists.hide(key)
+            return None
+        data_key = (segment.x_start, segment.x_end, tuple(segment.fit_result.coefficients))
+        return self._artists.line(key, data_key, lambda: data,
+                                  color=segment.color, linestyle=segment.line_style,
+                                  linewidth=segment.thickness)
+
+    def update_segment_curves(self, channel_name, segments, indices):
+        """
+        Обновляет кривые указанных сегментов через set_data, без ax.clear().
+        Вызывающий сам решает, когда вывести изменения (refresh_overlays / draw_idle).
+        """
+        for i in indices:
+            if 0 <= i < len(segments):
+                self._draw_segment_curve(channel_name, i, segments[i])
+
+    def segment_curves(self, channel_name, indices):
+        """Постоянные линии кривых указанных сегментов."""
+        curves = (self._artists.get(('curve', channel_name, i)) for i in indices)
+        return [c for c in curves if c is not None]
 
-        self.ax.axvline(x=segment.x_start, color=color, linestyle=linestyle,
-                        linewidth=linewidth, alpha=0.5)
-        self.ax.axvline(x=segment.x_end, color=color, linestyle=linestyle,
-                        linewidth=linewidth, alpha=0.5)
+    # --- Оверлеи и blitting ---
 
+    def add_overlay(self, artist):
+        """Регистрирует внешний оверлей (например, перетаскиваемую границу)."""
+        self._external_overlays.append(artist)
+
+    def _live_external_overlays(self):
+        self._external_overlays = [a for a in self._external_overlays if a.axes is not None]
+        return self._external_overlays
+
+    def begin_interaction(self, artists):
+        """На время перетаскивания выводит указанные artists через blit."""
+        self._interactive = list(artists)
+
+    def end_interaction(self):
+        """Возвращает временные оверлеи в обычную отрисовку."""
+        self._interactive = []
+        self._blit.sync_animated()
+
+    def refresh_overlays(self):
+        """Перерисовывает только оверлеи поверх закешированного фона."""
+        self._blit.update()
 
     def redraw_all_channels(self, df, x_col, channel_states, active_channel_name=None,
                             selected_segment_index=None, preserve_zoom=False,
                             show_source=True, show_approximation=True):
         """
         Перерисовывает все каналы на графике.
+        Обновляются только изменившиеся artists; если изменились лишь
+        границы/выделение, холст не перерисовывается целиком.
 
         Args:
             df: pandas.DataFrame с данными
@@ -81,8 +167,14 @@ class PlotManager:
         """
         if preserve_zoom:
             self._save_view_state()
+        limits = (self.ax.get_xlim(), self.ax.get_ylim())
 
-        self._clear_plot()
+        # Новая таблица — данные во всех сериях нужно перезагрузить
+        if self._df_ref is None or self._df_ref() is not df:
+            self._artists.invalidate_data()
+            self._df_ref = weakref.ref(df)
+
+        self._artists.begin()
 
         # Отрисовка всех каналов
         for channel_name, channel_state in channel_states.items():
@@ -91,33 +183,62 @@ class PlotManager:
 
             # Исходные данные
             if show_source and channel_name in df.columns:
-                color = 'red' if channel_name == active_channel_name else channel_state.base_color
-                alpha = 1.0 if channel_name == active_channel_name else 0.3
-                self.ax.scatter(df[x_col], df[channel_name], color=color, alpha=alpha, s=1)
+                is_active = channel_name == active_channel_name
+                key = ('source', channel_name)
+                line = self._artists.line(
+                    key, (x_col, channel_name),
+                    lambda key=key, name=channel_name: self._lod.set_source(
+                        key, df[x_col].to_numpy(), df[name].to_numpy()),
+                    linestyle='none', marker='o', markersize=1,
+                    color='red' if is_active else channel_state.base_color,
+                    alpha=1.0 if is_active else 0.3
+                )
+                self._lod.bind(key, line)
 
             # Аппроксимация
             approx_col = f"{channel_name}_approx"
             if show_approximation and approx_col in df.columns:
-                self.ax.plot(
-                    df[x_col],
-                    df[approx_col],
+                key = ('approx', channel_name)
+                line = self._artists.line(
+                    key, (x_col, approx_col),
+                    lambda key=key, col=approx_col: self._lod.set_source(
+                        key, df[x_col].to_numpy(), df[col].to_numpy()),
                     color=channel_state.base_color,
                     linestyle=channel_state.line_style,
                     linewidth=channel_state.thickness,
                     alpha=0.7
                 )
+                self._lod.bind(key, line)
+
+            # Кривые аппроксимации сегментов
+            if show_approximation:
+                for i, segment in enumerate(channel_state.segments or []):
+                    self._draw_segment_curve(channel_name, i, segment)
 
         # Отрисовка сегментов активного канала
         if active_channel_name and active_channel_name in channel_states:
             segments = channel_states[active_channel_name].segments or []
             for i, segment in enumerate(segments):
-                self._draw_segment_boundaries(segment, i == selected_segment_index)
+                self._draw_segment_boundaries(i, segment, i == selected_segment_index)
+
+        self._artists.end()
 
         if preserve_zoom:
             self._restore_view_state()
-
-        self.plot_widget.draw()
+        else:
+            # Автомасштаб — по прореженным сериям целиком, а не по текущему окну
+            self._lod.show_overview()
+            self.ax.relim(visible_only=True)
+            self.ax.set_autoscale_on(True)
+            self.ax.autoscale_view()
+        self._lod.update()
+
+        # Полная перерисовка — только если изменился фон (данные, стиль, масштаб)
+        if self._artists.content_changed or limits != (self.ax.get_xlim(), self.ax.get_ylim()):
+            self._blit.draw()
+        else:
+            self._blit.update()
 
     def get_axes(self):
         """Возвращает текущие оси графика."""
-        return self.ax
\ No newline at end of file
+        return self.ax
@@ -0,0 +1,231 @@
+# Путь: services/plot/retained.py
+# =================================================================================
+# МОДУЛЬ ПОСТОЯННЫХ (RETAINED) АРТИСТОВ И BLITTING'А
+#
+# НАЗНАЧЕНИЕ:
+#   Перерисовка графика без ax.clear(): каждый элемент (серия канала, кривая
+#   сегмента, граница, выделение) — постоянный artist, который создается один
+#   раз и затем только обновляется через set_data / set_visible.
+#
+# ЛОГИКА РАБОТЫ:
+#   1.  `ArtistCache` хранит artists по ключу. Между `begin()` и `end()`
+#       менеджер отрисовки "заявляет" нужные artists; незаявленные скрываются.
+#       Данные пересчитываются и загружаются в artist только при смене
+#       ключа данных (data_key), стиль — только при его изменении.
+#   2.  Кеш помнит, менялось ли что-то, кроме оверлеев (`content_changed`).
+#       Если нет — полная перерисовка холста не нужна.
+#   3.  `BlitManager` держит оверлеи (границы, выделение, перетаскиваемые
+#       линии) в режиме animated: они не входят в фон. Фон кешируется на
+#       каждом draw_event, а изменения оверлеев выводятся через blit.
+#
+# =================================================================================
+
+from matplotlib.lines import Line2D
+
+
+class ArtistCache:
+    """Постоянные artists осей, адресуемые ключом."""
+
+    def __init__(self, ax):
+        self.ax = ax
+        self._artists = {}      # key -> artist
+        self._data_keys = {}    # key -> ключ данных, загруженных в artist
+        self._styles = {}       # key -> последний примененный стиль
+        self._overlays = set()  # ключи оверлеев (рисуются через blit)
+        self._claimed = set()
+        self.content_changed = False
+
+    # --- Цикл перерисовки ---
+
+    def begin(self):
+        """Начинает проход перерисовки."""
+        self._claimed = set()
+        self.content_changed = False
+
+    def end(self):
+        """Скрывает artists, которые не были заявлены в этом проходе."""
+        for key, artist in self._artists.items():
+            if key not in self._claimed and artist.get_visible():
+                artist.set_visible(False)
+                self._mark_changed(key)
+
+    def clear(self):
+        """Удаляет все artists кеша с осей."""
+        for artist in self._artists.values():
+            try:
+                artist.remove()
+            except (ValueError, NotImplementedError):
+                pass
+        self._artists.clear()
+        self._data_keys.clear()
+        self._styles.clear()
+        self._overlays.clear()
+        self.content_changed = True
+
+    def invalidate_data(self):
+        """Заставляет перезагрузить данные во все artists при следующем проходе."""
+        self._data_keys.clear()
+
+    def hide(self, key):
+        """Скрывает artist (если он есть), не дожидаясь end()."""
+        artist = self._artists.get(key)
+        if artist is not None and artist.get_visible():
+            artist.set_visible(False)
+            self._mark_changed(key)
+
+    # --- Доступ ---
+
+    def get(self, key):
+        return self._artists.get(key)
+
+    def items(self, kind=None):
+        """Пары (ключ, artist); kind фильтрует по первому элементу ключа."""
+        return [(k, a) for k, a in self._artists.items() if kind is None or k[0] == kind]
+
+    def overlays(self):
+        """Оверлеи — их рисует BlitManager (скрытые он просто пропускает)."""
+        return [self._artists[k] for k in self._overlays]
+
+    # --- Заявка artists ---
+
+    def line(self, key, data_key, data_fn, overlay=False, **style):
+        """
+        Линия (Line2D). data_fn() -> (x, y) вызывается только если data_key изменился.
+        """
+        artist = self._artists.get(key)
+        if artist is None:
+            x, y = data_fn()
+            artist = Line2D(x, y)
+            self.ax.add_line(artist)
+            self._register(key, artist, data_key, overlay)
+        elif self._data_keys.get(key) != data_key or key not in self._data_keys:
+            artist.set_data(*data_fn())
+            self._data_keys[key] = data_key
+            self._mark_changed(key)
+        self._apply(key, artist, style)
+        return artist
+
+    def vline(self, key, x, overlay=True, **style):
+        """Вертикальная линия на всю высоту осей (аналог axvline)."""
+        artist = self._artists.get(key)
+        if artist is None:
+            artist = self.ax.axvline(x=x)
+            self._register(key, artist, x, overlay)
+        elif self._data_keys.get(key) != x:
+            artist.set_xdata([x, x])
+            self._data_keys[key] = x
+            self._mark_changed(key)
+        self._apply(key, artist, style)
+        return artist
+
+    def span(self, key, x0, x1, overlay=True, **style):
+        """Вертикальная полоса выделения (аналог axvspan)."""
+        artist = self._artists.get(key)
+        if artist is None:
+            artist = self.ax.axvspan(x0, x1)
+            self._register(key, artist, (x0, x1), overlay)
+        elif self._data_keys.get(key) != (x0, x1):
+            if hasattr(artist, 'set_x') and hasattr(artist, 'set_width'):
+                artist.set_x(x0)
+                artist.set_width(x1 - x0)
+            else:
+                artist.set_xy([[x0, 0], [x0, 1], [x1, 1], [x1, 0], [x0, 0]])
+            self._data_keys[key] = (x0, x1)
+            self._mark_changed(key)
+        self._apply(key, artist, style)
+        return artist
+
+    # --- Внутреннее ---
+
+    def _register(self, key, artist, data_key, overlay):
+        self._artists[key] = artist
+        self._data_keys[key] = data_key
+        self._styles[key] = None
+        if overlay:
+            self._overlays.add(key)
+        self._mark_changed(key)
+
+    def _apply(self, key, artist, style):
+        self._claimed.add(key)
+        if self._styles.get(key) != style:
+            artist.set(**style)
+            self._styles[key] = dict(style)
+            self._mark_changed(key)
+        if not artist.get_visible():
+            artist.set_visible(True)
+            self._mark_changed(key)
+
+    def _mark_changed(self, key):
+        if key not in self._overlays:
+            self.content_changed = True
+
+
+class BlitManager:
+    """
+    Кеширует фон холста и перерисовывает поверх него только оверлеи.
+    Оверлеи помечаются animated и не попадают в обычную отрисовку фигуры.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self._background = None
+        self._providers = []   # функции, возвращающие списки оверлеев
+        self._animated = []
+        self.cid = canvas.mpl_connect('draw_event', self._on_draw)
+
+    def add_provider(self, provider):
+        """Регистрирует источник оверлеев: provider() -> список artists."""
+        self._providers.append(provider)
+
+    def artists(self):
+        result = []
+        for provider in self._providers:
+            result.extend(a for a in provider() if a.axes is not None)
+        return result
+
+    def sync_animated(self) -> bool:
+        """
+        Помечает текущие оверлеи как animated.
+        Возвращает True, если набор изменился и фон нужно перерисовать.
+        """
+        current = self.artists()
+        current_ids = {id(a) for a in current}
+        changed = False
+        for artist in self._animated:
+            if id(artist) not in current_ids:
+                artist.set_animated(False)
+                changed = True
+        for artist in current:
+            if not artist.get_animated():
+                artist.set_animated(True)
+                changed = True
+        self._animated = current
+        if changed:
+            self._background = None
+        return changed
+
+    def draw(self):
+        """Полная перерисовка: фон рисуется заново, оверлеи — в draw_event."""
+        self.sync_animated()
+        self.canvas.draw()
+
+    def update(self):
+        """Обновляет только оверлеи поверх закешированного фона."""
+        if self.sync_animated() or self._background is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self._background)
+        self._draw_animated()
+        self.canvas.blit(self.canvas.figure.bbox)
+
+    def _on_draw(self, event):
+        if event is not None and event.canvas is not self.canvas:
+            return
+        self._background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        figure = self.canvas.figure
+        for artist in self._animated:
+            if artist.axes is not None and artist.get_visible():
+                figure.draw_artist(artist)
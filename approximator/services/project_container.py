@@ -0,0 +1,258 @@
+# Путь: approximator/services/project_container.py
+# =================================================================================
+# МОДУЛЬ ФАЙЛА ПРОЕКТА С ДАННЫМИ (.approx)
+#
+# НАЗНАЧЕНИЕ:
+#   Проект одним файлом: настройки, каналы, сегменты, аппроксимации и
+#   сами данные. Открывается без исходных файлов (их папки можно
+#   переносить и удалять) и без повторного разбора и объединения.
+#
+# ЛОГИКА РАБОТЫ:
+#   1.  Файл — zip без сжатия (ZIP_STORED):
+#         project.json       — состояние проекта (формат ProjectStateController)
+#                              + описание колонок данных;
+#         data/col_NNN.npy   — колонки объединенной таблицы;
+#         native/*.npy       — исходные отсчеты каналов (режим "resample");
+#         fits.npy           — коэффициенты всех аппроксимаций подряд (float64).
+#   2.  Коэффициенты хранятся двоично, а не текстом: в project.json у
+#       FitResult вместо списка — ссылка [начало, количество] в fits.npy.
+#   3.  Члены архива не сжаты, поэтому числовые колонки при открытии
+#       отображаются в память прямо из .approx (np.memmap со смещением
+#       члена в файле, режим 'c' — правки в памяти не попадают на диск).
+#       Открытие проекта в несколько ГБ занимает время чтения project.json.
+#   4.  Запись идет во временный файл рядом и атомарно заменяет прежний.
+#   5.  Пока файл отображен в память, Windows не дает его заменить. Перед
+#       сохранением поверх открытого проекта данные переводятся в память
+#       (detach_from_file), а отображения отпускаются.
+#
+# =================================================================================
+
+import copy
+import json
+import os
+import struct
+import uuid
+import zipfile
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from approximator.services.parse_cache import decode_text, encode_text
+
+PROJECT_EXTENSION = ".approx"
+STATE_FILE = "project.json"
+FITS_FILE = "fits.npy"
+CONTAINER_VERSION = 1
+
+# Размер фиксированной части локального заголовка члена zip
+_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+
+
+def is_project_container(path: str) -> bool:
+    """Файл — проект .approx (zip с project.json)."""
+    if not os.path.isfile(path) or not zipfile.is_zipfile(path):
+        return False
+    with zipfile.ZipFile(path) as zf:
+        return STATE_FILE in zf.namelist()
+
+
+def write_project_container(path: str, state: dict, df: Optional[pd.DataFrame] = None,
+                            time_column: Optional[str] = None,
+                            native: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None):
+    """
+    Сохраняет состояние проекта и данные в один файл .approx.
+    Если df/native отображены из path (сохранение поверх открытого проекта),
+    массивы сначала копируются в память, но отображения вызывающего кода
+    должны быть отпущены до записи (см. detach_from_file) — иначе на Windows
+    os.replace завершится PermissionError.
+    """
+    df, native = detach_from_file(path, df, native)
+    state = copy.deepcopy(state)
+    fits = _extract_coefficients(state)
+    tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+    try:
+        with zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+            columns = []
+            if df is not None and not df.empty:
+                for i, name in enumerate(df.columns):
+                    columns.append(_write_column(zf, f"data/col_{i:03d}", name, df.iloc[:, i]))
+            native_entries, time_members = [], {}
+            for i, (name, (time_values, values)) in enumerate((native or {}).items()):
+                if id(time_values) not in time_members:
+                    time_members[id(time_values)] = f"native/time_{len(time_members):03d}.npy"
+                    _write_array(zf, time_members[id(time_values)], time_values)
+                values_member = f"native/values_{i:03d}.npy"
+                _write_array(zf, values_member, values)
+                native_entries.append({'name': name, 'time': time_members[id(time_values)], 'values': values_member})
+            _write_array(zf, FITS_FILE, fits)
+            manifest = {
+                'container_version': CONTAINER_VERSION,
+                'state': state,
+                'data': {
+                    'time_column': time_column,
+                    'rows': 0 if df is None else int(df.shape[0]),
+                    'columns': columns,
+                    'native': native_entries,
+                },
+                'fits': FITS_FILE,
+            }
+            zf.writestr(STATE_FILE, json.dumps(manifest, ensure_ascii=False, indent=1))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def read_project_container(path: str) -> Tuple[dict, pd.DataFrame, Dict[str, Tuple[np.ndarray, np.ndarray]]]:
+    """
+    Открывает .approx: (состояние проекта, объединенная таблица, исходные отсчеты каналов).
+    Числовые колонки отображены в память из файла проекта.
+    """
+    with zipfile.ZipFile(path) as zf:
+        manifest = json.loads(zf.read(STATE_FILE).decode('utf-8'))
+        if manifest.get('container_version') != CONTAINER_VERSION:
+            raise ValueError(f"неподдерживаемая версия файла проекта: {manifest.get('container_version')}")
+        state = manifest.get('state', {})
+        data = manifest.get('data', {})
+
+        arrays = {i: _read_column(path, zf, column) for i, column in enumerate(data.get('columns', []))}
+        # copy=False: колонки остаются отображениями файла проекта
+        df = pd.DataFrame(arrays, copy=False)
+        df.columns = [column['name'] for column in data.get('columns', [])]
+        native = {entry['name']: (_read_array(path, zf, entry['time']), _read_array(path, zf, entry['values']))
+                  for entry in data.get('native', [])}
+        fits = _read_array(path, zf, manifest['fits']) if manifest.get('fits') else np.zeros(0)
+    _restore_coefficients(state, np.asarray(fits))
+    return state, df, native
+
+
+def read_project_state(path: str) -> dict:
+    """Только состояние проекта .approx (с коэффициентами), без данных."""
+    with zipfile.ZipFile(path) as zf:
+        manifest = json.loads(zf.read(STATE_FILE).decode('utf-8'))
+        if manifest.get('container_version') != CONTAINER_VERSION:
+            raise ValueError(f"неподдерживаемая версия файла проекта: {manifest.get('container_version')}")
+        fits = _read_array(path, zf, manifest['fits']) if manifest.get('fits') else np.zeros(0)
+    state = manifest.get('state', {})
+    _restore_coefficients(state, np.asarray(fits))
+    return state
+
+
+def is_mapped_from(path: str, values) -> bool:
+    """Массив (или его база) — отображение файла path в память."""
+    target = os.path.abspath(path)
+    while values is not None:
+        if isinstance(values, np.memmap) and values.filename and os.path.abspath(values.filename) == target:
+            return True
+        values = getattr(values, 'base', None)
+    return False
+
+
+def detach_from_file(path: str, df: Optional[pd.DataFrame],
+                     native: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None):
+    """
+    (df, native), в которых массивы, отображенные из path, скопированы в память.
+    Остальные массивы не копируются; если из path ничего не отображено,
+    возвращаются сами df и native.
+    """
+    copies = {}
+
+    def detached(values):
+        if not is_mapped_from(path, values):
+            return values
+        if id(values) not in copies:  # общий массив времени каналов копируется один раз
+            copies[id(values)] = (values, np.array(values, copy=True))
+        return copies[id(values)][1]
+
+    if native:
+        detached_native = {name: (detached(time_values), detached(values))
+                           for name, (time_values, values) in native.items()}
+        native = detached_native if copies else native
+    columns = [] if df is None else [df.iloc[:, i] for i in range(df.shape[1])]
+    if any(is_mapped_from(path, column.to_numpy()) for column in columns):
+        arrays = {i: detached(column.to_numpy()) if is_mapped_from(path, column.to_numpy()) else column
+                  for i, column in enumerate(columns)}
+        detached_df = pd.DataFrame(arrays, index=df.index, copy=False)
+        detached_df.columns = df.columns
+        df = detached_df
+    return df, native
+
+
+# --- Коэффициенты аппроксимаций ---
+
+def _fit_results(state: dict):
+    for channel in state.get('channels', {}).values():
+        for segment in channel.get('segments', []) or []:
+            fit = segment.get('fit_result')
+            if fit:
+                yield fit
+
+
+def _extract_coefficients(state: dict) -> np.ndarray:
+    """Переносит коэффициенты всех FitResult в один массив float64 (state меняется на месте)."""
+    chunks, offset = [], 0
+    for fit in _fit_results(state):
+        coefficients = np.asarray(fit.pop('coefficients', []), dtype=np.float64)
+        fit['coefficients_at'] = [offset, int(coefficients.size)]
+        chunks.append(coefficients)
+        offset += coefficients.size
+    return np.concatenate(chunks) if chunks else np.zeros(0)
+
+
+def _restore_coefficients(state: dict, fits: np.ndarray):
+    for fit in _fit_results(state):
+        if 'coefficients_at' in fit:
+            start, count = fit.pop('coefficients_at')
+            fit['coefficients'] = [float(c) for c in fits[start:start + count]]
+
+
+# --- Члены архива ---
+
+def _write_array(zf: zipfile.ZipFile, member: str, values):
+    with zf.open(member, 'w', force_zip64=True) as f:
+        np.lib.format.write_array(f, np.ascontiguousarray(values), allow_pickle=False)
+
+
+def _write_column(zf: zipfile.ZipFile, stem: str, name, series: pd.Series) -> dict:
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+        _write_array(zf, stem + ".npy", series.to_numpy())
+        return {'name': name, 'file': stem + ".npy", 'kind': 'array'}
+    text, mask = encode_text(series)
+    _write_array(zf, stem + ".npy", text)
+    _write_array(zf, stem + ".mask.npy", mask)
+    return {'name': name, 'file': stem + ".npy", 'mask': stem + ".mask.npy", 'kind': 'text'}
+
+
+def _read_column(path: str, zf: zipfile.ZipFile, column: dict):
+    if column.get('kind') == 'text':
+        return decode_text(_read_array(path, zf, column['file']), _read_array(path, zf, column['mask']))
+    return _read_array(path, zf, column['file'])
+
+
+def _read_array(path: str, zf: zipfile.ZipFile, member: str) -> np.ndarray:
+    """Массив члена архива: без сжатия — отображение в память, иначе — чтение."""
+    info = zf.getinfo(member)
+    with zf.open(info) as f:
+        version = np.lib.format.read_magic(f)
+        read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                       else np.lib.format.read_array_header_2_0)
+        shape, fortran_order, dtype = read_header(f)
+        header_size = f.tell()
+        if info.compress_type != zipfile.ZIP_STORED or dtype.hasobject or not info.file_size:
+            f.seek(0)
+            return np.lib.format.read_array(f, allow_pickle=False)
+    offset = _member_data_offset(zf, info) + header_size
+    if not int(np.prod(shape)):
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='c', offset=offset, shape=shape,
+                     order='F' if fortran_order else 'C')
+
+
+def _member_data_offset(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> int:
+    """Смещение данных члена в файле (после его локального заголовка)."""
+    zf.fp.seek(info.header_offset)
+    header = _LOCAL_HEADER.unpack(zf.fp.read(_LOCAL_HEADER.size))
+    name_length, extra_length = header[-2], header[-1]
+    return info.header_offset + _LOCAL_HEADER.size + name_length + extra_length
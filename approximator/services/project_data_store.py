@@ -0,0 +1,181 @@
+# Путь: approximator/services/project_data_store.py
+# =================================================================================
+# МОДУЛЬ ХРАНИЛИЩА ДАННЫХ ПРОЕКТА
+#
+# НАЗНАЧЕНИЕ:
+#   Объединенная таблица проекта хранится на диске рядом с файлом проекта
+#   (<проект>.data/) по колонкам в .npy и при открытии проекта не
+#   собирается заново, а отображается в память (mmap). Страницы читаются
+#   по требованию — срезы сегментов, LOD графика и экспорт обращаются
+#   только к нужным участкам, поэтому запись в десятки ГБ можно
+#   анализировать на машине с меньшим объемом ОЗУ.
+#
+# ЛОГИКА РАБОТЫ:
+#   1.  `write` — колонки объединенной таблицы и исходные отсчеты каналов
+#       (режим "resample") пишутся во временную папку, затем она атомарно
+#       заменяет прежнее хранилище. Манифест store.json описывает колонки
+#       и то, из чего таблица получена: исходные файлы (путь, размер,
+#       mtime), колонка времени и параметры объединения.
+#   2.  `open` — если манифест совпадает с текущими файлами и параметрами,
+#       возвращается таблица из отображенных колонок (mmap_mode='c': правки
+#       в памяти не попадают на диск) и регистрируются исходные отсчеты.
+#       Иначе — None, и проект собирается обычным объединением.
+#   3.  Если хранилище уже актуально, `write` ничего не переписывает —
+#       сохранение проекта не копирует гигабайты данных каждый раз.
+#   4.  Путь хранилища сохраняется в файле проекта (ключ 'data_store')
+#       относительно папки проекта — см. ProjectStateController.
+#
+# =================================================================================
+
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from approximator.services.parse_cache import load_column, save_column
+from approximator.services.time_index import register_native_channels
+
+MANIFEST_FILE = "store.json"
+STORE_SUFFIX = ".data"
+
+
+class ProjectDataStore:
+    """Объединенная таблица проекта в папке .npy-колонок с отображением в память."""
+
+    # Версия формата хранилища; при изменении старые хранилища не читаются
+    FORMAT_VERSION = 1
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @staticmethod
+    def path_for_project(project_path: str) -> str:
+        """Папка хранилища для файла проекта: <проект>.data рядом с ним."""
+        return os.path.splitext(os.path.abspath(project_path))[0] + STORE_SUFFIX
+
+    @staticmethod
+    def sources_signature(paths: List[str]) -> List[list]:
+        """(путь, размер, mtime) исходных файлов — по ним проверяется актуальность."""
+        signature = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                signature.append([os.path.abspath(path), None, None])
+                continue
+            signature.append([os.path.abspath(path), st.st_size, st.st_mtime_ns])
+        return signature
+
+    # --- Манифест ---
+
+    def manifest(self) -> Optional[dict]:
+        try:
+            with open(os.path.join(self.directory, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return manifest if manifest.get('format_version') == self.FORMAT_VERSION else None
+
+    def is_current(self, sources: List[str], time_column: str, merge_options: Optional[dict]) -> bool:
+        """Хранилище получено из этих же файлов с этими же параметрами объединения."""
+        manifest = self.manifest()
+        return (manifest is not None
+                and manifest.get('time_column') == time_column
+                and manifest.get('merge_options') == _json_roundtrip(merge_options or {})
+                and manifest.get('sources') == self.sources_signature(sources))
+
+    # --- Запись / чтение ---
+
+    def write(self, df: pd.DataFrame, time_column: str, sources: List[str], merge_options: Optional[dict] = None,
+              native: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None) -> bool:
+        """Сохраняет объединенную таблицу. Возвращает True, если хранилище актуально."""
+        if df is None or df.empty or time_column not in df.columns:
+            return False
+        if self.is_current(sources, time_column, merge_options):
+            return True
+        parent = os.path.dirname(os.path.abspath(self.directory))
+        tmp_dir = os.path.join(parent, f".tmp-{os.path.basename(self.directory)}-{uuid.uuid4().hex}")
+        try:
+            os.makedirs(tmp_dir)
+            columns = [save_column(tmp_dir, f"col_{i:03d}", name, df.iloc[:, i])
+                       for i, name in enumerate(df.columns)]
+            manifest = {
+                'format_version': self.FORMAT_VERSION,
+                'time_column': time_column,
+                'merge_options': _json_roundtrip(merge_options or {}),
+                'sources': self.sources_signature(sources),
+                'rows': int(df.shape[0]),
+                'columns': columns,
+                'native': self._save_native(tmp_dir, native or {}),
+                'created': time.time(),
+            }
+            with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=1)
+            self._replace(tmp_dir)
+        except OSError as e:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            print(f"[ProjectDataStore] ⚠️ Не удалось сохранить данные проекта в {self.directory}: {e}")
+            return False
+        print(f"[ProjectDataStore] 💾 Данные проекта сохранены: {self.directory} "
+              f"({df.shape[0]} строк, {df.shape[1]} колонок)")
+        return True
+
+    def open(self, sources: List[str], time_column: str,
+             merge_options: Optional[dict] = None) -> Optional[pd.DataFrame]:
+        """Объединенная таблица (колонки отображены в память) или None, если хранилище не актуально."""
+        if not self.is_current(sources, time_column, merge_options):
+            return None
+        manifest = self.manifest()
+        try:
+            arrays = {i: load_column(self.directory, column) for i, column in enumerate(manifest['columns'])}
+            # copy=False: каждая колонка остается отображением своего .npy
+            df = pd.DataFrame(arrays, copy=False)
+            df.columns = [column['name'] for column in manifest['columns']]
+            native = {}
+            for entry in manifest.get('native', []):
+                native[entry['name']] = (np.load(os.path.join(self.directory, entry['time']), mmap_mode='c'),
+                                         np.load(os.path.join(self.directory, entry['values']), mmap_mode='c'))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[ProjectDataStore] ⚠️ Поврежденное хранилище {self.directory}: {e}")
+            return None
+        register_native_channels(df, time_column, native)
+        print(f"[ProjectDataStore] 📂 Данные проекта отображены в память: {self.directory}, shape={df.shape}")
+        return df
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    # --- Вспомогательное ---
+
+    @staticmethod
+    def _save_native(directory: str, native: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> List[dict]:
+        """Исходные отсчеты каналов; общий массив времени пишется один раз."""
+        entries, time_files = [], {}
+        for i, (name, (time_values, values)) in enumerate(native.items()):
+            if id(time_values) not in time_files:
+                time_files[id(time_values)] = f"native_time_{len(time_files):03d}.npy"
+                np.save(os.path.join(directory, time_files[id(time_values)]), np.asarray(time_values))
+            values_file = f"native_{i:03d}.npy"
+            np.save(os.path.join(directory, values_file), np.asarray(values))
+            entries.append({'name': name, 'time': time_files[id(time_values)], 'values': values_file})
+        return entries
+
+    def _replace(self, tmp_dir: str):
+        """Атомарно подменяет папку хранилища новой."""
+        if os.path.exists(self.directory):
+            # Старые файлы могут быть еще отображены в память — папка сначала
+            # переименовывается, а удаляется, насколько это позволяет ОС
+            old_dir = f"{self.directory}.old-{uuid.uuid4().hex}"
+            os.replace(self.directory, old_dir)
+            shutil.rmtree(old_dir, ignore_errors=True)
+        os.replace(tmp_dir, self.directory)
+
+
+def _json_roundtrip(value):
+    """Значение в том виде, в каком оно вернется из JSON (кортежи -> списки и т.п.)."""
+    return json.loads(json.dumps(value, ensure_ascii=False))
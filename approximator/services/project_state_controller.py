@@ -1,12 +1,19 @@
 # Путь: services/project_state_controller.py
 
+import gc
 import json
 import os
-from typing import Optional
+from typing import Dict, List, Optional
 
 import pandas as pd
 from approximator.data_models.channel_state import ChannelState
 from approximator.services.data_loader import DataLoader
+from approximator.services.parse_cache import ParseCache
+from approximator.services.project_container import (
+    PROJECT_EXTENSION, detach_from_file, is_project_container, read_project_container, write_project_container
+)
+from approximator.services.project_data_store import ProjectDataStore
+from approximator.services.time_index import native_channels, register_native_channels
 from approximator.services.data_merger import DataMerger
 
 from approximator.file_parsers.generic_csv_parser import GenericCsvParser
@@ -27,53 +34,119 @@ class ProjectStateController:
             AdcParser(),
             ExcelParser(),
             GenericCsvParser()
-        ])
+        ], cache=ParseCache())
         self.data_merger = DataMerger()
-
-    def load_project(self, file_path: str):
+        # Папка, относительно которой указан путь хранилища данных ('data_store')
+        self._project_dir = os.getcwd()
+        # Проект, открытый лениво, исходные данные которого еще не загружены
+        self._lazy_data: Optional[dict] = None
+        # Файлы проекта, открытого лениво или из .approx, — пока (или если) они не загружены
+        self._project_files: List[str] = []
+
+    def load_project(self, file_path: str, lazy: bool = False):
+        """
+        Открывает проект (JSON или .approx с данными). lazy=True — сегменты и
+        аппроксимации показываются сразу, а исходные файлы читаются в фоне
+        (см. _apply_state_lazy). Проекту .approx исходные файлы не нужны.
+        """
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Файл не найден: {file_path}")
 
+        self._project_dir = os.path.dirname(os.path.abspath(file_path))
+        self._cancel_lazy_load()
+        if is_project_container(file_path):
+            data, merged_df, native = read_project_container(file_path)
+            register_native_channels(merged_df, data.get('settings', {}).get('time_column'), native)
+            print(f"[ProjectStateController] 📦 Проект с данными: {file_path}, shape={merged_df.shape}")
+            self._apply_state_lazy(data, embedded=merged_df)
+            return
+
         with open(file_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
 
-        self._apply_state(data)
+        if lazy:
+            self._apply_state_lazy(data)
+        else:
+            self._apply_state(data)
 
     def save_project(self, file_path: str):
+        """Сохраняет проект: .approx — одним файлом вместе с данными, иначе — JSON."""
         state_dict = self._extract_state()
+        if os.path.splitext(file_path)[1].lower() == PROJECT_EXTENSION:
+            self.state.ensure_data()
+            self._release_file(file_path)
+            df = self.state.merged_dataframe
+            write_project_container(file_path, state_dict, df, self.state.time_column, native_channels(df))
+            print(f"[ProjectStateController] 📦 Проект с данными сохранен: {file_path}")
+            return
+        # Объединенные данные — в хранилище рядом с проектом (переписывается, только если устарело)
+        df = self.state.merged_dataframe
+        if df is not None and not df.empty and self.state.time_column:
+            store = ProjectDataStore(ProjectDataStore.path_for_project(file_path))
+            if store.write(df, self.state.time_column, state_dict['imported_files'],
+                           self.state.merge_options, native_channels(df)):
+                project_dir = os.path.dirname(os.path.abspath(file_path))
+                state_dict['data_store'] = os.path.relpath(store.directory, project_dir)
+        elif self._lazy_data is not None and self._lazy_data.get('data_store'):
+            # Данные лениво открытого проекта еще не загружены — хранилище прежнее
+            state_dict['data_store'] = os.path.relpath(
+                os.path.join(self._project_dir, self._lazy_data['data_store']),
+                os.path.dirname(os.path.abspath(file_path)))
         with open(file_path, 'w', encoding='utf-8') as f:
             json.dump(state_dict, f, indent=2, ensure_ascii=False)
 
-    def load_project_from_dict(self, data: dict):
+    def _release_file(self, file_path: str):
+        """
+        Если данные отображены из file_path (проект открыт из этого же .approx),
+        переводит их в память и отпускает отображения: пока файл отображен,
+        Windows не дает его заменить.
+        """
+        df = self.state.merged_dataframe
+        native = native_channels(df)
+        detached_df, detached_native = detach_from_file(file_path, df, native)
+        if detached_df is df and detached_native is native:
+            return
+        # Данные те же — версия не меняется, аппроксимации сегментов не устаревают
+        version = self.state.data_version
+        self.state.merged_dataframe = detached_df
+        self.state.data_version = version
+        register_native_channels(detached_df, self.state.time_column, detached_native)
+        del df, native, detached_native
+        # Срезы прежних массивов держат фиттеры (окна и фонового потока) и серии графика
+        fitter = getattr(self.main_window, 'fitter', None)
+        if fitter is not None:
+            fitter.release()
+        scheduler = getattr(self.main_window, 'fit_scheduler', None)
+        if scheduler is not None:
+            scheduler.release_data()
+        self._redraw_plot(preserve_zoom=True)
+        gc.collect()
+        print(f"[ProjectStateController] 📤 Данные переведены в память перед перезаписью: {file_path}")
+
+    def load_project_from_dict(self, data: dict, lazy: bool = False):
         """
-        Загружает состояние проекта из словаря (например, из autosave.json).
+        Загружает состояние проекта из словаря (например, из автосохранения).
+        lazy=True — без ожидания исходных файлов (см. _apply_state_lazy).
         """
         print("[ProjectStateController] 🔁 Восстановление из словаря")
+        self._cancel_lazy_load()
+        if lazy:
+            self._apply_state_lazy(data)
+            return
 
         imported_files = data.get('imported_files', [])
         settings = data.get('settings', {})
         channels = data.get('channels', {})
 
-        self.state.loaded_dataframes.clear()
-        for path in imported_files:
-            if os.path.exists(path):
-                try:
-                    df = self.data_loader.load_file(path)
-                    if not df.empty:
-                        self.state.loaded_dataframes[path] = df
-                        print(f"[ProjectStateController] ✅ Загружен: {path}, shape={df.shape}")
-                except Exception as e:
-                    print(f"[ProjectStateController] ❌ Ошибка загрузки {path}: {e}")
-            else:
-                print(f"[ProjectStateController] ❌ Файл не найден: {path}")
-
+        # Параметры объединения и колонка времени нужны до загрузки: по ним
+        # проверяется хранилище данных проекта
+        self.state.merge_options = settings.get('merge_options', {})
         self.state.time_column = settings.get('time_column')
         self.state.selected_columns = {path: self.state.time_column for path in imported_files}
 
-        all_dfs = list(self.state.loaded_dataframes.values())
         print(f"[ProjectStateController] 🔁 Объединение по колонке: {self.state.time_column}")
-        if self.state.time_column and all_dfs:
-            merged_df = self.data_merger.merge_dataframes(all_dfs, on_column=self.state.time_column)
+        merged_df = self._load_project_data(data)
+        if merged_df is not None:
             self.state.merged_dataframe = merged_df
             self.state.channel_list = [col for col in merged_df.columns if col != self.state.time_column]
             print(f"[ProjectStateController] ✅ Объединено: {merged_df.shape}")
@@ -95,6 +168,7 @@ class ProjectStateController:
         # GUI: обновление компонентов
         import_tab = self.main_window.import_tab
         import_tab.file_panel.set_files(imported_files)
+        import_tab.merge_mode_selector.set_options(self.state.merge_options)
 
         columns = self._collect_all_columns()
         import_tab.time_selector.set_columns(columns)
@@ -126,22 +200,14 @@ class ProjectStateController:
         settings = data.get('settings', {})
         channels = data.get('channels', {})
 
-        self.state.loaded_dataframes.clear()
-        for path in imported_files:
-            if os.path.exists(path):
-                try:
-                    df = self.data_loader.load_file(path)
-                    if not df.empty:
-                        self.state.loaded_dataframes[path] = df
-                except Exception as e:
-                    print(f"[ProjectStateController] Ошибка загрузки файла {path}: {e}")
-
+        # Параметры объединения и колонка времени нужны до загрузки: по ним
+        # проверяется хранилище данных проекта
+        self.state.merge_options = settings.get('merge_options', {})
         self.state.time_column = settings.get('time_column')
         self.state.selected_columns = {path: self.state.time_column for path in imported_files}
 
-        all_dfs = list(self.state.loaded_dataframes.values())
-        if self.state.time_column and all_dfs:
-            merged_df = self.data_merger.merge_dataframes(all_dfs, on_column=self.state.time_column)
+        merged_df = self._load_project_data(data)
+        if merged_df is not None:
             self.state.merged_dataframe = merged_df
             self.state.channel_list = [col for col in merged_df.columns if col != self.state.time_column]
         else:
@@ -161,6 +227,7 @@ class ProjectStateController:
         # GUI: обновление компонентов
         import_tab = self.main_window.import_tab
         import_tab.file_panel.set_files(imported_files)
+        import_tab.merge_mode_selector.set_options(self.state.merge_options)
         import_tab.time_selector.set_columns(self._collect_all_columns())
         if self.state.time_column:
             import_tab.time_selector.set_selected(self.state.time_column)
@@ -182,29 +249,15 @@ class ProjectStateController:
         channels = data.get('channels', {})
 
         print(f"[ProjectStateController] 🔁 Загружаем файлы: {imported_files}")
-        self.state.loaded_dataframes.clear()
-
-        for path in imported_files:
-            if os.path.exists(path):
-                try:
-                    df = self.data_loader.load_file(path)
-                    if not df.empty:
-                        self.state.loaded_dataframes[path] = df
-                        print(f"[ProjectStateController] ✅ Загружен: {path}, shape={df.shape}")
-                    else:
-                        print(f"[ProjectStateController] ⚠️ Пустой файл: {path}")
-                except Exception as e:
-                    print(f"[ProjectStateController] ❌ Ошибка загрузки {path}: {e}")
-            else:
-                print(f"[ProjectStateController] ❌ Файл не найден: {path}")
-
+        # Параметры объединения и колонка времени нужны до загрузки: по ним
+        # проверяется хранилище данных проекта
+        self.state.merge_options = settings.get('merge_options', {})
         self.state.time_column = settings.get('time_column')
         self.state.selected_columns = {path: self.state.time_column for path in imported_files}
 
-        all_dfs = list(self.state.loaded_dataframes.values())
         print(f"[ProjectStateController] 🔁 Объединение по колонке: {self.state.time_column}")
-        if self.state.time_column and all_dfs:
-            merged_df = self.data_merger.merge_dataframes(all_dfs, on_column=self.state.time_column)
+        merged_df = self._load_project_data(data)
+        if merged_df is not None:
             self.state.merged_dataframe = merged_df
             self.state.channel_list = [col for col in merged_df.columns if col != self.state.time_column]
             print(f"[ProjectStateController] ✅ Объединено: {merged_df.shape}")
@@ -227,6 +280,7 @@ class ProjectStateController:
         # GUI: обновление компонентов
         import_tab = self.main_window.import_tab
         import_tab.file_panel.set_files(imported_files)
+        import_tab.merge_mode_selector.set_options(self.state.merge_options)
         import_tab.time_selector.set_columns(self._collect_all_columns())
         if self.state.time_column:
             import_tab.time_selector.set_selected(self.state.time_column)
@@ -246,11 +300,177 @@ class ProjectStateController:
 
         self._redraw_plot()
 
+    def _apply_state_lazy(self, data: dict, embedded: Optional[pd.DataFrame] = None):
+        """
+        Ленивое открытие проекта: каналы, сегменты и сохраненные FitResult
+        восстанавливаются сразу, кривые аппроксимации рисуются по
+        коэффициентам. Исходные файлы читаются в фоне (FileLoadWorker) или,
+        без фоновой загрузки, по первому запросу данных — пересчету или
+        показу исходных точек (AppState.ensure_data).
+        embedded — данные из файла проекта .approx: тогда файлы не читаются.
+        """
+        imported_files = data.get('imported_files', [])
+        settings = data.get('settings', {})
+        channels = data.get('channels', {})
+        print(f"[ProjectStateController] ⚡ Ленивое открытие: каналов {len(channels)}, файлов {len(imported_files)}")
+
+        self.state.merge_options = settings.get('merge_options', {})
+        self.state.time_column = settings.get('time_column')
+        self.state.selected_columns = {path: self.state.time_column for path in imported_files}
+        self.state.loaded_dataframes.clear()
+        self.state.merged_dataframe = pd.DataFrame()
+        self.state.channel_list = list(channels.keys())
+
+        self.state.channel_states.clear()
+        for ch_name, ch_data in channels.items():
+            self.state.channel_states[ch_name] = ChannelState.from_dict(ch_data)
+
+        self.state.active_channel_name = settings.get('active_channel', '')
+        self.state.selected_segment_index = settings.get('selected_segment_index')
+        self.state.show_source_data = settings.get('show_source_data', True)
+        self.state.show_approximation = settings.get('show_approximation', True)
+        self.state.auto_recalculate = settings.get('auto_recalculate', True)
+
+        # GUI: обновление компонентов (колонки файлов станут известны после загрузки)
+        import_tab = self.main_window.import_tab
+        import_tab.file_panel.set_files(imported_files)
+        import_tab.merge_mode_selector.set_options(self.state.merge_options)
+        if self.state.time_column:
+            import_tab.time_selector.set_columns([self.state.time_column])
+            import_tab.time_selector.set_selected(self.state.time_column)
+
+        if hasattr(self.main_window, 'analysis_setup_handler'):
+            self.main_window.analysis_setup_handler.update_channels_table()
+        if hasattr(self.main_window, 'segment_table_handler'):
+            self.main_window.segment_table_handler.update_table()
+
+        self.main_window.tabs.setTabEnabled(1, True)
+        self.main_window.tabs.setTabEnabled(2, True)
+        self.main_window.tabs.setCurrentIndex(1)
+
+        self._project_files = list(imported_files)
+        if embedded is None:
+            # Актуальное хранилище данных заменяет чтение исходных файлов
+            embedded = self._open_data_store(data)
+        if embedded is not None:
+            self._show_merged(embedded)
+            return
+
+        self._lazy_data = data
+        self._redraw_plot()
+
+        file_loader = getattr(self.main_window, 'file_loader', None)
+        existing = [path for path in imported_files if os.path.exists(path)]
+        if file_loader is None or not existing:
+            self.state.pending_data_loader = lambda: self._finish_lazy_load(data)
+            return
+
+        # Фоновая загрузка; запрос данных до ее окончания просто дожидается пакета
+        loaded = {}
+
+        def on_loaded(path, df):
+            if path in existing:
+                loaded[path] = df
+
+        def on_finished(batch_id):
+            if batch_id != batch:
+                return
+            file_loader.file_loaded.disconnect(on_loaded)
+            file_loader.finished.disconnect(on_finished)
+            self._finish_lazy_load(data, loaded)
+
+        file_loader.file_loaded.connect(on_loaded)
+        file_loader.finished.connect(on_finished)
+        batch = file_loader.load(existing)
+        self.state.pending_data_loader = lambda: file_loader.wait_batch(batch)
+
+    def _finish_lazy_load(self, data: dict, loaded: Optional[Dict[str, pd.DataFrame]] = None):
+        """Исходные файлы лениво открытого проекта прочитаны: объединение и перерисовка."""
+        if self._lazy_data is not data:
+            return  # за это время открыт другой проект
+        self._lazy_data = None
+        self.state.pending_data_loader = None
+        imported_files = data.get('imported_files', [])
+        if loaded is None:
+            loaded = self._load_files(imported_files)
+        self.state.loaded_dataframes.clear()
+        self.state.loaded_dataframes.update(
+            {path: loaded[path] for path in imported_files if loaded.get(path) is not None and not loaded[path].empty})
+
+        all_dfs = list(self.state.loaded_dataframes.values())
+        if self.state.time_column and all_dfs:
+            self._project_files = []
+            merged_df = self.data_merger.merge_dataframes(all_dfs, on_column=self.state.time_column,
+                                                          **self.state.merge_options)
+            self.state.compact_loaded_dataframes(self.state.time_column)
+            print(f"[ProjectStateController] ✅ Данные проекта загружены: {merged_df.shape}")
+            self._show_merged(merged_df, preserve_zoom=True)
+        else:
+            print("[ProjectStateController] ⚠️ Данные проекта не загружены")
+
+    def _show_merged(self, merged_df: pd.DataFrame, preserve_zoom: bool = False):
+        """Объединенная таблица готова: список каналов, колонки времени, график."""
+        self.state.merged_dataframe = merged_df
+        self.state.channel_list = [col for col in merged_df.columns if col != self.state.time_column]
+        import_tab = self.main_window.import_tab
+        import_tab.time_selector.set_columns(self._collect_all_columns() or list(merged_df.columns))
+        if self.state.time_column:
+            import_tab.time_selector.set_selected(self.state.time_column)
+        if hasattr(self.main_window, 'analysis_setup_handler'):
+            self.main_window.analysis_setup_handler.update_channels_table()
+        self._redraw_plot(preserve_zoom=preserve_zoom)
+
+    def _cancel_lazy_load(self):
+        """Открывается другой проект — незавершенная ленивая загрузка больше не нужна."""
+        self._lazy_data = None
+        self._project_files = []
+        self.state.pending_data_loader = None
+
+    def _load_project_data(self, data: dict) -> Optional[pd.DataFrame]:
+        """
+        Объединенная таблица проекта (None — данных нет). Сначала проверяется
+        хранилище данных: если оно актуально (размер и mtime файлов, колонка
+        времени, параметры объединения), исходные файлы не разбираются, а
+        таблица отображается в память. Иначе файлы загружаются и объединяются.
+        Вызывается после того, как заданы state.time_column и merge_options.
+        """
+        imported_files = data.get('imported_files', [])
+        self.state.loaded_dataframes.clear()
+        merged_df = self._open_data_store(data)
+        if merged_df is not None:
+            # Файлы не загружены — список проекта сохраняется как есть
+            self._project_files = list(imported_files)
+            return merged_df
+
+        self.state.loaded_dataframes.update(self._load_files(imported_files))
+        all_dfs = list(self.state.loaded_dataframes.values())
+        if not self.state.time_column or not all_dfs:
+            return None
+        merged_df = self.data_merger.merge_dataframes(all_dfs, on_column=self.state.time_column,
+                                                      **self.state.merge_options)
+        self.state.compact_loaded_dataframes(self.state.time_column)
+        return merged_df
+
+    def _open_data_store(self, data: dict) -> Optional[pd.DataFrame]:
+        """Таблица из хранилища данных проекта или None, если его нет или оно устарело."""
+        store_path = data.get('data_store')
+        if not store_path or not self.state.time_column:
+            return None
+        store = ProjectDataStore(os.path.join(self._project_dir, store_path))
+        merged_df = store.open(data.get('imported_files', []), self.state.time_column, self.state.merge_options)
+        if merged_df is None:
+            print(f"[ProjectStateController] ⚠️ Хранилище данных {store.directory} устарело — загружаем файлы")
+        return merged_df
+
     def _extract_state(self) -> dict:
+        # Пока файлы лениво открытого проекта читаются (или проект открыт из .approx
+        # без них), список берется из проекта
+        imported_files = list(self.state.loaded_dataframes.keys()) or list(self._project_files)
         return {
-            'imported_files': list(self.state.loaded_dataframes.keys()),
+            'imported_files': imported_files,
             'settings': {
                 'time_column': self.state.time_column,
+                'merge_options': self.state.merge_options,
                 'active_channel': self.state.active_channel_name,
                 'selected_segment_index': self.state.selected_segment_index,
                 'show_source_data': self.state.show_source_data,
@@ -267,12 +487,16 @@ class ProjectStateController:
         all_columns = set()
         for df in self.state.loaded_dataframes.values():
             all_columns.update(df.columns)
+        # Данные из хранилища проекта: исходные файлы не загружались
+        if not all_columns and self.state.merged_dataframe is not None:
+            all_columns.update(self.state.merged_dataframe.columns)
         return sorted(list(all_columns))
 
-    def _redraw_plot(self):
+    def _redraw_plot(self, preserve_zoom: bool = False):
         df = self.state.merged_dataframe
         time_column = self.state.time_column
-        if df is None or df.empty or not time_column:
+        # Без данных (ленивое открытие) рисуются только кривые аппроксимации сегментов
+        if df is None or not time_column or (df.empty and self._lazy_data is None):
             print("[ProjectStateController] ❌ Невозможно построить график — нет данных или time_column")
             return
 
@@ -282,11 +506,48 @@ class ProjectStateController:
             channel_states=self.state.channel_states,
             active_channel_name=self.state.active_channel_name,
             selected_segment_index=self.state.selected_segment_index,
-            preserve_zoom=False,
+            preserve_zoom=preserve_zoom,
             show_source=self.state.show_source_data,
             show_approximation=self.state.show_approximation
         )
 
+    def _load_files(self, paths) -> Dict[str, pd.DataFrame]:
+        """
+        Загружает файлы проекта параллельно (DataLoader.load_many).
+        Ошибка в одном файле не прерывает загрузку остальных.
+        Возвращает {путь: DataFrame} в порядке paths (только непустые).
+        """
+        existing = []
+        for path in paths:
+            if os.path.exists(path):
+                existing.append(path)
+            else:
+                print(f"[ProjectStateController] ❌ Файл не найден: {path}")
+
+        file_loader = getattr(self.main_window, 'file_loader', None)
+        if file_loader is not None:
+            # Окно продолжает обрабатывать события, пока файлы читаются в фоне
+            loaded = file_loader.wait(existing)
+        else:
+            loaded = {}
+            for outcome in self.data_loader.load_many(existing):
+                if outcome.error is not None:
+                    print(f"[ProjectStateController] ❌ Ошибка загрузки {outcome.path}: {outcome.error}")
+                else:
+                    loaded[outcome.path] = outcome.dataframe
+
+        result = {}
+        for path in existing:
+            df = loaded.get(path)
+            if df is None:
+                continue
+            if df.empty:
+                print(f"[ProjectStateController] ⚠️ Пустой файл: {path}")
+                continue
+            result[path] = df
+            print(f"[ProjectStateController] ✅ Загружен: {path}, shape={df.shape}")
+        return result
+
     def _load_and_register_file(self, path: str) -> pd.DataFrame:
         """
         Загружает файл, устраняет конфликты по именам колонок,
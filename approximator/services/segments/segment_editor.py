@@ -77,8 +77,43 @@ class SegmentEditor:
             seg.x_end = new_x
         else:
             return False
+        self.channel.mark_dirty([index])
         return True
 
+    def move_shared_boundary(self, index: int, side: str, new_x: float) -> list:
+        """
+        Перемещает границу сегмента вместе с совпадающей границей соседа,
+        чтобы смежные сегменты не расходились и не перекрывались.
+        Возвращает индексы затронутых сегментов (пусто, если перемещение невозможно).
+        """
+        segments = self.channel.segments
+        if index < 0 or index >= len(segments) or side not in ('start', 'end'):
+            return []
+        seg = segments[index]
+        old_x = seg.x_start if side == 'start' else seg.x_end
+
+        neighbour = index - 1 if side == 'start' else index + 1
+        neighbour_side = 'end' if side == 'start' else 'start'
+        touched = [index]
+        if 0 <= neighbour < len(segments):
+            other = segments[neighbour]
+            other_x = other.x_end if neighbour_side == 'end' else other.x_start
+            if abs(other_x - old_x) < 1e-6:
+                touched.append(neighbour)
+
+        # Проверяем, что после перемещения ни один сегмент не вырождается
+        for i in touched:
+            s = segments[i]
+            i_side = side if i == index else neighbour_side
+            if i_side == 'start' and new_x >= s.x_end:
+                return []
+            if i_side == 'end' and new_x <= s.x_start:
+                return []
+
+        for i in touched:
+            self.move_boundary(i, side if i == index else neighbour_side, new_x)
+        return sorted(touched)
+
     def delete_segment(self, index: int) -> bool:
         """Удаляет сегмент по индексу."""
         if index < 0 or index >= len(self.channel.segments):
@@ -0,0 +1,185 @@
+# Путь: approximator/services/time_index.py
+# =================================================================================
+# МОДУЛЬ ИНДЕКСА ПО ВРЕМЕНИ
+#
+# НАЗНАЧЕНИЕ:
+#   Быстрый поиск строк, попадающих в интервал [x_start, x_end], без
+#   построения булевой маски по всей таблице для каждого сегмента.
+#
+# ЛОГИКА РАБОТЫ:
+#   1.  Колонка времени один раз копируется в непрерывный отсортированный
+#       массив NumPy (float64).
+#   2.  Границы сегмента переводятся в диапазон строк [i0, i1) через
+#       `np.searchsorted` — O(log N) вместо O(N).
+#   3.  Для каждого канала один раз строится компактная пара массивов
+#       (время, значение) без NaN — они хранятся в ChannelStore
+#       (data_models/channel_store.py). Данные сегмента — это срезы этих
+#       массивов, т.е. представления (views) без копирования.
+#   4.  Если таблица получена пересчетом на общую сетку (DataMerger,
+#       режим "resample"), для нее регистрируются исходные отсчеты каналов
+#       (`register_native_channels`). Тогда канал аппроксимируется по ним,
+#       а не по интерполированным значениям сетки.
+#
+# =================================================================================
+
+import weakref
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from approximator.data_models.channel_store import ChannelStore
+
+
+class SortedTimeAxis:
+    """Отсортированная ось времени с поиском диапазонов через searchsorted."""
+
+    def __init__(self, time_values):
+        time = np.asarray(time_values, dtype=np.float64)
+        order = None
+        if time.size > 1 and np.any(time[1:] < time[:-1]):
+            order = np.argsort(time, kind='stable')
+            time = time[order]
+        self.time = np.ascontiguousarray(time)
+        # Перестановка исходных строк в отсортированный порядок (None — уже отсортированы)
+        self.order = order
+
+    @classmethod
+    def from_sorted(cls, time_values) -> 'SortedTimeAxis':
+        """Создает ось из заведомо отсортированного массива без проверки."""
+        axis = cls.__new__(cls)
+        axis.time = np.ascontiguousarray(time_values, dtype=np.float64)
+        axis.order = None
+        return axis
+
+    def __len__(self):
+        return self.time.size
+
+    def row_range(self, x_start: float, x_end: float) -> Tuple[int, int]:
+        """Возвращает диапазон строк [i0, i1), для которых x_start <= t <= x_end."""
+        i0 = int(np.searchsorted(self.time, x_start, side='left'))
+        i1 = int(np.searchsorted(self.time, x_end, side='right'))
+        return i0, max(i0, i1)
+
+    def take(self, values) -> np.ndarray:
+        """Переставляет значения, выровненные с исходными строками, в порядок оси."""
+        values = np.asarray(values)
+        if self.order is not None:
+            values = values[self.order]
+        return np.ascontiguousarray(values)
+
+
+class TimeIndex:
+    """
+    Индекс по колонке времени объединенной таблицы.
+    Выдает данные сегментов как срезы непрерывных массивов без копирования.
+    """
+
+    def __init__(self, df: pd.DataFrame, time_column: str,
+                 native_channels: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None):
+        self.time_column = time_column
+        self._df_ref = weakref.ref(df)
+        self.axis = SortedTimeAxis(df[time_column].to_numpy(dtype=np.float64, na_value=np.nan))
+        # Исходные отсчеты каналов (время отсортировано, без NaN) — см. п. 4
+        self._native = set(native_channels or ())
+        self.store = ChannelStore.from_dataframe(df, time_column, native_channels,
+                                                 sorted_axis=(self.axis.time, self.axis.order))
+
+    def row_range(self, x_start: float, x_end: float) -> Tuple[int, int]:
+        """Диапазон строк отсортированной таблицы для интервала времени."""
+        return self.axis.row_range(x_start, x_end)
+
+    def channel_arrays(self, channel_name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Возвращает компактную пару (время, значения) канала без NaN.
+        Массивы строятся один раз и кешируются (в ChannelStore).
+        """
+        series = self.store.get(channel_name)
+        if series is None:
+            raise KeyError(channel_name)
+        return series.time, series.values
+
+    def has_channel(self, channel_name: str) -> bool:
+        df = self._df_ref()
+        return df is not None and channel_name in df.columns
+
+    def is_native(self, channel_name: str) -> bool:
+        """True, если данные канала — исходные отсчеты, а не значения таблицы."""
+        return channel_name in self._native
+
+    def aligned_values(self, channel_name: str) -> np.ndarray:
+        """
+        Значения канала из таблицы в порядке оси времени (с NaN, длина = len(axis)).
+        Для пересчитанной на сетку таблицы это значения сетки, а не исходные отсчеты.
+        """
+        df = self._df_ref()
+        if df is None or channel_name not in df.columns:
+            raise KeyError(channel_name)
+        return self.axis.take(df[channel_name].to_numpy(dtype=np.float64, na_value=np.nan))
+
+    def segment_data(self, channel_name: str, x_start: float, x_end: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Данные канала в интервале [x_start, x_end] — срезы без копирования."""
+        if channel_name not in self.store:
+            raise KeyError(channel_name)
+        return self.store.slice(channel_name, x_start, x_end)
+
+    def invalidate_channel(self, channel_name: str):
+        """Сбрасывает кеш канала (например, после изменения его значений)."""
+        self.store.discard(channel_name)
+
+
+# Кеш индексов: id(DataFrame) -> (weakref на DataFrame, колонка времени, индекс)
+_index_cache: Dict[int, Tuple[weakref.ref, str, TimeIndex]] = {}
+
+
+def get_time_index(df: pd.DataFrame, time_column: str) -> Optional[TimeIndex]:
+    """
+    Возвращает общий (кешированный) индекс для таблицы и колонки времени.
+    Индекс живет, пока жива сама таблица.
+    """
+    if df is None or df.empty or time_column not in df.columns:
+        return None
+
+    key = id(df)
+    cached = _index_cache.get(key)
+    if cached is not None:
+        ref, cached_column, index = cached
+        if ref() is df and cached_column == time_column:
+            return index
+
+    native = _native_cache.get(key)
+    native_channels = native[2] if native is not None and native[0]() is df and native[1] == time_column else None
+    index = TimeIndex(df, time_column, native_channels)
+    _index_cache[key] = (weakref.ref(df, lambda _ref, k=key: _drop_cached(k, _ref)), time_column, index)
+    return index
+
+
+def _drop_cached(key: int, ref: weakref.ref, cache=None):
+    cache = _index_cache if cache is None else cache
+    cached = cache.get(key)
+    if cached is not None and cached[0] is ref:
+        del cache[key]
+
+
+# Исходные отсчеты каналов: id(DataFrame) -> (weakref на DataFrame, колонка времени, {канал: (время, значения)})
+_native_cache: Dict[int, Tuple[weakref.ref, str, Dict[str, Tuple[np.ndarray, np.ndarray]]]] = {}
+
+
+def register_native_channels(df: pd.DataFrame, time_column: str,
+                             channels: Dict[str, Tuple[np.ndarray, np.ndarray]]):
+    """
+    Привязывает к таблице исходные отсчеты каналов (время отсортировано, без NaN).
+    Индекс этой таблицы будет отдавать их вместо значений колонок.
+    """
+    if df is None or not channels:
+        return
+    key = id(df)
+    _native_cache[key] = (weakref.ref(df, lambda _ref, k=key: _drop_cached(k, _ref, _native_cache)),
+                          time_column, dict(channels))
+    _index_cache.pop(key, None)
+
+
+def native_channels(df: pd.DataFrame) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Исходные отсчеты каналов таблицы (пустой словарь, если их нет)."""
+    cached = _native_cache.get(id(df)) if df is not None else None
+    return cached[2] if cached is not None and cached[0]() is df else {}
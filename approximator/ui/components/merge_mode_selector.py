@@ -0,0 +1,102 @@
+# Путь: ui/components/merge_mode_selector.py
+
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QFormLayout, QLabel, QComboBox, QDoubleSpinBox, QCheckBox
+)
+
+from approximator.services.data_merger import (
+    INTERPOLATION_LINEAR, INTERPOLATION_NEAREST,
+    MERGE_EXACT, MERGE_INTERPOLATE, MERGE_NEAREST, MERGE_RESAMPLE
+)
+
+
+class MergeModeSelector(QWidget):
+    """
+    Выбор способа объединения файлов (см. DataMerger.merge_dataframes):
+    режим, шаг общей сетки, интерполяция, допуск по времени и
+    компактное хранение (float32).
+    """
+    MODES = [
+        (MERGE_EXACT, "Точное совпадение времени"),
+        (MERGE_NEAREST, "Ближайшее время (с допуском)"),
+        (MERGE_INTERPOLATE, "Интерполяция на чужие метки"),
+        (MERGE_RESAMPLE, "Общая сетка времени"),
+    ]
+    INTERPOLATIONS = [
+        (INTERPOLATION_LINEAR, "Линейная"),
+        (INTERPOLATION_NEAREST, "Ближайший отсчет"),
+    ]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.mode_combo = QComboBox()
+        for mode, title in self.MODES:
+            self.mode_combo.addItem(title, mode)
+
+        self.step_spin = QDoubleSpinBox()
+        self.step_spin.setDecimals(6)
+        self.step_spin.setRange(0.0, 1e6)
+        self.step_spin.setSingleStep(0.01)
+        self.step_spin.setSpecialValueText("по самому частому файлу")
+
+        self.interpolation_combo = QComboBox()
+        for interpolation, title in self.INTERPOLATIONS:
+            self.interpolation_combo.addItem(title, interpolation)
+
+        self.tolerance_spin = QDoubleSpinBox()
+        self.tolerance_spin.setDecimals(6)
+        self.tolerance_spin.setRange(0.0, 1e6)
+        self.tolerance_spin.setSingleStep(0.001)
+        self.tolerance_spin.setSpecialValueText("нет")
+
+        self.compact_check = QCheckBox("Компактное хранение (float32)")
+        self.compact_check.setToolTip("Значения каналов (в объединенной таблице и в таблицах файлов) "
+                                      "хранятся в float32 — вдвое меньше памяти. Время остается float64, "
+                                      "текстовые колонки с множеством значений не хранятся.")
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(QLabel("Способ объединения файлов:"))
+        layout.addWidget(self.mode_combo)
+        form = QFormLayout()
+        form.addRow("Шаг сетки, с:", self.step_spin)
+        form.addRow("Интерполяция:", self.interpolation_combo)
+        form.addRow("Допуск по времени, с:", self.tolerance_spin)
+        layout.addLayout(form)
+        layout.addWidget(self.compact_check)
+
+        self.mode_combo.currentIndexChanged.connect(self._update_enabled)
+        self._update_enabled()
+
+    def get_options(self) -> dict:
+        """Параметры для DataMerger.merge_dataframes."""
+        options = {'method': self.mode_combo.currentData()}
+        if options['method'] == MERGE_RESAMPLE:
+            options['grid_step'] = self.step_spin.value() or None
+            options['interpolation'] = self.interpolation_combo.currentData()
+        if options['method'] != MERGE_EXACT and self.tolerance_spin.value():
+            options['tolerance'] = self.tolerance_spin.value()
+        if self.compact_check.isChecked():
+            options['compact'] = True
+        return options
+
+    def set_options(self, options: dict):
+        options = options or {}
+        self._select_data(self.mode_combo, options.get('method', MERGE_EXACT))
+        self.step_spin.setValue(options.get('grid_step') or 0.0)
+        self._select_data(self.interpolation_combo, options.get('interpolation', INTERPOLATION_LINEAR))
+        self.tolerance_spin.setValue(options.get('tolerance') or 0.0)
+        self.compact_check.setChecked(bool(options.get('compact')))
+        self._update_enabled()
+
+    @staticmethod
+    def _select_data(combo: QComboBox, data):
+        idx = combo.findData(data)
+        if idx >= 0:
+            combo.setCurrentIndex(idx)
+
+    def _update_enabled(self):
+        mode = self.mode_combo.currentData()
+        self.step_spin.setEnabled(mode == MERGE_RESAMPLE)
+        self.interpolation_combo.setEnabled(mode == MERGE_RESAMPLE)
+        self.tolerance_spin.setEnabled(mode != MERGE_EXACT)
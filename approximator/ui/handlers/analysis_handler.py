@@ -8,6 +8,7 @@ from PyQt5.QtCore import Qt
 
 from approximator.data_models.segment import Segment
 from approximator.services.math.standard_fitter import StandardFitter
+from approximator.services.approximation.channel_fitter import apply_results, collect_jobs, run_jobs
 
 class AnalysisEventHandler:
     def __init__(self, main_window, app_state, plot_manager, fitter):
@@ -52,36 +53,27 @@ class AnalysisEventHandler:
         
         print(f"\nЗапуск аппроксимации для канала: {channel_name}")
         channel_state = self.state.channel_states[channel_name]
+        if not self.state.ensure_data():
+            return
         df = self.state.merged_dataframe
 
         all_channel_names = set(self.state.channel_states.keys())
         time_column_candidates = list(set(df.columns) - all_channel_names)
         if not time_column_candidates: return
         time_column = time_column_candidates[0]
+        time_index = self.state.time_index(time_column)
+        if time_index is None: return
+
+        # Явный запуск — пересчитываем все сегменты канала
+        scheduler = getattr(self.main_window, 'fit_scheduler', None)
+        if scheduler is not None:
+            scheduler.submit(channel_state, time_index, self.state.data_version,
+                             on_done=lambda applied: self._redraw_plot_for_active_channel())
+            return
 
-        for segment in channel_state.segments:
-            if segment.is_excluded:
-                segment.fit_result = None
-                print(f"  - Сегмент {segment.label} исключен.")
-                continue
-
-            segment_data = df[
-                (df[time_column] >= segment.x_start) & 
-                (df[time_column] <= segment.x_end)
-            ]
-            x_data = segment_data[time_column]
-            y_data = segment_data[channel_name].dropna()
-
-            x_data = x_data[y_data.index]
-
-            fit_res = self.fitter.fit(x_data, y_data, segment.poly_degree)
-            segment.fit_result = fit_res
-
-            if fit_res:
-                print(f"  - Сегмент {segment.label} (степень {segment.poly_degree}): Успешно. RMSE = {fit_res.rmse:.4f}, R^2 = {fit_res.r_squared:.4f}")
-            else:
-                print(f"  - Сегмент {segment.label} (степень {segment.poly_degree}): Ошибка.")
-        
+        jobs = collect_jobs(channel_state, self.state.data_version, time_column=time_column)
+        results = run_jobs(jobs, *time_index.channel_arrays(channel_name), self.fitter)
+        apply_results(channel_state, self.state.data_version, results, time_column)
         self._redraw_plot_for_active_channel()
 
     def _handle_channel_change(self, index: int):
@@ -41,6 +41,8 @@ class AnalysisSetupHandler:
 
     def _toggle_source_visibility(self, state):
         self.state.show_source_data = (state == Qt.Checked)
+        if self.state.show_source_data:
+            self.state.ensure_data()
         self.redraw_callback()
 
     def _toggle_approx_visibility(self, state):
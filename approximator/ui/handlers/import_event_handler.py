@@ -3,9 +3,13 @@
 # МОДУЛЬ ОБРАБОТЧИКА СОБЫТИЙ ВКЛАДКИ "ИМПОРТ"
 # =================================================================================
 
+import os
+
 import pandas as pd
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor
 from PyQt5.QtWidgets import QFileDialog, QTableWidgetItem, QListWidgetItem
-from typing import Set
+from typing import Dict, List, Set
 
 from approximator.data_models.channel_state import ChannelState
 from approximator.data_models.segment import Segment
@@ -21,7 +25,10 @@ class ImportEventHandler:
         self.analysis_setup_handler = analysis_setup_handler
         self.analysis_reset_callback = analysis_reset_callback
         self._selected_file_paths = []
+        self._failed_files: Dict[str, str] = {}  # путь -> причина, по которой файл не загружен
+        self._unreported_failures: List[str] = []  # отказы, еще не показанные в строке состояния
         self._connect_events()
+        self._connect_file_loader()
 
     def _connect_events(self):
         print("DEBUG: ImportEventHandler _connect_events")
@@ -44,24 +51,131 @@ class ImportEventHandler:
         if not file_paths:
             return
 
-        newly_added_paths = []
-        for path in file_paths:
-            if path not in self._selected_file_paths:
-                self._selected_file_paths.append(path)
-                newly_added_paths.append(path)
-                df = self.data_loader.load_file(path)
-                if not df.empty:
-                    self.state.loaded_dataframes[path] = df
-
-        if newly_added_paths:
-            self._update_file_list_widget()
-            self._update_time_column_combo()
-
-            list_widget = self.main_window.import_tab.file_panel.list_widget
-            for i in range(list_widget.count()):
-                if list_widget.item(i).text() == newly_added_paths[0]:
-                    list_widget.setCurrentRow(i)
-                    break
+        newly_added_paths = [path for path in dict.fromkeys(file_paths) if path not in self._selected_file_paths]
+        if not newly_added_paths:
+            return
+        self._selected_file_paths.extend(newly_added_paths)
+        self._update_file_list_widget()
+
+        list_widget = self.main_window.import_tab.file_panel.list_widget
+        for i in range(list_widget.count()):
+            if list_widget.item(i).text() == newly_added_paths[0]:
+                list_widget.setCurrentRow(i)
+                break
+
+        self._load_files(newly_added_paths)
+
+    def _load_files(self, paths):
+        """
+        Файлы читаются параллельно в фоне; каждый появляется по готовности.
+        Компактное хранение (float32) включает объединение: колонка времени
+        станет известна только при нем.
+        """
+        file_loader = getattr(self.main_window, 'file_loader', None)
+        if file_loader is None:
+            for outcome in self.data_loader.load_many(paths):
+                if outcome.error is not None:
+                    self._on_file_failed(outcome.path, outcome.error)
+                else:
+                    self._on_file_loaded(outcome.path, outcome.dataframe)
+            self._report_failed_files()
+            return
+        file_loader.load(paths)
+        self._update_merge_button()
+
+    def _connect_file_loader(self):
+        file_loader = getattr(self.main_window, 'file_loader', None)
+        if file_loader is not None:
+            file_loader.file_loaded.connect(self._on_file_loaded)
+            file_loader.file_failed.connect(self._on_file_failed)
+            file_loader.batch_done.connect(self._on_batch_done)
+
+    def _on_batch_done(self, _batch: int):
+        self._update_merge_button()
+        self._report_failed_files()
+
+    def _is_loading(self) -> bool:
+        file_loader = getattr(self.main_window, 'file_loader', None)
+        return file_loader is not None and file_loader.is_busy()
+
+    def _update_merge_button(self):
+        """Пока файлы читаются, объединять нечего: кнопка недоступна."""
+        self.main_window.import_tab.merge_and_load_button.setEnabled(not self._is_loading())
+
+    def _cancel_loading(self):
+        """Прерывает чтение файлов; еще не прочитанные файлы из списка ставятся заново."""
+        if not self._is_loading():
+            return
+        self.main_window.file_loader.cancel()
+        pending = [path for path in self._selected_file_paths
+                   if path not in self.state.loaded_dataframes and path not in self._failed_files]
+        if pending:
+            self._load_files(pending)
+        self._update_merge_button()
+
+    def _on_file_loaded(self, path: str, df):
+        """Файл прочитан (вызывается в GUI-потоке)."""
+        if path not in self._selected_file_paths:
+            return
+        if df is None or df.empty:
+            # Парсер не подошел или в файле нет таблицы — это тоже отказ
+            self._on_file_failed(path, "формат не распознан или в файле нет данных")
+            return
+        if self._failed_files.pop(path, None) is not None:
+            self._mark_file_item(path)
+        self.state.loaded_dataframes[path] = df
+        # Порядок таблиц — как в списке файлов, а не по времени готовности
+        ordered = {p: self.state.loaded_dataframes[p] for p in self._selected_file_paths
+                   if p in self.state.loaded_dataframes}
+        self.state.loaded_dataframes.clear()
+        self.state.loaded_dataframes.update(ordered)
+        self._update_time_column_combo()
+
+        current_item = self.main_window.import_tab.file_panel.list_widget.currentItem()
+        if current_item is not None and current_item.text() == path:
+            self._update_preview_table(df)
+
+    def _on_file_failed(self, path: str, error: str):
+        """Файл не загружен: он отмечается в списке, причина — в подсказке и строке состояния."""
+        print(f"[ImportEventHandler] ❌ Ошибка загрузки {path}: {error}")
+        if path not in self._selected_file_paths:
+            return
+        self._failed_files[path] = error
+        self._unreported_failures.append(path)
+        self._mark_file_item(path)
+
+    def _report_failed_files(self):
+        """
+        Итог пакета в строке состояния: сообщение о ходе загрузки приходит
+        после каждого файла и перекрыло бы отказ, показанный сразу.
+        """
+        failed = [path for path in self._unreported_failures if path in self._failed_files]
+        self._unreported_failures.clear()
+        if not failed:
+            return
+        if len(failed) == 1:
+            message = f"Файл не загружен: {os.path.basename(failed[0])} — {self._failed_files[failed[0]]}"
+        else:
+            names = ", ".join(os.path.basename(path) for path in failed)
+            message = f"Не загружено файлов: {len(failed)} ({names}) — причина в подсказке к файлу в списке"
+        self.main_window.statusBar().showMessage(message, 15000)
+
+    def _mark_file_item(self, path: str):
+        list_widget = self.main_window.import_tab.file_panel.list_widget
+        for i in range(list_widget.count()):
+            item = list_widget.item(i)
+            if item.text() == path:
+                self._apply_file_item_state(item)
+                break
+
+    def _apply_file_item_state(self, item: QListWidgetItem):
+        error = self._failed_files.get(item.text())
+        if error is None:
+            item.setData(Qt.ForegroundRole, None)
+            item.setToolTip(item.text())
+        else:
+            item.setForeground(QColor('red'))
+            item.setToolTip(f"Не загружен: {error}")
 
     def _handle_file_selection_changed(self, current: QListWidgetItem, previous: QListWidgetItem):
         if current is None:
@@ -83,23 +197,33 @@ class ImportEventHandler:
 
         if file_path in self._selected_file_paths:
             self._selected_file_paths.remove(file_path)
+        self._failed_files.pop(file_path, None)
         if file_path in self.state.loaded_dataframes:
             del self.state.loaded_dataframes[file_path]
+        else:
+            # Файл еще читается — пакет прерывается, остальные файлы ставятся заново
+            self._cancel_loading()
 
         self._update_file_list_widget()
         self._update_time_column_combo()
         self._reset_preview_table()
 
     def _handle_merge_and_load(self):
+        if self._is_loading():
+            # Частичный результат не объединяется: дожидаемся всех файлов
+            self.main_window.statusBar().showMessage("Файлы еще загружаются — дождитесь окончания", 5000)
+            return
         time_column = self.main_window.import_tab.time_selector.get_selected()
         if not time_column:
             return
         all_dfs = list(self.state.loaded_dataframes.values())
         if not all_dfs:
             return
-        merged_df = self.data_merger.merge_dataframes(all_dfs, on_column=time_column)
+        self.state.merge_options = self.main_window.import_tab.merge_mode_selector.get_options()
+        merged_df = self.data_merger.merge_dataframes(all_dfs, on_column=time_column, **self.state.merge_options)
         if merged_df.empty:
             return
+        self.state.compact_loaded_dataframes(time_column)
         self.state.merged_dataframe = merged_df
         time_min, time_max = merged_df[time_column].min(), merged_df[time_column].max()
         channel_names = [col for col in merged_df.columns if col != time_column]
@@ -116,6 +240,9 @@ class ImportEventHandler:
 
     def _handle_reset_import(self):
         self._selected_file_paths.clear()
+        self._failed_files.clear()
+        self._unreported_failures.clear()
+        self._cancel_loading()
         self.state.loaded_dataframes.clear()
         self.state.merged_dataframe = pd.DataFrame()
         self.state.channel_list.clear()
@@ -135,6 +262,8 @@ class ImportEventHandler:
         list_widget.currentItemChanged.disconnect(self._handle_file_selection_changed)
         list_widget.clear()
         list_widget.addItems(self._selected_file_paths)
+        for i in range(list_widget.count()):
+            self._apply_file_item_state(list_widget.item(i))
         list_widget.currentItemChanged.connect(self._handle_file_selection_changed)
 
     def _update_time_column_combo(self):
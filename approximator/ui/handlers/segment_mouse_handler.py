@@ -3,6 +3,7 @@ from approximator.services.segments import SegmentEditor
 from approximator.services.plot.boundaries.draggable_segment_boundary import DraggableSegmentBoundary
 from approximator.data_models.app_state import AppState
 from approximator.services.plot.plot_manager import PlotManager
+from approximator.utils.plot.frame_throttle import FrameThrottle
 
 from approximator.utils.log import debug
 debug("[SegmentMouseHandler] ✅ Инициализирован")
@@ -14,17 +15,24 @@ class SegmentMouseHandler:
         plot_manager: PlotManager,
         redraw_callback,
         update_table_callback,
-        request_recalc_callback
+        request_recalc_callback,
+        live_refit_callback=None
     ):
         self.state = state
         self.plot_manager = plot_manager
         self.redraw_callback = redraw_callback
         self.update_table_callback = update_table_callback
         self.request_recalc_callback = request_recalc_callback
+        # Пересчет отдельных сегментов во время перетаскивания (без перерисовки)
+        self.live_refit_callback = live_refit_callback
 
         self.boundaries = []
+        self._dragging = False
+        self._pending_indices = set()
 
         canvas = self.plot_manager.canvas
+        # Не больше одного живого обновления за кадр
+        self._throttle = FrameThrottle(canvas, self._apply_live_update)
         self.cid_press = canvas.mpl_connect("button_press_event", self._on_mouse_press)
         self.cid_release = canvas.mpl_connect("button_release_event", self._on_mouse_release)
         self.cid_motion = canvas.mpl_connect("motion_notify_event", self._on_mouse_move)
@@ -38,8 +46,15 @@ class SegmentMouseHandler:
         self.boundaries.clear()
 
     def _rebuild_boundaries(self):
-        self._remove_old_boundaries()
         channel = self._get_active_channel()
+        # Разбиение не изменилось — достаточно подвинуть существующие линии
+        if (channel and self.boundaries and len(self.boundaries) == 2 * len(channel.segments)
+                and all(b.channel is channel for b in self.boundaries)):
+            for boundary in self.boundaries:
+                boundary.sync()
+            return
+
+        self._remove_old_boundaries()
         if not channel:
             return
 
@@ -54,22 +69,67 @@ class SegmentMouseHandler:
                     side=side,
                     channel=channel,
                     editor=editor,
-                    on_move_callback=self.redraw_callback
+                    on_move_callback=self._on_boundary_moved
                 )
+                # Перетаскиваемые линии выводятся через blit поверх фона
+                self.plot_manager.add_overlay(boundary.line)
                 self.boundaries.append(boundary)
 
     def _on_mouse_press(self, event: MouseEvent):
+        # Захватываем только одну линию: у смежных сегментов границы совпадают
         for boundary in self.boundaries:
-            boundary.on_press(event)
+            if boundary.contains(event):
+                boundary.on_press(event)
+                break
 
     def _on_mouse_release(self, event: MouseEvent):
-        for boundary in self.boundaries:
+        for boundary in list(self.boundaries):
             boundary.on_release(event)
 
+        if not self._dragging:
+            return
+        self._dragging = False
+        self._throttle.cancel()
+        self._pending_indices.clear()
+        self.plot_manager.end_interaction()
+
+        # Полная перерисовка только после отпускания кнопки
+        # (request_recalc_callback досчитывает устаревшие сегменты и перерисовывает график)
+        self.request_recalc_callback()
+        self.update_table_callback()
+
     def _on_mouse_move(self, event: MouseEvent):
         for boundary in self.boundaries:
             boundary.on_motion(event)
 
+    def _on_boundary_moved(self, boundary, indices):
+        """Копит затронутые сегменты; обновление выполняется раз в кадр."""
+        self._dragging = True
+        self._pending_indices.update(indices)
+        self._throttle.request()
+
+    def _apply_live_update(self):
+        """
+        Пересчитывает соседние сегменты, обновляет их кривые через set_data
+        и выводит изменения через blit (фон без этих кривых кешируется один раз).
+        """
+        indices = sorted(self._pending_indices)
+        self._pending_indices.clear()
+        channel = self._get_active_channel()
+        if not indices or not channel:
+            return
+
+        if callable(self.live_refit_callback):
+            self.live_refit_callback(indices)
+        self.plot_manager.update_segment_curves(channel.name, channel.segments, indices)
+        self.plot_manager.begin_interaction(self.plot_manager.segment_curves(channel.name, indices))
+
+        # Линия соседнего сегмента стоит на той же границе — подтягиваем ее
+        for boundary in self.boundaries:
+            if boundary.segment_index in indices:
+                boundary.sync()
+        self.plot_manager.refresh_overlays()
+
     def _on_mouse_right_click(self, event: MouseEvent):
         if event.button != 3 or event.xdata is None:
             return
@@ -2,6 +2,8 @@
 # =================================================================================
 # МОДУЛЬ ОБРАБОТЧИКА СОБЫТИЙ ТАБЛИЦЫ СЕГМЕНТОВ
 # =================================================================================
+import time
+
 from PyQt5.QtWidgets import (QTableWidgetItem, QCheckBox, QWidget, QHBoxLayout, 
                             QColorDialog, QHeaderView, QComboBox, QTableWidget,
                             QPushButton)
@@ -9,6 +11,7 @@ from PyQt5.QtGui import QColor
 from PyQt5.QtCore import Qt
 
 from approximator.data_models.segment import Segment
+from approximator.services.approximation.channel_fitter import apply_results, collect_jobs, run_jobs
 
 class SegmentTableHandler:
     """Обработчик таблицы сегментов."""
@@ -92,6 +95,10 @@ class SegmentTableHandler:
         self.segment_table.cellChanged.connect(self._on_cell_changed)
         self.segment_table.itemSelectionChanged.connect(self._on_selection_changed)
 
+        analysis_tab = self.main_window.analysis_tab
+        if hasattr(analysis_tab, 'fit_all_channels_button'):
+            analysis_tab.fit_all_channels_button.clicked.connect(lambda: self.fit_all_channels())
+
     def _find_segments_table(self):
         """Находит таблицу сегментов в главном окне."""
         # Находим вкладку анализа
@@ -153,53 +160,115 @@ class SegmentTableHandler:
         except Exception as e:
             print(f"Error in selection change handler: {e}")
             
-    def _fit_segments(self):
-        """Выполнить fit для активного канала."""
+    def _fit_segments(self, force: bool = False):
+        """
+        Выполнить fit для активного канала.
+        Пересчитываются только сегменты, у которых изменились границы, степень,
+        тип, смещение канала или сами данные; остальные берутся из кеша.
+        Если у окна есть фоновый планировщик, расчет идет вне GUI-потока,
+        а перерисовка выполняется по его завершении.
+        """
         active_channel = self.state.active_channel_name
         if active_channel and active_channel in self.state.channel_states:
+            # Проект открыт лениво — исходные данные нужны только теперь
+            if not self.state.ensure_data():
+                return
             channel_state = self.state.channel_states[active_channel]
-            df = self.state.merged_dataframe
-            if df is not None and not df.empty:
-                time_column = None
-                if hasattr(self.main_window.import_tab, 'time_column_combo'):
-                    time_column = self.main_window.import_tab.time_column_combo.currentText()
-                if not time_column:
-                    all_columns = df.columns
-                    if 'Time' in all_columns:
-                        time_column = 'Time'
-                    else:
-                        time_column = all_columns[0] if len(all_columns) > 0 else None
-                if not time_column:
-                    return
+            if force:
+                channel_state.mark_all_dirty()
+            time_index = self._active_time_index()
+            if time_index is None:
+                return
+            # Колонка времени входит в ключ: после ее смены пересчитываются все сегменты
+            indices = channel_state.dirty_segment_indices(self.state.data_version, time_index.time_column)
 
-                print(f"[_fit_segments] Fitting segments for channel {active_channel}, time column: {time_column}")
-                for seg in channel_state.segments:
-                    # Используем segment_type вместо is_excluded
-                    if seg.segment_type == "Маска":
-                        seg.fit_result = None
-                        print(f"  - Segment {seg.label} is masked, skipping")
-                        continue
-
-                    mask = (df[time_column] >= seg.x_start) & (df[time_column] <= seg.x_end)
-                    x_data = df.loc[mask, time_column]
-                    y_data = df.loc[mask, active_channel]
-                    
-                    if len(x_data) < seg.poly_degree + 1:
-                        print(f"  - Segment {seg.label} has too few points ({len(x_data)}) for degree {seg.poly_degree}, skipping")
-                        seg.fit_result = None
-                        continue
+            scheduler = getattr(self.main_window, 'fit_scheduler', None)
+            if scheduler is None:
+                if self.refit_segments(indices) is not None:
+                    # После фитирования обновляем UI
+                    self.redraw_callback(preserve_zoom=True)
+                return
 
-                    print(f"  - Fitting segment {seg.label} with {len(x_data)} points, degree {seg.poly_degree}")
-                    try:
-                        seg.fit_result = self.fitter.fit(x_data, y_data, seg.poly_degree)
-                        if seg.fit_result:
-                            print(f"    R² = {seg.fit_result.r_squared:.4f}, RMSE = {seg.fit_result.rmse:.4f}")
-                    except Exception as e:
-                        print(f"    Error fitting segment: {e}")
-                        seg.fit_result = None
-                        
-                # После фитирования обновляем UI
-                self.redraw_callback(preserve_zoom=True)
+            print(f"[_fit_segments] Scheduling {len(indices)} of {len(channel_state.segments)} segments "
+                  f"for channel {active_channel}")
+            scheduler.submit(channel_state, time_index, self.state.data_version, indices,
+                             on_done=lambda applied: self.redraw_callback(preserve_zoom=True))
+
+    def fit_all_channels(self, force: bool = False):
+        """
+        Аппроксимация всех каналов в пуле процессов (см. parallel_fitter).
+        Результаты записываются в сегменты в GUI-потоке по завершении расчета.
+        """
+        scheduler = getattr(self.main_window, 'fit_scheduler', None)
+        self.state.ensure_data()
+        time_index = self._time_index()
+        if scheduler is None or time_index is None or not self.state.channel_states:
+            print("[fit_all_channels] Нет данных или планировщика для расчета")
+            return
+        channel_states = {name: cs for name, cs in self.state.channel_states.items()
+                          if time_index.has_channel(name)}
+        started = time.perf_counter()
+
+        def on_done(reports):
+            elapsed = time.perf_counter() - started
+            self.redraw_callback(preserve_zoom=True)
+            self.update_table_callback()
+            self.main_window.statusBar().showMessage(
+                f"Рассчитано каналов: {len(reports)} за {elapsed:.2f} с", 5000)
+
+        scheduler.submit_all_channels(channel_states, time_index, self.state.data_version,
+                                      on_done=on_done, force=force)
+
+    def _active_time_index(self):
+        """Индекс по времени для активного канала (None, если данных нет)."""
+        time_index = self._time_index()
+        if time_index is None or not time_index.has_channel(self.state.active_channel_name):
+            return None
+        return time_index
+
+    def _time_index(self):
+        """Индекс по выбранной колонке времени (None, если данных нет)."""
+        df = self.state.merged_dataframe
+        if df is None or df.empty:
+            return None
+
+        time_column = None
+        if hasattr(self.main_window.import_tab, 'time_column_combo'):
+            time_column = self.main_window.import_tab.time_column_combo.currentText()
+        if not time_column:
+            all_columns = df.columns
+            if 'Time' in all_columns:
+                time_column = 'Time'
+            else:
+                time_column = all_columns[0] if len(all_columns) > 0 else None
+        if not time_column:
+            return None
+
+        return self.state.time_index(time_column)
+
+    def refit_segments(self, indices):
+        """
+        Синхронно пересчитывает аппроксимацию указанных сегментов активного канала
+        (используется при перетаскивании границ, где нужен результат в том же кадре).
+        self.fitter — MomentFitter: сегмент считается по итогам блоков канала
+        и точкам двух крайних блоков, а не по всем своим точкам
+        (доля такого пути — benchmarks/bench_moment_fitter.py).
+        Возвращает список пересчитанных индексов или None, если данных нет.
+        """
+        active_channel = self.state.active_channel_name
+        if not active_channel or active_channel not in self.state.channel_states:
+            return None
+        channel_state = self.state.channel_states[active_channel]
+        time_index = self._active_time_index()
+        if time_index is None:
+            return None
+
+        data_version = self.state.data_version
+        jobs = collect_jobs(channel_state, data_version, indices, time_index.time_column)
+        print(f"[_fit_segments] Fitting {len(jobs)} of {len(channel_state.segments)} segments "
+              f"for channel {active_channel}, time column: {time_index.time_column}")
+        results = run_jobs(jobs, *time_index.channel_arrays(active_channel), self.fitter)
+        return apply_results(channel_state, data_version, results, time_index.time_column)
 
     def _connect_events(self):
         """Подключает обработчики событий."""
@@ -480,8 +549,13 @@ class SegmentTableHandler:
         channel_name = self.state.active_channel_name
         if not channel_name: return
         channel_state = self.state.channel_states[channel_name]
-        df, time_col = self.state.merged_dataframe, "Time"
-        time_min, time_max = df[time_col].min(), df[time_col].max()
+        # Диапазон собственных отсчетов канала (ChannelStore), а не всей таблицы
+        series = self.state.channel_store().get(channel_name)
+        time_range = series.time_range() if series is not None else None
+        if time_range is None:
+            df, time_col = self.state.merged_dataframe, "Time"
+            time_range = (df[time_col].min(), df[time_col].max())
+        time_min, time_max = time_range
         # Сохраняем старые цвета и стили по границам
         old_segments = getattr(channel_state, 'segments', [])
         new_segment = Segment(x_start=time_min, x_end=time_max, color=channel_state.base_color)
@@ -3,13 +3,18 @@
 # =================================================================================
 # МОДУЛЬ МЕНЕДЖЕРА ОТРИСОВКИ
 # =================================================================================
+import weakref
+
 import pandas as pd
 import numpy as np
 from typing import List, Dict, Optional
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.lines import Line2D
-from data_models.channel_state import ChannelState
+from approximator.data_models.channel_state import ChannelState
+from approximator.services.plot.lod import LodLayer
+from approximator.services.plot.retained import ArtistCache, BlitManager
+from approximator.services.time_index import get_time_index
 
 class PlotManager:
     def __init__(self, canvas: FigureCanvas):
@@ -18,14 +23,23 @@ class PlotManager:
         self.ax = self.figure.add_subplot(111)
         self.boundary_lines: List[Line2D] = []
         self._force_no_segment_highlight = False
+        # Постоянные artists вместо ax.clear() на каждую перерисовку;
+        # границы и выделение выводятся через blit поверх фона
+        self._artists = ArtistCache(self.ax)
+        self._blit = BlitManager(canvas)
+        self._blit.add_provider(self._artists.overlays)
+        # Прореживание исходных серий под текущий масштаб (min/max пирамиды)
+        self._lod = LodLayer(self.ax)
+        self._df_ref = None
 
     def clear_plot(self):
-        self.ax.clear(); self.boundary_lines.clear(); self.ax.grid(True); self.canvas.draw()
+        self._artists.clear(); self._df_ref = None
+        self.ax.clear(); self._lod.clear(); self.boundary_lines.clear(); self.ax.grid(True); self._blit.draw()
 
     def update_dragged_line_position(self, x_pos: float):
         for line in self.boundary_lines:
             if line.get_linewidth() > 2:
-                line.set_xdata([x_pos, x_pos]); self.canvas.draw_idle(); return
+                line.set_xdata([x_pos, x_pos]); self._blit.update(); return
 
     def redraw_all_channels(
         self, 
@@ -41,44 +55,48 @@ class PlotManager:
         dragged: bool = False
     ):
         print(f"[redraw_all_channels] dragged={dragged}, selected_segment_index={selected_segment_index}, active_channel_name={active_channel_name}")
-        # Удаляем все axvspan (Rectangle) патчи с оси
-        for patch in list(self.ax.patches):
-            try:
-                patch.remove()
-            except Exception:
-                pass
         if preserve_zoom: xlim, ylim = self.ax.get_xlim(), self.ax.get_ylim()
-        self.ax.clear(); self.boundary_lines.clear()
-        # Жёстко удаляем все патчи и линии после clear (на случай, если matplotlib что-то кэширует)
-        for patch in list(self.ax.patches):
-            try:
-                patch.remove()
-            except Exception:
-                pass
+        limits = (self.ax.get_xlim(), self.ax.get_ylim())
+        # Новая таблица — данные во всех сериях нужно перезагрузить
+        if self._df_ref is None or self._df_ref() is not df:
+            self._artists.invalidate_data(); self._df_ref = weakref.ref(df)
+        self._artists.begin(); self.boundary_lines.clear()
         
         # --- Отрисовка исходных данных ---
         if show_source:
+            time_index = get_time_index(df, x_col)
             for name, state in channel_states.items():
                 if not state.is_visible or name not in df.columns: continue
                 
-                x_data_raw = df[x_col] + state.time_offset
-                y_data_raw = df[name]
-                
-                excluded_mask = df.index.isin(state.excluded_indices)
+                excluded = frozenset(state.excluded_indices)
+                data_key = (x_col, name, state.time_offset, excluded)
+
+                def source_data(name=name, state=state, excluded_part=False):
+                    key = ('excluded' if excluded_part else 'source', name)
+                    if not state.excluded_indices and time_index is not None:
+                        # Компактные отсчеты канала из ChannelStore (без NaN других каналов)
+                        if excluded_part:
+                            return self._lod.set_source(key, np.zeros(0), np.zeros(0))
+                        return self._lod.set_source(key, *time_index.store[name].shifted(state.time_offset))
+                    excluded_mask = df.index.isin(state.excluded_indices)
+                    mask = excluded_mask if excluded_part else ~excluded_mask
+                    return self._lod.set_source(key, df[x_col].to_numpy()[mask] + state.time_offset,
+                                                df[name].to_numpy()[mask])
                 
                 is_active = (name == active_channel_name)
                 base_thickness = getattr(state, 'thickness', 1.5)
                 base_style = getattr(state, 'line_style', '-')
-                line_alpha = 1.0 if is_active else 0.4
                 line_width = base_thickness
                 line_color = state.base_color
                 # Основная линия: только оттенок (alpha) для активного канала
-                self.ax.plot(x_data_raw[~excluded_mask], y_data_raw[~excluded_mask],
-                             marker='.', markersize=2, linestyle=base_style,
-                             alpha=1.0 if is_active else 0.4,
-                             label=name, color=line_color, linewidth=line_width, zorder=3 if is_active else 1)
-                self.ax.plot(x_data_raw[excluded_mask], y_data_raw[excluded_mask],
-                             marker='.', markersize=2, linestyle='none', alpha=0.3, color='grey', zorder=1)
+                line = self._artists.line(('source', name), data_key, source_data,
+                                          marker='.', markersize=2, linestyle=base_style,
+                                          alpha=1.0 if is_active else 0.4,
+                                          label=name, color=line_color, linewidth=line_width, zorder=3 if is_active else 1)
+                self._lod.bind(('source', name), line)
+                line = self._artists.line(('excluded', name), data_key, lambda f=source_data: f(excluded_part=True),
+                                          marker='.', markersize=2, linestyle='none', alpha=0.3, color='grey', zorder=1)
+                self._lod.bind(('excluded', name), line)
 
         # --- Отрисовка деталей активного канала (границы, аппроксимация, сглаживание) ---
         if active_channel_name and active_channel_name in channel_states:
@@ -87,13 +105,23 @@ class PlotManager:
                 self._draw_active_channel_details(
                     active_state, selected_segment_index, show_approximation, df, smoothed_df, x_col, dragged=dragged
                 )
+        self._artists.end()
         
-        self.ax.legend().set_visible(False); self.ax.set_xlabel(x_col)
+        self.ax.set_xlabel(x_col)
         self.ax.set_ylabel("Значение"); self.ax.grid(True)
         
         if preserve_zoom: self.ax.set_xlim(xlim); self.ax.set_ylim(ylim)
-        else: self.figure.tight_layout()
-        self.canvas.draw()
+        else:
+            # Автомасштаб — по прореженным сериям целиком, а не по текущему окну
+            self._lod.show_overview()
+            self.ax.relim(visible_only=True); self.ax.set_autoscale_on(True); self.ax.autoscale_view()
+            if self._artists.content_changed: self.figure.tight_layout()
+        self._lod.update()
+        # Полная перерисовка — только если изменился фон; иначе blit оверлеев
+        if self._artists.content_changed or limits != (self.ax.get_xlim(), self.ax.get_ylim()):
+            self._blit.draw()
+        else:
+            self._blit.update()
         
     def _draw_active_channel_details(
         self, 
@@ -114,11 +142,13 @@ class PlotManager:
         if smoothed_df is not None and not smoothed_df.empty:
             smoothed_col_name = f"{active_state.name}_smoothed"
             if smoothed_col_name in smoothed_df.columns:
-                x_data = source_df[x_col] + active_state.time_offset
-                y_data_smoothed = smoothed_df[smoothed_col_name]
-                
                 # Рисуем сглаженную линию тонкой и полупрозрачной
-                self.ax.plot(x_data, y_data_smoothed, color='gray', linestyle='-', linewidth=1.2, alpha=0.8, label=f"{active_state.name} (сглаж.)")
+                self._artists.line(
+                    ('smoothed', active_state.name),
+                    (id(smoothed_df), x_col, smoothed_col_name, active_state.time_offset),
+                    lambda: (source_df[x_col].to_numpy() + active_state.time_offset,
+                             smoothed_df[smoothed_col_name].to_numpy()),
+                    color='gray', linestyle='-', linewidth=1.2, alpha=0.8, label=f"{active_state.name} (сглаж.)")
         # --- [КОНЕЦ НОВОГО БЛОКА] ---
 
         if not active_state.segments: return
@@ -128,23 +158,29 @@ class PlotManager:
         if not dragged and not self._force_no_segment_highlight and selected_segment_index is not None and selected_segment_index < len(active_state.segments):
             sel_segment = active_state.segments[selected_segment_index]
             print(f"[axvspan] DRAW: x_start={sel_segment.x_start}, x_end={sel_segment.x_end}, color={sel_segment.color}")
-            self.ax.axvspan(sel_segment.x_start + active_state.time_offset, sel_segment.x_end + active_state.time_offset,
-                            color=sel_segment.color, alpha=0.15, zorder=-1)
+            self._artists.span(('selection',), sel_segment.x_start + active_state.time_offset, sel_segment.x_end + active_state.time_offset,
+                               color=sel_segment.color, alpha=0.15, zorder=-1)
         
         # Отрисовка границ сегментов
         boundaries = sorted(list({s.x_start for s in active_state.segments} | {s.x_end for s in active_state.segments}))
-        for bx in boundaries:
-            line = Line2D([bx + active_state.time_offset] * 2, self.ax.get_ylim(), 
-                          color='grey', linestyle='--', linewidth=1.5, picker=5)
-            self.ax.add_line(line); self.boundary_lines.append(line)
+        for i, bx in enumerate(boundaries):
+            line = self._artists.vline(('boundary', i), bx + active_state.time_offset,
+                                       color='grey', linestyle='--', linewidth=1.5, picker=5)
+            self.boundary_lines.append(line)
         
         # Отрисовка линий аппроксимации
         if show_approximation:
-            for segment in active_state.segments:
-                if segment.fit_result and not segment.is_excluded:
-                    x_fit = np.linspace(segment.x_start, segment.x_end, 200) + active_state.time_offset
-                    y_fit = np.poly1d(segment.fit_result.coefficients)(x_fit - active_state.time_offset)
+            for i, segment in enumerate(active_state.segments):
+                if segment.fit_result and segment.segment_type != "Маска":
+                    offset = active_state.time_offset
                     color = getattr(segment, 'color', '#FF0000')
                     thickness = getattr(segment, 'thickness', 1.5)
                     style = getattr(segment, 'line_style', '-')
-                    self.ax.plot(x_fit, y_fit, color=color, linestyle=style, linewidth=thickness)
\ No newline at end of file
+
+                    def fit_data(segment=segment):
+                        x_fit = np.linspace(segment.x_start, segment.x_end, 200) + offset
+                        return x_fit, np.poly1d(segment.fit_result.coefficients)(x_fit - offset)
+
+                    self._artists.line(('curve', i),
+                                       (segment.x_start, segment.x_end, offset, tuple(segment.fit_result.coefficients)),
+                                       fit_data, color=color, linestyle=style, linewidth=thickness)
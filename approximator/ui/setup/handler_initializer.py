@@ -13,7 +13,8 @@ def create_handlers(main_window):
     def redraw_plot(preserve_zoom=False):
         debug(f"[redraw_plot] Запуск redraw с preserve_zoom={preserve_zoom}")
 
-        # Перерисовка интерактивных границ
+        # Перерисовка интерактивных границ: оси больше не очищаются,
+        # поэтому линии, созданные до отрисовки, попадают в тот же кадр
         if hasattr(main_window, 'segment_mouse_handler'):
             main_window.segment_mouse_handler._rebuild_boundaries()
 
@@ -84,7 +85,8 @@ def create_handlers(main_window):
         plot_manager = main_window.plot_manager,
         redraw_callback = redraw_plot,
         update_table_callback = lambda: main_window.segment_table_handler.update_table() if hasattr(main_window, 'segment_table_handler') else None,
-        request_recalc_callback = main_window.request_recalculation
+        request_recalc_callback = main_window.request_recalculation,
+        live_refit_callback = lambda indices: main_window.segment_table_handler.refit_segments(indices)
     )
 
     debug("[handler_initializer] ✅ Обработчики успешно созданы")
\ No newline at end of file
@@ -70,9 +70,15 @@ class AnalysisTab(QWidget):
             },
             'imported_files': imported_files
         }
-        file_path, _ = QFileDialog.getSaveFileName(self, 'Сохранить проект', '', 'JSON Files (*.json)')
+        file_path, _ = QFileDialog.getSaveFileName(self, 'Сохранить проект', '',
+                                                   'JSON Files (*.json);;Проект с данными (*.approx)')
         if not file_path:
             return
+        # Проект с данными (.approx) сохраняет ProjectStateController — одним файлом
+        if file_path.lower().endswith('.approx') and hasattr(main_window, 'project_controller'):
+            main_window.project_controller.save_project(file_path)
+            QMessageBox.information(self, 'Сохранение', 'Проект успешно сохранён!')
+            return
         with open(file_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
         QMessageBox.information(self, 'Сохранение', 'Проект успешно сохранён!')
@@ -94,6 +100,7 @@ class AnalysisTab(QWidget):
         self.show_all_channels_button = QPushButton("Показать все")
         self.hide_all_channels_button = QPushButton("Скрыть все")
         self.calculate_button = QPushButton("Рассчитать")
+        self.fit_all_channels_button = QPushButton("Рассчитать все каналы")
         self.restore_excluded_button = QPushButton("Восстановить вырезанное")
         
         # Кнопки управления проектом
@@ -160,6 +167,7 @@ class AnalysisTab(QWidget):
         toolbar_layout_1.addWidget(self.show_all_channels_button)
         toolbar_layout_1.addWidget(self.hide_all_channels_button)
         toolbar_layout_1.addWidget(self.calculate_button)
+        toolbar_layout_1.addWidget(self.fit_all_channels_button)
         toolbar_layout_1.addWidget(self.restore_excluded_button)
         toolbar_layout_1.addSpacing(20)
         toolbar_layout_1.addWidget(self.save_project_button)
@@ -233,9 +241,14 @@ class AnalysisTab(QWidget):
             QMessageBox.warning(self, 'Ошибка', 'Не удалось получить состояние приложения.')
             return
         app_state = main_window.state
-        file_path, _ = QFileDialog.getOpenFileName(self, 'Открыть проект', '', 'JSON Files (*.json)')
+        file_path, _ = QFileDialog.getOpenFileName(self, 'Открыть проект', '',
+                                                   'Проекты (*.json *.approx);;JSON Files (*.json)')
         if not file_path:
             return
+        # Проект с данными (.approx) открывается без исходных файлов
+        if file_path.lower().endswith('.approx') and hasattr(main_window, 'project_controller'):
+            main_window.project_controller.load_project(file_path)
+            return
         with open(file_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         # Восстанавливаем каналы
@@ -283,7 +296,9 @@ class AnalysisTab(QWidget):
                     else:
                         time_column = list(all_columns)[0] if all_columns else None
                 if time_column:
-                    merged_df = main_window.data_merger.merge_dataframes(list(loaded_dfs.values()), on_column=time_column)
+                    merged_df = main_window.data_merger.merge_dataframes(list(loaded_dfs.values()), on_column=time_column,
+                                                                         **app_state.merge_options)
+                    app_state.compact_loaded_dataframes(time_column)
                     app_state.merged_dataframe = merged_df
                     # Восстанавливаем channel_list
                     channel_names = [col for col in merged_df.columns if col != time_column]
@@ -306,6 +321,8 @@ class AnalysisTab(QWidget):
                 else:
                     time_column = all_columns[0] if len(all_columns) > 0 else None
             if time_column:
+                # Границы сегментов активного канала рисует сам PlotManager
+                # (линии 'boundary' в ArtistCache) и сам обновляет холст
                 main_window.plot_manager.redraw_all_channels(
                     df=app_state.merged_dataframe,
                     x_col=time_column,
@@ -316,17 +333,6 @@ class AnalysisTab(QWidget):
                     show_source=app_state.show_source_data,
                     show_approximation=app_state.show_approximation
                 )
-                # Нарисовать границы сегментов для активного канала
-                active = app_state.active_channel_name
-                if active and active in app_state.channel_states:
-                    segments = app_state.channel_states[active].segments
-                    ax = main_window.plot_manager.ax
-                    for seg in segments:
-                        x = seg.x_start
-                        ax.axvline(x, color='k', linestyle=':', alpha=0.5)
-                    if segments:
-                        ax.axvline(segments[-1].x_end, color='k', linestyle=':', alpha=0.5)
-                    main_window.plot_manager.canvas.draw()
         QMessageBox.information(self, 'Загрузка', 'Проект успешно загружен!')
     def update_controls(self):
         """Обновляет состояние элементов управления на основе текущего состояния."""
@@ -1,3 +1,5 @@
+import os
+
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QSpinBox, QDoubleSpinBox, QCheckBox, QComboBox, QPushButton, QTableWidget, QTableWidgetItem, QHBoxLayout
 from PyQt5.QtCore import Qt
 
@@ -123,7 +125,7 @@ class ExportTab(QWidget):
         layout.addWidget(self.channel_table)
 
         # Кнопка экспорта
-        self.export_btn = QPushButton('Экспортировать в Excel')
+        self.export_btn = QPushButton('Экспортировать (Excel / CSV / Parquet)')
         layout.addWidget(self.export_btn)
         self.export_btn.clicked.connect(self.export_to_excel)
 
@@ -266,66 +268,28 @@ class ExportTab(QWidget):
             for f in imported_files:
                 main_window.import_tab.file_list_widget.addItem(f)
         QMessageBox.information(self, 'Восстановление', 'Состояние успешно восстановлено!')
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        layout = QVBoxLayout()
-
-        # Настройки времени
-        time_layout = QHBoxLayout()
-        time_layout.addWidget(QLabel('Шаг по времени (сек):'))
-        self.time_step_spin = QDoubleSpinBox()
-        self.time_step_spin.setDecimals(3)
-        self.time_step_spin.setMinimum(0.001)
-        self.time_step_spin.setMaximum(10000)
-        self.time_step_spin.setValue(1.0)
-        time_layout.addWidget(self.time_step_spin)
-        layout.addLayout(time_layout)
-
-        start_layout = QHBoxLayout()
-        start_layout.addWidget(QLabel('Начальная точка:'))
-        self.start_point_spin = QDoubleSpinBox()
-        self.start_point_spin.setDecimals(3)
-        self.start_point_spin.setMinimum(0.0)
-        self.start_point_spin.setMaximum(10000)
-        self.start_point_spin.setValue(0.0)
-        start_layout.addWidget(self.start_point_spin)
-        layout.addLayout(start_layout)
-
-        # Варианты экспорта
-        self.export_mode_combo = QComboBox()
-        self.export_mode_combo.addItems([
-            'Экспортировать с заданным числом точек на весь диапазон',
-            'Указать число точек на каждом сегменте'
-        ])
-        layout.addWidget(QLabel('Вариант экспорта:'))
-        layout.addWidget(self.export_mode_combo)
-
-        # Таблица для каналов и точек
-        self.channel_table = QTableWidget(0, 3)
-        self.channel_table.setHorizontalHeaderLabels(['Канал', 'Число точек', 'Толщина линии'])
-        layout.addWidget(QLabel('Настройка каналов и точек на сегмент:'))
-        layout.addWidget(self.channel_table)
 
-        # Кнопка экспорта
-        self.export_btn = QPushButton('Экспортировать в Excel')
-        layout.addWidget(self.export_btn)
-
-        self.setLayout(layout)
-
-        # Обработчик кнопки экспорта
-
-        self.export_btn.clicked.connect(self.export_to_excel)
+    def showEvent(self, event):
+        # Каналы могли появиться после создания вкладки (загрузка проекта/файлов)
+        main_window = self.parent()
+        while main_window and not hasattr(main_window, 'state'):
+            main_window = main_window.parent()
+        if main_window and self.channel_table.rowCount() != len(main_window.state.channel_states):
+            self.refresh_channel_table()
+            self.update_end_point_from_data()
+        super().showEvent(event)
 
     def export_to_excel(self):
         from PyQt5.QtWidgets import QFileDialog, QMessageBox
-        import pandas as pd
-        import numpy as np
-        from data_models.data_structures import Segment
+        from approximator.services.data_exporter import ExportOptions, export_approximations
 
-        # Получаем путь для сохранения файла
-        file_path, _ = QFileDialog.getSaveFileName(self, 'Сохранить файл', '', 'Excel Files (*.xlsx)')
+        # Получаем путь для сохранения файла (формат — по фильтру/расширению)
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, 'Сохранить файл', '', 'Excel Files (*.xlsx);;CSV Files (*.csv);;Parquet Files (*.parquet)')
         if not file_path:
             return
+        if not os.path.splitext(file_path)[1]:
+            file_path += '.' + selected_filter.split('*.')[-1].rstrip(')')
 
         # Получаем состояние приложения через MainWindow
         main_window = self.parent()
@@ -335,114 +299,47 @@ class ExportTab(QWidget):
             QMessageBox.warning(self, 'Ошибка', 'Не удалось получить состояние приложения.')
             return
         app_state = main_window.state
-        df = app_state.merged_dataframe.copy()
+        app_state.ensure_data()
+        df = app_state.merged_dataframe
         channel_states = app_state.channel_states
-        time_col = None
-        # Определяем столбец времени
-        for col in df.columns:
-            if col.lower().startswith('time') or col.lower() == 't':
-                time_col = col
-                break
-        if time_col is None:
-            time_col = df.columns[0]
-
-        # Получаем выбранные каналы (или все)
-        channels = [self.channel_table.item(row, 0).text() for row in range(self.channel_table.rowCount())]
-        if not channels:
-            channels = list(channel_states.keys())
-
-        # Получаем параметры экспорта
-        time_step = self.time_step_spin.value()
-        start_point = self.start_point_spin.value()
-        mode = self.export_mode_combo.currentIndex()
-        total_points = self.total_points_spin.value()
-        end_point = self.end_point_spin.value()
-        points_per_channel = {}
-        for row in range(self.channel_table.rowCount()):
-            ch = self.channel_table.item(row, 0).text()
+        time_col = app_state.time_column
+        if not time_col or time_col not in df.columns:
+            time_col = next((col for col in df.columns if col.lower().startswith('time') or col.lower() == 't'),
+                            df.columns[0] if len(df.columns) else None)
+
+        # Строки таблицы каналов идут в порядке channel_states (см. refresh_channel_table);
+        # в первой колонке — отображаемое имя, во второй — число точек на сегмент
+        names = list(channel_states.keys())
+        channels, points_per_channel = [], {}
+        for row in range(min(self.channel_table.rowCount(), len(names))):
+            channels.append(names[row])
+            item = self.channel_table.item(row, 1)
             try:
-                n = int(self.channel_table.item(row, 1).text())
-            except Exception:
-                n = 100
-            points_per_channel[ch] = n
-
-        # Если выбран режим "на весь диапазон" — обновляем конечную точку по данным
-        if mode == 0:
-            # Определяем максимальную точку по всем каналам
-            max_x = None
-            for ch in channels:
-                ch_data = df[time_col] if ch not in df.columns else df[ch]
-                ch_max = ch_data.max()
-                if max_x is None or ch_max > max_x:
-                    max_x = ch_max
-            if max_x is not None:
-                self.end_point_spin.setValue(float(max_x))
-            end_point = self.end_point_spin.value()
-
-        # Формируем лист с исходными данными
-        orig_data = df[[time_col] + channels].copy()
-        orig_data['t_abs'] = orig_data[time_col]
-        orig_data['t_rel'] = orig_data[time_col] - start_point
-        cols = ['t_abs', 't_rel'] + channels
-        orig_data = orig_data[cols]
-
-        # Формируем лист с масками (исключёнными интервалами/индексами)
-        mask_rows = []
-        for ch in channels:
-            ch_state = channel_states[ch]
-            if ch_state.excluded_indices:
-                mask_rows.append({'Канал': ch, 'Исключённые индексы': ', '.join(map(str, sorted(ch_state.excluded_indices)))})
-            else:
-                mask_rows.append({'Канал': ch, 'Исключённые индексы': ''})
-        mask_df = pd.DataFrame(mask_rows)
-
-        # Формируем лист с аппроксимацией и статистикой
-        approx_rows = []
-        for ch in channels:
-            ch_state = channel_states[ch]
-            for seg in ch_state.segments:
-                if seg.is_excluded or not seg.fit_result:
-                    continue
-                # Вычисляем точки для экспорта
-                if mode == 0:
-                    # Для всего диапазона: равномерно по диапазону сегментов канала
-                    x_min = min(s.x_start for s in ch_state.segments if not s.is_excluded)
-                    x_max = end_point
-                    x_vals = np.linspace(x_min, x_max, total_points)
-                else:
-                    n_points = points_per_channel.get(ch, 100)
-                    x_vals = np.linspace(seg.x_start, seg.x_end, n_points)
-                y_vals = np.polyval(seg.fit_result.coefficients, x_vals)
-                for i, (x, y) in enumerate(zip(x_vals, y_vals)):
-                    approx_rows.append({
-                        'Канал': ch,
-                        'Сегмент': seg.label,
-                        't_abs': x,
-                        't_rel': x - start_point,
-                        'Значение': y,
-                        'Степень': seg.poly_degree,
-                        'RMSE': seg.fit_result.rmse,
-                        'R2': seg.fit_result.r_squared,
-                        'Коэффициенты': str(seg.fit_result.coefficients),
-                        'Число точек': seg.fit_result.points_count
-                    })
-
-        approx_df = pd.DataFrame(approx_rows)
-
-        # Лист с настройками экспорта
-        settings = {
-            'Шаг по времени': time_step,
-            'Начальная точка': start_point,
-            'Режим': self.export_mode_combo.currentText(),
-            'Каналы': ', '.join(channels)
-        }
-        settings_df = pd.DataFrame(list(settings.items()), columns=['Параметр', 'Значение'])
-
-        # Сохраняем в Excel
-        with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-            orig_data.to_excel(writer, sheet_name='Исходные данные', index=False)
-            approx_df.to_excel(writer, sheet_name='Аппроксимация', index=False)
-            mask_df.to_excel(writer, sheet_name='Маски', index=False)
-            settings_df.to_excel(writer, sheet_name='Настройки', index=False)
-
-        QMessageBox.information(self, 'Экспорт завершён', f'Данные успешно экспортированы в {file_path}')
+                points_per_channel[names[row]] = int(item.text()) if item else 100
+            except ValueError:
+                points_per_channel[names[row]] = 100
+        if not channels:
+            channels = names
+
+        whole_range = self.export_mode_combo.currentIndex() == 0
+        # Каналы в исходной дискретизации: и для конечной точки, и для листа исходных данных
+        store = app_state.channel_store(time_col)
+        if whole_range:
+            # Конечная точка — максимальная по всем каналам (по их собственным отсчетам)
+            time_range = store.time_range([ch for ch in channels if ch in store])
+            if time_range is not None:
+                self.end_point_spin.setValue(float(time_range[1]))
+
+        options = ExportOptions(
+            start_point=self.start_point_spin.value(),
+            whole_range=whole_range,
+            end_point=self.end_point_spin.value() if whole_range else None,
+            total_points=self.total_points_spin.value(),
+            points_per_channel=points_per_channel,
+            time_step=self.time_step_spin.value(),
+            mode_label=self.export_mode_combo.currentText(),
+        )
+        if export_approximations(file_path, channel_states, channels, options, store=store):
+            QMessageBox.information(self, 'Экспорт завершён', f'Данные успешно экспортированы в {file_path}')
+        else:
+            QMessageBox.warning(self, 'Ошибка', f'Не удалось экспортировать данные в {file_path}')
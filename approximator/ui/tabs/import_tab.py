@@ -12,6 +12,7 @@ import os
 import json
 
 from approximator.ui.components.time_column_selector import TimeColumnSelector
+from approximator.ui.components.merge_mode_selector import MergeModeSelector
 from approximator.ui.components.file_list_panel import FileListPanel
 from approximator.ui.components.preview_table_panel import PreviewTablePanel
 
@@ -27,6 +28,7 @@ class ImportTab(QWidget):
         self.file_panel = FileListPanel()
         self.merge_and_load_button = QPushButton("4. Объединить и загрузить")  # ✅ Вернули кнопку
         self.time_selector = TimeColumnSelector()
+        self.merge_mode_selector = MergeModeSelector()
         self.preview_panel = PreviewTablePanel()
 
         self.settings_table = QTableWidget()  # Задел на будущее
@@ -42,6 +44,7 @@ class ImportTab(QWidget):
         bottom_left_layout = QVBoxLayout(bottom_left_widget)
         bottom_left_layout.setContentsMargins(0, 0, 0, 0)
         bottom_left_layout.addWidget(self.time_selector)
+        bottom_left_layout.addWidget(self.merge_mode_selector)
         bottom_left_layout.addWidget(QLabel("Настройки колонок (в будущем):"))
         bottom_left_layout.addWidget(self.settings_table)
 
@@ -112,6 +115,7 @@ class ImportTab(QWidget):
 
         settings = data.get('settings', {})
         time_column_saved = settings.get('time_column')
+        self.merge_mode_selector.set_options(settings.get('merge_options', {}))
         if time_column_saved:
             self.time_selector.set_selected(time_column_saved)
             for fpath in imported_files:
@@ -0,0 +1,87 @@
+# Путь: ui/workers/autosave_service.py
+# =================================================================================
+# МОДУЛЬ ФОНОВОГО АВТОСОХРАНЕНИЯ
+#
+# НАЗНАЧЕНИЕ:
+#   Периодическое автосохранение проекта в журнал изменений
+#   (services/autosave_journal.py) — вместо полной записи JSON только
+#   при выходе, когда сбой терял всю работу.
+#
+# ЛОГИКА РАБОТЫ:
+#   1.  По таймеру (в GUI-потоке) снимается состояние проекта и
+#       сравнивается с предыдущим — получаются записи изменений. Если
+#       изменений нет, на диск ничего не пишется.
+#   2.  Запись на диск идет в отдельном потоке (один поток — записи
+#       ложатся в журнал по порядку). Когда записей накопилось много,
+#       журнал сворачивается в снимок.
+#   3.  `shutdown` (выход из приложения) — последние изменения и итоговый
+#       снимок записываются синхронно.
+#
+# =================================================================================
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from PyQt5.QtCore import QObject, QTimer
+
+from approximator.services.autosave_journal import AutosaveJournal, diff_states
+from approximator.utils.log import debug
+
+
+class AutosaveService(QObject):
+    """Автосохранение состояния проекта по таймеру."""
+
+    DEFAULT_INTERVAL_MS = 5000
+
+    def __init__(self, journal: AutosaveJournal, extract_state: Callable[[], dict],
+                 parent=None, interval_ms: int = DEFAULT_INTERVAL_MS):
+        super().__init__(parent)
+        self.journal = journal
+        self._extract_state = extract_state
+        self._last_state: Optional[dict] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autosave")
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.tick)
+
+    def start(self, baseline: Optional[dict] = None):
+        """
+        Запускает таймер. baseline — уже сохраненное состояние (например,
+        восстановленное из журнала): изменения считаются относительно него.
+        """
+        self._last_state = baseline
+        self._timer.start()
+
+    def tick(self) -> int:
+        """Записывает изменения с прошлого раза. Возвращает число записей."""
+        try:
+            state = self._extract_state()
+        except Exception as e:
+            print(f"[AutosaveService] ⚠️ Не удалось получить состояние: {e}")
+            return 0
+        records = diff_states(self._last_state, state)
+        if not records:
+            return 0
+        self._last_state = state
+        self._executor.submit(self._write, records, state)
+        debug(f"[AutosaveService] {len(records)} изм.")
+        return len(records)
+
+    def _write(self, records, state):
+        # Выполняется в потоке автосохранения; state больше не изменяется GUI
+        try:
+            self.journal.append(records)
+            if self.journal.needs_compaction():
+                self.journal.write_snapshot(state)
+        except OSError as e:
+            print(f"[AutosaveService] ⚠️ Ошибка автосохранения: {e}")
+
+    def shutdown(self):
+        """Сохраняет последние изменения и итоговый снимок (при выходе)."""
+        self._timer.stop()
+        self.tick()
+        self._executor.shutdown(wait=True)
+        if self._last_state is not None:
+            try:
+                self.journal.write_snapshot(self._last_state)
+            except OSError as e:
+                print(f"[AutosaveService] ⚠️ Ошибка автосохранения: {e}")
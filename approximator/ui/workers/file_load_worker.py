@@ -0,0 +1,141 @@
+# Путь: ui/workers/file_load_worker.py
+# =================================================================================
+# МОДУЛЬ ФОНОВОЙ ЗАГРУЗКИ ФАЙЛОВ
+#
+# НАЗНАЧЕНИЕ:
+#   Загрузка пакета файлов вне GUI-потока: окно не "замерзает", а каждый
+#   файл появляется в интерфейсе сразу после того, как он прочитан.
+#
+# ЛОГИКА РАБОТЫ:
+#   1.  `load(paths)` отправляет пакет в рабочий поток, который перебирает
+#       результаты DataLoader.load_many (файлы разбираются параллельно в
+#       пуле процессов).
+#   2.  По каждому файлу испускается file_loaded или file_failed, затем
+#       progress; по окончании пакета — finished. Сигналы доставляются в
+#       GUI-поток через очередь событий.
+#   3.  Пакеты выполняются по очереди. `wait(paths)` загружает пакет и
+#       крутит локальный цикл событий до его завершения — для кода, которому
+#       нужны все файлы сразу (восстановление проекта), но без блокировки окна.
+#       `wait_batch(batch)` так же дожидается уже запущенного пакета.
+#   4.  `cancel()` прерывает все уже поставленные пакеты (новые пакеты не
+#       затрагиваются): результаты прерванного пакета больше не испускаются.
+#
+# =================================================================================
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import pandas as pd
+from PyQt5.QtCore import QEventLoop, QObject, pyqtSignal
+
+from approximator.utils.log import debug
+
+
+class FileLoadWorker(QObject):
+    """Фоновая параллельная загрузка файлов с сигналами о каждом файле."""
+
+    file_loaded = pyqtSignal(str, object)   # путь, DataFrame (может быть пустым)
+    file_failed = pyqtSignal(str, str)      # путь, текст ошибки
+    progress = pyqtSignal(int, int)         # готово, всего
+    finished = pyqtSignal(int)              # номер пакета
+    # Пакет снят с учета (испускается в GUI-потоке после finished)
+    batch_done = pyqtSignal(int)
+
+    def __init__(self, data_loader, parent=None, max_workers=None):
+        super().__init__(parent)
+        self.data_loader = data_loader
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="load")
+        self._batch = 0
+        self._running = 0
+        self._active_batches = set()
+        # Пакеты с номером не больше этого отменены
+        self._cancelled_upto = 0
+        self.finished.connect(self._on_finished)
+
+    def is_busy(self) -> bool:
+        return self._running > 0
+
+    def load(self, paths: List[str]) -> int:
+        """Ставит пакет файлов в очередь загрузки. Возвращает номер пакета."""
+        self._batch += 1
+        self._running += 1
+        self._active_batches.add(self._batch)
+        self._executor.submit(self._run, self._batch, list(paths))
+        return self._batch
+
+    def wait(self, paths: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Загружает пакет и возвращает {путь: DataFrame} в порядке paths.
+        Пока файлы читаются, обрабатываются события окна.
+        """
+        loaded = {}
+        loop = QEventLoop()
+
+        def on_loaded(path, df):
+            loaded[path] = df
+
+        def on_finished(batch_id):
+            if batch_id == batch:
+                loop.quit()
+
+        self.file_loaded.connect(on_loaded)
+        self.finished.connect(on_finished)
+        try:
+            batch = self.load(paths)
+            loop.exec_()
+        finally:
+            self.file_loaded.disconnect(on_loaded)
+            self.finished.disconnect(on_finished)
+        return {path: loaded[path] for path in paths if path in loaded}
+
+    def wait_batch(self, batch: int):
+        """Крутит цикл событий, пока пакет batch не завершится."""
+        if batch not in self._active_batches:
+            return
+        loop = QEventLoop()
+
+        def on_done(batch_id):
+            if batch_id == batch:
+                loop.quit()
+
+        # Не finished: он мог быть испущен рабочим потоком еще до подключения.
+        # Пакет в _active_batches — значит, _on_finished (GUI-поток) еще не
+        # выполнялся и batch_done придет уже после подключения.
+        self.batch_done.connect(on_done)
+        try:
+            loop.exec_()
+        finally:
+            self.batch_done.disconnect(on_done)
+
+    def cancel(self):
+        """Прерывает поставленные пакеты (уже прочитанные файлы остаются)."""
+        self._cancelled_upto = self._batch
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, batch, paths):
+        """Выполняется в рабочем потоке."""
+        total = len(paths)
+        cancelled = lambda: batch <= self._cancelled_upto
+        try:
+            outcomes = self.data_loader.load_many(paths, max_workers=self.max_workers,
+                                                  should_cancel=cancelled)
+            for done, outcome in enumerate(outcomes, start=1):
+                if cancelled():
+                    break
+                if outcome.error is not None:
+                    self.file_failed.emit(outcome.path, outcome.error)
+                else:
+                    debug(f"[FileLoadWorker] {outcome.path}: {outcome.seconds:.2f} с")
+                    self.file_loaded.emit(outcome.path, outcome.dataframe)
+                self.progress.emit(done, total)
+        except Exception as e:
+            print(f"[FileLoadWorker] Ошибка загрузки пакета: {e}")
+        self.finished.emit(batch)
+
+    def _on_finished(self, batch):
+        self._running = max(self._running - 1, 0)
+        self._active_batches.discard(batch)
+        self.batch_done.emit(batch)
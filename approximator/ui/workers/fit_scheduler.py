@@ -0,0 +1,210 @@
+# Путь: ui/workers/fit_scheduler.py
+# =================================================================================
+# МОДУЛЬ ФОНОВОГО ПЛАНИРОВЩИКА АППРОКСИМАЦИИ
+#
+# НАЗНАЧЕНИЕ:
+#   Расчет аппроксимаций вне GUI-потока, чтобы окно не "замерзало" на
+#   больших каналах.
+#
+# ЛОГИКА РАБОТЫ:
+#   1.  Запросы идут по двум очередям (LANE_CHANNEL, LANE_ALL), у каждой —
+#       свой рабочий поток и свое текущее поколение:
+#       - `submit` делает снимок сегментов канала (см.
+#         channel_fitter.collect_jobs); если пересчитывать нечего, задача
+#         не ставится;
+#       - `submit_all_channels` запускает расчет всех каналов в пуле
+#         процессов (см. parallel_fitter).
+#       Новый запрос отменяет только предыдущий запрос своей очереди:
+#       еще не начатый — через Future.cancel(), уже идущий — прерывается
+#       между сегментами по номеру поколения. Правка сегмента во время
+#       расчета всех каналов этот расчет не прерывает.
+#   2.  Рабочий поток сообщает о прогрессе и результате сигналами Qt;
+#       они доставляются в GUI-поток через очередь событий.
+#   3.  В GUI-потоке результат применяется только если его поколение текущее,
+#       а сегменты с тех пор не менялись; иначе он отбрасывается.
+#       Отмененный запрос сообщает об этом сигналом `cancelled`.
+#
+# =================================================================================
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from approximator.services.approximation.channel_fitter import apply_results, collect_jobs, run_jobs
+from approximator.services.approximation.moment_fitter import MomentFitter
+from approximator.services.approximation.parallel_fitter import (
+    apply_channel_results, fit_channels_parallel, print_report
+)
+from approximator.utils.log import debug
+
+
+LANE_CHANNEL = 'channel'  # сегменты одного канала
+LANE_ALL = 'all'          # все каналы (пул процессов)
+
+
+class _Lane:
+    """Очередь запросов одного вида: свой поток, поколение и ожидаемый результат."""
+
+    def __init__(self, name: str):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"fit-{name}")
+        self.generation = 0
+        self.future = None
+        self.pending = None  # (поколение, apply, версия данных, on_done)
+
+
+class FitScheduler(QObject):
+    """Планировщик фоновой аппроксимации с отменой устаревших запросов."""
+
+    started = pyqtSignal(int, int)          # поколение, количество сегментов
+    progress = pyqtSignal(int, int, int)    # поколение, готово, всего
+    finished = pyqtSignal(int, object)      # поколение, результат задачи (None — отменено)
+    cancelled = pyqtSignal(int, str)        # поколение, очередь (LANE_CHANNEL / LANE_ALL)
+    idle = pyqtSignal()                     # актуальных задач больше нет
+
+    def __init__(self, parent=None, fitter_factory=MomentFitter, data_version_getter=None):
+        super().__init__(parent)
+        # Текущая версия данных на момент применения результата
+        # (если таблицу заменили, результаты старой версии не применяются)
+        self._data_version_getter = data_version_getter
+        # Задачи очереди идут по очереди в ее потоке; фиттер очереди канала
+        # переиспользует подготовленные моменты канала между запросами
+        self._lanes = {LANE_CHANNEL: _Lane(LANE_CHANNEL), LANE_ALL: _Lane(LANE_ALL)}
+        self._fitter = fitter_factory()
+        # Поколения уникальны для всех очередей
+        self._generation = 0
+        self.finished.connect(self._on_finished)
+
+    @property
+    def generation(self) -> int:
+        """Поколение последнего запущенного запроса."""
+        return self._generation
+
+    def is_busy(self) -> bool:
+        return any(lane.pending is not None for lane in self._lanes.values())
+
+    def submit(self, channel_state, time_index, data_version, indices=None, on_done=None) -> int:
+        """
+        Ставит в очередь аппроксимацию сегментов канала.
+        on_done(applied_indices) вызывается в GUI-потоке, если результат не устарел.
+        Если пересчитывать нечего, ничего не ставится и возвращается 0.
+        """
+        time_column = time_index.time_column
+        jobs = collect_jobs(channel_state, data_version, indices, time_column)
+        if not jobs:
+            return 0
+        x_data, y_data = time_index.channel_arrays(channel_state.name)
+
+        def task(progress, should_cancel):
+            return run_jobs(jobs, x_data, y_data, self._fitter,
+                            should_cancel=should_cancel, progress=progress)
+
+        def apply(results, version):
+            return apply_results(channel_state, version, results, time_column) if results is not None else []
+
+        debug(f"[FitScheduler] {len(jobs)} сегм. канала {channel_state.name}")
+        return self._submit(LANE_CHANNEL, task, apply, len(jobs), data_version, on_done)
+
+    def submit_all_channels(self, channel_states, time_index, data_version, on_done=None,
+                            max_workers=None, force=False) -> int:
+        """
+        Аппроксимация всех каналов в пуле процессов (см. parallel_fitter).
+        on_done(reports) получает отчеты с временем расчета по каналам.
+        """
+        channel_states = dict(channel_states)
+
+        def task(progress, should_cancel):
+            started = time.perf_counter()
+            outcome = fit_channels_parallel(time_index, channel_states, data_version, max_workers,
+                                            progress=progress, should_cancel=should_cancel, force=force)
+            if outcome is not None:
+                print_report(outcome[1], time.perf_counter() - started)
+            return outcome
+
+        def apply(outcome, version):
+            if outcome is None:
+                return []
+            results, reports = outcome
+            return apply_channel_results(channel_states, version, results, reports, time_index.time_column)
+
+        return self._submit(LANE_ALL, task, apply, len(channel_states), data_version, on_done)
+
+    def _submit(self, lane_name, task, apply, total, data_version, on_done) -> int:
+        lane = self._lanes[lane_name]
+        self._drop(lane_name)
+        self._generation += 1
+        generation = lane.generation = self._generation
+        lane.pending = (generation, apply, data_version, on_done)
+
+        self.started.emit(generation, total)
+        lane.future = lane.executor.submit(self._run, generation, task)
+        return generation
+
+    def _drop(self, lane_name) -> bool:
+        """Отменяет запрос очереди; True, если ожидаемый результат был."""
+        lane = self._lanes[lane_name]
+        lane.generation = -1
+        if lane.future is not None:
+            lane.future.cancel()
+        if lane.pending is None:
+            return False
+        generation = lane.pending[0]
+        lane.pending = None
+        self.cancelled.emit(generation, lane_name)
+        return True
+
+    def cancel(self):
+        """Отменяет текущие запросы всех очередей; их результаты будут отброшены."""
+        dropped = [self._drop(name) for name in self._lanes]
+        if any(dropped):
+            self.idle.emit()
+
+    def release_data(self):
+        """
+        Отпускает данные канала в фиттере рабочего потока (например, перед
+        перезаписью файла, из которого они отображены). Ждет окончания идущей
+        задачи: ее результат применяется как обычно.
+        """
+        self._lanes[LANE_CHANNEL].executor.submit(self._fitter.release).result()
+
+    def shutdown(self):
+        """Останавливает пулы (при закрытии окна)."""
+        self.cancel()
+        for lane in self._lanes.values():
+            lane.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _lane_of(self, generation):
+        for lane in self._lanes.values():
+            if lane.generation == generation:
+                return lane
+        return None
+
+    def _is_stale(self, generation) -> bool:
+        return self._lane_of(generation) is None
+
+    def _run(self, generation, task):
+        """Выполняется в рабочем потоке."""
+        try:
+            results = task(
+                lambda done, total: self.progress.emit(generation, done, total),
+                lambda: self._is_stale(generation)
+            )
+        except Exception as e:
+            print(f"[FitScheduler] Ошибка аппроксимации: {e}")
+            results = None
+        self.finished.emit(generation, results)
+
+    def _on_finished(self, generation, results):
+        """Выполняется в GUI-потоке."""
+        lane = self._lane_of(generation)
+        if lane is None or lane.pending is None or lane.pending[0] != generation:
+            debug(f"[FitScheduler] Результат поколения {generation} устарел — отброшен")
+            return
+        _, apply, data_version, on_done = lane.pending
+        lane.pending = None
+        if self._data_version_getter is not None:
+            data_version = self._data_version_getter()
+        applied = apply(results, data_version)
+        if not self.is_busy():
+            self.idle.emit()
+        if on_done is not None:
+            on_done(applied)
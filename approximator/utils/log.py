@@ -1,23 +1,29 @@
 import logging
 
-logging.getLogger('matplotlib').setLevel(logging.WARNING) # отключаем лог matplotlib
+# Логгер пакета. Импорт модуля ничего не настраивает: вывод включает
+# приложение (setup_logging в main.py), а при использовании ядра как
+# библиотеки (пакетная обработка, скрипты) — вызывающий код.
+_logger = logging.getLogger('approximator')
 
 
-# 🔧 Инициализация логгера
-logging.basicConfig(
-    level=logging.DEBUG,  # Меняешь на INFO чтобы отключить debug-логи
-    format='[%(levelname)s] %(message)s'
-)
+# 🔧 Инициализация логгера (вызывается точкой входа GUI)
+def setup_logging(level: int = logging.DEBUG):
+    """Вывод логов в консоль; level=INFO отключает debug-логи."""
+    logging.getLogger('matplotlib').setLevel(logging.WARNING) # отключаем лог matplotlib
+    logging.basicConfig(
+        level=level,
+        format='[%(levelname)s] %(message)s'
+    )
 
 # 🎯 Экспортируем удобные короткие функции
 def debug(msg: str):
-    logging.debug(msg)
+    _logger.debug(msg)
 
 def info(msg: str):
-    logging.info(msg)
+    _logger.info(msg)
 
 def warn(msg: str):
-    logging.warning(msg)
+    _logger.warning(msg)
 
 def error(msg: str):
-    logging.error(msg)
\ No newline at end of file
+    _logger.error(msg)
@@ -0,0 +1,43 @@
+from approximator.utils.log import debug
+
+
+class FrameThrottle:
+    """
+    Склеивает частые события (например, motion_notify_event при перетаскивании)
+    в один вызов callback не чаще одного раза за кадр.
+    Используется таймер самого холста, поэтому работает с любым backend'ом.
+    """
+
+    def __init__(self, canvas, callback, interval_ms: int = 16):
+        self.callback = callback
+        self._pending = False
+        self._timer = canvas.new_timer(interval=interval_ms)
+        self._timer.single_shot = True
+        self._timer.add_callback(self._on_timeout)
+
+    def request(self):
+        """Запрашивает вызов callback; повторные запросы до срабатывания склеиваются."""
+        if self._pending:
+            return
+        self._pending = True
+        self._timer.start()
+
+    def flush(self):
+        """Немедленно выполняет отложенный вызов, если он есть."""
+        if self._pending:
+            self._timer.stop()
+            self._on_timeout()
+
+    def cancel(self):
+        """Отменяет отложенный вызов."""
+        self._pending = False
+        self._timer.stop()
+
+    def _on_timeout(self):
+        if not self._pending:
+            return
+        self._pending = False
+        try:
+            self.callback()
+        except Exception as e:
+            debug(f"[FrameThrottle] ⚠ Ошибка в callback: {e}")
@@ -8,7 +8,9 @@ class RemovableArtist:
 
     def remove(self):
         try:
-            if hasattr(self.ax, "lines") and self.artist in self.ax.lines:
+            if self.artist.axes is not None:
+                self.artist.remove()
+            elif hasattr(self.ax, "lines") and self.artist in self.ax.lines:
                 self.ax.lines.remove(self.artist)
             elif hasattr(self.artist, "set_visible"):
                 self.artist.set_visible(False)
@@ -0,0 +1,104 @@
+# Путь: benchmarks/bench_export.py
+# =================================================================================
+# БЕНЧМАРК ЭКСПОРТА АППРОКСИМАЦИЙ
+#
+# НАЗНАЧЕНИЕ:
+#   Сравнение прежнего экспорта (список словарей по точке на строку с
+#   повторяющимися RMSE/R²/коэффициентами + DataFrame.to_excel/to_csv) с
+#   потоковым экспортом services/data_exporter: время и пиковая память
+#   (tracemalloc) для xlsx и csv.
+#
+# ЗАПУСК:
+#   python benchmarks/bench_export.py [--channels 16] [--segments 10] [--points 1000] [--formats csv,xlsx]
+#
+# =================================================================================
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from approximator.data_models.channel_state import ChannelState
+from approximator.data_models.fit_result import FitResult
+from approximator.data_models.segment import Segment
+from approximator.services.data_exporter import ExportOptions, export_approximations
+
+
+def make_channel_states(channels: int, segments: int):
+    rng = np.random.default_rng(0)
+    states = {}
+    for c in range(channels):
+        name = f'Канал{c + 1}'
+        segs = [Segment(x_start=10.0 * i, x_end=10.0 * (i + 1), label=f'S{i + 1}',
+                        fit_result=FitResult(coefficients=tuple(rng.normal(size=4)), rmse=0.1,
+                                             r_squared=0.99, points_count=1000))
+                for i in range(segments)]
+        states[name] = ChannelState(name=name, segments=segs)
+    return states
+
+
+def legacy_export(path: str, states, points: int):
+    """Прежний способ: строка-словарь на точку, метаданные в каждой строке (для сравнения)."""
+    approx_rows = []
+    for ch, ch_state in states.items():
+        for seg in ch_state.segments:
+            x_vals = np.linspace(seg.x_start, seg.x_end, points)
+            y_vals = np.polyval(seg.fit_result.coefficients, x_vals)
+            for x, y in zip(x_vals, y_vals):
+                approx_rows.append({
+                    'Канал': ch, 'Сегмент': seg.label, 't_abs': x, 't_rel': x, 'Значение': y,
+                    'Степень': seg.poly_degree, 'RMSE': seg.fit_result.rmse, 'R2': seg.fit_result.r_squared,
+                    'Коэффициенты': str(seg.fit_result.coefficients),
+                    'Число точек': seg.fit_result.points_count,
+                })
+    approx_df = pd.DataFrame(approx_rows)
+    if path.endswith('.xlsx'):
+        with pd.ExcelWriter(path, engine='openpyxl') as writer:
+            approx_df.to_excel(writer, sheet_name='Аппроксимация', index=False)
+    else:
+        approx_df.to_csv(path, index=False)
+
+
+def measure(func):
+    """Время и пиковая память одного запуска."""
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк экспорта аппроксимаций")
+    parser.add_argument('--channels', type=int, default=16)
+    parser.add_argument('--segments', type=int, default=10)
+    parser.add_argument('--points', type=int, default=1000, help="точек на сегмент")
+    parser.add_argument('--formats', default='csv,xlsx')
+    args = parser.parse_args()
+
+    states = make_channel_states(args.channels, args.segments)
+    options = ExportOptions(whole_range=False, default_points=args.points)
+    rows = args.channels * args.segments * args.points
+    print(f"Каналов: {args.channels}, сегментов: {args.segments}, точек на сегмент: {args.points} ({rows} строк)")
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in args.formats.split(','):
+            old_path, new_path = os.path.join(directory, f'old.{fmt}'), os.path.join(directory, f'new.{fmt}')
+            t_old, m_old = measure(lambda: legacy_export(old_path, states, args.points))
+            t_new, m_new = measure(lambda: export_approximations(new_path, states, list(states), options))
+            print(f"{fmt:5s} прежний:   {t_old:7.2f} с, пик {m_old / 1024 ** 2:6.0f} МБ")
+            print(f"{fmt:5s} потоковый: {t_new:7.2f} с, пик {m_new / 1024 ** 2:6.0f} МБ | "
+                  f"ускорение x{t_old / t_new:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# Путь: benchmarks/bench_import.py
+# =================================================================================
+# БЕНЧМАРК ВРЕМЕНИ ИМПОРТА ЯДРА
+#
+# НАЗНАЧЕНИЕ:
+#   Защита от регрессий времени запуска: в новом процессе импортируются
+#   все имена approximator.core и измеряется время. numpy и pandas
+#   импортируются отдельно и в бюджет ядра не входят — их время зависит
+#   от машины, а не от кода приложения. Проверяется также, что Qt,
+#   matplotlib и тяжелые библиотеки (scipy, openpyxl, xlrd) при импорте
+#   ядра не загружаются.
+#
+# ЗАПУСК:
+#   python benchmarks/bench_import.py [--repeat 5] [--budget-ms 200]
+#   Код возврата 1 — бюджет превышен или загружен запрещенный модуль.
+#
+# =================================================================================
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Модули, которых не должно быть после импорта ядра
+FORBIDDEN = ('PyQt5', 'matplotlib', 'scipy', 'openpyxl', 'xlrd')
+
+_PROBE = f"""
+import json, sys, time
+t0 = time.perf_counter()
+import numpy, pandas
+t1 = time.perf_counter()
+import approximator.core
+t2 = time.perf_counter()
+for name in approximator.core.__all__:
+    getattr(approximator.core, name)
+t3 = time.perf_counter()
+loaded = sorted({{m.split('.')[0] for m in sys.modules}} & set({FORBIDDEN!r}))
+print(json.dumps({{'numpy_pandas': t1 - t0, 'package': t2 - t1, 'core': t3 - t1, 'forbidden': loaded}}))
+"""
+
+
+def probe() -> dict:
+    """Один замер в новом процессе (модули еще не загружены)."""
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    output = subprocess.run([sys.executable, '-c', _PROBE], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк времени импорта ядра")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=200.0, help="бюджет импорта ядра (без numpy/pandas)")
+    args = parser.parse_args()
+
+    samples = [probe() for _ in range(args.repeat)]
+    median = {key: statistics.median(s[key] for s in samples) * 1000
+              for key in ('numpy_pandas', 'package', 'core')}
+    forbidden = sorted({name for s in samples for name in s['forbidden']})
+
+    print(f"Замеров: {args.repeat} (медиана)")
+    print(f"numpy + pandas:              {median['numpy_pandas']:7.1f} мс (вне бюджета)")
+    print(f"import approximator.core:    {median['package']:7.1f} мс")
+    print(f"все имена approximator.core: {median['core']:7.1f} мс (бюджет {args.budget_ms:.0f} мс)")
+    print(f"Запрещенные модули: {', '.join(forbidden) if forbidden else 'нет'}")
+
+    if forbidden or median['core'] > args.budget_ms:
+        print("❌ Регрессия времени импорта")
+        return 1
+    print("✅ OK")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+# Путь: benchmarks/bench_merge.py
+# =================================================================================
+# БЕНЧМАРК ОБЪЕДИНЕНИЯ ФАЙЛОВ
+#
+# НАЗНАЧЕНИЕ:
+#   Сравнение прежней цепочки попарных pd.merge(how='outer') с k-путевым
+#   объединением DataMerger: время и пиковая память (tracemalloc), а также
+#   режимы выравнивания nearest и resample (общая сетка).
+#
+# ЗАПУСК:
+#   python benchmarks/bench_merge.py [--files 5] [--rows 300000] [--channels 4] [--repeat 3]
+#
+# =================================================================================
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from approximator.services.data_merger import DataMerger
+
+
+def pairwise_merge(dataframes, on_column='Time'):
+    """Прежний способ объединения (для сравнения)."""
+    merged_df = dataframes[0]
+    for df in dataframes[1:]:
+        merged_df = pd.merge(merged_df, df, on=on_column, how='outer')
+    return merged_df.sort_values(by=on_column).reset_index(drop=True)
+
+
+def make_dataframes(files: int, rows: int, channels: int):
+    rng = np.random.default_rng(0)
+    dataframes = []
+    for k in range(files):
+        # Разные файлы пишутся с разным шагом и сдвигом — метки совпадают лишь частично
+        step = 0.01 * (k + 1)
+        time_axis = np.round(np.arange(rows) * step + 0.005 * k, 3)
+        columns = {f'Файл{k + 1}_Канал{j + 1}': rng.normal(500.0, 50.0, rows) for j in range(channels)}
+        dataframes.append(pd.DataFrame({'Time': time_axis, **columns}))
+    return dataframes
+
+
+def measure(repeat: int, func):
+    """Лучшее время из repeat запусков и пиковая память одного запуска."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк объединения файлов")
+    parser.add_argument('--files', type=int, default=5)
+    parser.add_argument('--rows', type=int, default=300_000)
+    parser.add_argument('--channels', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Файлов: {args.files}, строк в файле: {args.rows}, каналов: {args.channels}, повторов: {args.repeat}")
+    dataframes = make_dataframes(args.files, args.rows, args.channels)
+    merger = DataMerger()
+
+    t_old, m_old, reference = measure(args.repeat, lambda: pairwise_merge(dataframes))
+    t_new, m_new, merged = measure(args.repeat, lambda: merger.merge_dataframes(dataframes))
+    same = reference.shape == merged.shape and np.allclose(
+        reference.to_numpy(dtype=float), merged.to_numpy(dtype=float), equal_nan=True)
+    print(f"pd.merge попарно: {t_old:.3f} с, пик {m_old / 1024 ** 2:.0f} МБ")
+    print(f"DataMerger:       {t_new:.3f} с, пик {m_new / 1024 ** 2:.0f} МБ | "
+          f"ускорение x{t_old / t_new:.1f} | совпадает: {same} | форма {merged.shape}")
+
+    t_near, _, near = measure(args.repeat, lambda: merger.merge_dataframes(
+        dataframes, method='nearest', tolerance=0.006))
+    print(f"DataMerger nearest (допуск 0.006): {t_near:.3f} с | форма {near.shape}")
+
+    t_grid, m_grid, grid = measure(args.repeat, lambda: merger.merge_dataframes(
+        dataframes, method='resample', grid_step=0.05))
+    print(f"DataMerger resample (шаг 0.05): {t_grid:.3f} с, пик {m_grid / 1024 ** 2:.0f} МБ | форма {grid.shape} | "
+          f"NaN {float(grid.isna().to_numpy().mean()):.1%} (попарно: {float(reference.isna().to_numpy().mean()):.1%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# Путь: benchmarks/bench_moment_fitter.py
+# =================================================================================
+# БЕНЧМАРК АППРОКСИМАЦИИ ПО БЛОЧНЫМ МОМЕНТАМ
+#
+# НАЗНАЧЕНИЕ:
+#   Проверяет, что MomentFitter действительно идет по быстрому пути
+#   (моменты блоков), а не откатывается на np.polyfit, и что результат не
+#   хуже np.polyfit. Для каждого набора (точек, сегментов, степень):
+#   - доля аппроксимаций по моментам (moment_fits / все);
+#   - время MomentFitter (с подготовкой канала) и PolynomialFitter;
+#   - максимальное отклонение значений полинома и относительная ошибка RMSE
+#     от эталона (np.polynomial.Polynomial.fit в масштабированном базисе);
+#   - память итогов блоков против прежних префиксных сумм (3d+2)·N.
+#
+# ЗАПУСК:
+#   python benchmarks/bench_moment_fitter.py [--points 100000,1000000]
+#       [--segments 10,300] [--degrees 1,2,3,5] [--min-fast-share 0.95]
+#   Код возврата 1 — доля быстрого пути ниже порога.
+#
+# =================================================================================
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from approximator.services.approximation.moment_fitter import MomentFitter
+from approximator.services.approximation.polynomial_fitter import PolynomialFitter
+
+
+def make_channel(points: int):
+    """Канал пирометра: неравномерная сетка времени, плавный сигнал и шум."""
+    rng = np.random.default_rng(0)
+    x = np.sort(rng.uniform(0.0, 3600.0, points))
+    y = 1500.0 + 200.0 * np.sin(x / 300.0) + 0.02 * x + rng.normal(0.0, 2.0, points)
+    return x, y
+
+
+def deviation(result, reference, x, y):
+    """(макс. отклонение значений, относительная ошибка RMSE) от эталона."""
+    fitted = reference(x)
+    values = np.max(np.abs(np.polyval(result.coefficients, x) - fitted))
+    rmse = np.sqrt(np.mean((fitted - y) ** 2))
+    return values, abs(result.rmse - rmse) / rmse
+
+
+def run_case(x, y, segments: int, degree: int):
+    bounds = np.linspace(0, x.size, segments + 1).astype(int)
+    slices = [(x[i0:i1], y[i0:i1]) for i0, i1 in zip(bounds[:-1], bounds[1:])]
+
+    fitter = MomentFitter()
+    started = time.perf_counter()
+    fitter.prepare(x, y)
+    moment_results = [fitter.fit(xs, ys, degree) for xs, ys in slices]
+    t_moment = time.perf_counter() - started
+
+    polyfit = PolynomialFitter()
+    started = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        poly_results = [polyfit.fit(xs, ys, degree) for xs, ys in slices]
+    t_poly = time.perf_counter() - started
+
+    worst = np.zeros((2, 2))  # [moment, polyfit] x [значения, RMSE]
+    for (xs, ys), moment, poly in zip(slices, moment_results, poly_results):
+        reference = np.polynomial.Polynomial.fit(xs, ys, degree)
+        worst[0] = np.maximum(worst[0], deviation(moment, reference, xs, ys))
+        worst[1] = np.maximum(worst[1], deviation(poly, reference, xs, ys))
+
+    fits = fitter.moment_fits + fitter.fallback_fits
+    memory = fitter._v_sums.nbytes + fitter._vy_sums.nbytes + fitter._yy_sums.nbytes
+    return {
+        'fast_share': fitter.moment_fits / fits if fits else 0.0,
+        't_moment': t_moment, 't_poly': t_poly, 'worst': worst,
+        'memory': memory, 'prefix_memory': (3 * degree + 2) * (x.size + 1) * 8,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк аппроксимации по блочным моментам")
+    parser.add_argument('--points', default='100000,1000000')
+    parser.add_argument('--segments', default='10,300')
+    parser.add_argument('--degrees', default='1,2,3,5')
+    parser.add_argument('--min-fast-share', type=float, default=0.95)
+    args = parser.parse_args()
+
+    lowest_share = 1.0
+    print("точек    сегм. ст. | быстрый путь | моменты, с | polyfit, с | "
+          "откл. значений (моменты / polyfit) | ошибка RMSE (моменты / polyfit) | память итогов / префиксов")
+    for points in map(int, args.points.split(',')):
+        x, y = make_channel(points)
+        for segments in map(int, args.segments.split(',')):
+            for degree in map(int, args.degrees.split(',')):
+                r = run_case(x, y, segments, degree)
+                lowest_share = min(lowest_share, r['fast_share'])
+                (v_m, e_m), (v_p, e_p) = r['worst']
+                print(f"{points:8d} {segments:5d} {degree:3d} | {r['fast_share']:11.0%} | "
+                      f"{r['t_moment']:10.3f} | {r['t_poly']:10.3f} | "
+                      f"{v_m:15.2e} / {v_p:8.2e}    | {e_m:14.2e} / {e_p:8.2e}  | "
+                      f"{r['memory'] / 1024:7.1f} КБ / {r['prefix_memory'] / 1024 ** 2:6.1f} МБ")
+
+    if lowest_share < args.min_fast_share:
+        print(f"❌ Доля быстрого пути {lowest_share:.0%} ниже порога {args.min_fast_share:.0%}")
+        return 1
+    print("✅ OK")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
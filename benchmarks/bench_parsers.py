@@ -0,0 +1,142 @@
+# Путь: benchmarks/bench_parsers.py
+# =================================================================================
+# БЕНЧМАРК ПАРСЕРОВ ФАЙЛОВ
+#
+# НАЗНАЧЕНИЕ:
+#   Замер времени загрузки файлов АЦП (TermoSoft) и отдельно — разбора
+#   колонки относительного времени "ЧЧ:ММ:СС:мс": поэлементный apply
+#   против векторного decode_rel_time. Перед замером проверяется разбор
+#   некорректных значений (MALFORMED_CASES): испорченная строка дает NaN
+#   и не портит соседние строки порции.
+#
+# ЗАПУСК:
+#   python benchmarks/bench_parsers.py [--rows 1000000] [--channels 4] [--repeat 3]
+#   Код возврата 1 — некорректные значения разобраны неверно.
+#
+#   Тестовый файл генерируется во временной папке и удаляется после замера.
+#
+# =================================================================================
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from approximator.file_parsers.adc_parser import AdcParser, decode_rel_time
+
+
+def parse_rel_time(time_str):
+    """Прежний поэлементный разбор времени (для сравнения)."""
+    if not isinstance(time_str, str): return None
+    try:
+        h, m, s, ms = map(int, time_str.split(':'))
+        return h * 3600 + m * 60 + s + ms / 1000.0
+    except (ValueError, TypeError):
+        return None
+
+
+# Значение -> ожидаемые секунды (None — NaN)
+MALFORMED_CASES = [
+    ('00:00:01:500', 1.5),
+    (' 1:2:3:4 ', 3723.004),
+    ('x' * 400, None),             # длинная строка не делает NaN всю порцию
+    ('100:00:00:000', None),       # поле длиннее ЧЧ
+    ('00:00:00:0000', None),       # поле длиннее мс
+    ('0:0:0', None),
+    ('0:0:0:1:2', None),
+    ('01:02:03:', None),
+    ('١:0:0:0', None),             # цифра не ASCII
+    ('a:0:0:0', None),
+    ('', None),
+    (None, None),
+    ('00:00:02:000', 2.0),
+]
+
+
+def check_malformed() -> bool:
+    """decode_rel_time на некорректных значениях совпадает с ожидаемым."""
+    values, expected = zip(*MALFORMED_CASES)
+    expected = np.array([np.nan if e is None else e for e in expected])
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')  # переполнение весов разрядов — ошибка
+        decoded = decode_rel_time(pd.Series(values, dtype=object))
+    failed = [(v, e, d) for v, e, d in zip(values, expected, decoded)
+              if not np.isclose(e, d, equal_nan=True)]
+    for value, e, d in failed:
+        print(f"❌ {str(value)[:20]!r}: ожидалось {e}, получено {d}")
+    return not failed
+
+
+def make_time_strings(rows: int) -> np.ndarray:
+    ms = np.arange(rows, dtype=np.int64) * 10
+    return np.array([
+        f"{t // 3600000:02d}:{t // 60000 % 60:02d}:{t // 1000 % 60:02d}:{t % 1000:03d}" for t in ms
+    ], dtype=object)
+
+
+def write_adc_file(path: str, times: np.ndarray, channels: int):
+    rng = np.random.default_rng(0)
+    values = rng.normal(500.0, 50.0, size=(times.size, channels))
+    header = '\t'.join(['Время'] + [f'Канал{i + 1}, C' for i in range(channels)])
+    with open(path, 'w', encoding='cp1251', newline='\n') as f:
+        f.write("TermoSoft v2.5. Дата и время начала записи : 13.07.2025 15:30:00\n")
+        f.write("#Tаблица:\n")
+        f.write(header + '\n')
+        for t, row in zip(times, values):
+            f.write(t + '\t' + '\t'.join(f'{v:.3f}' for v in row) + '\n')
+
+
+def best_of(repeat: int, func):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк парсеров файлов")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--channels', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if not check_malformed():
+        return 1
+    print(f"Некорректные значения времени: {len(MALFORMED_CASES)} случаев — OK")
+
+    print(f"Строк: {args.rows}, каналов: {args.channels}, повторов: {args.repeat}")
+    times = make_time_strings(args.rows)
+
+    # 1. Разбор колонки времени
+    series = pd.Series(times)
+    t_apply, reference = best_of(args.repeat, lambda: series.apply(parse_rel_time).to_numpy(dtype=float))
+    t_vector, decoded = best_of(args.repeat, lambda: decode_rel_time(series))
+    same = np.array_equal(reference, decoded, equal_nan=True)
+    print(f"Время 'ЧЧ:ММ:СС:мс':  apply {t_apply:.3f} с | decode_rel_time {t_vector:.3f} с | "
+          f"ускорение x{t_apply / t_vector:.1f} | совпадает: {same}")
+
+    # 2. Полная загрузка файла АЦП
+    fd, path = tempfile.mkstemp(suffix='.txt')
+    os.close(fd)
+    try:
+        write_adc_file(path, times, args.channels)
+        size_mb = os.path.getsize(path) / 1e6
+        t_parse, df = best_of(args.repeat, lambda: AdcParser().parse(path))
+        print(f"AdcParser.parse:      {t_parse:.3f} с | {size_mb:.1f} МБ | "
+              f"{len(df) / t_parse / 1e6:.2f} млн строк/с | форма {df.shape}")
+    finally:
+        os.remove(path)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())